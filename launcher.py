@@ -1,11 +1,16 @@
 # launcher.py
-import subprocess
-import sys
+from scraper.pipeline import parse_args, run_pipeline
+from scraper.main import resolve_parse_arguments
+from scraper.utils import metrics
 
-print("🏁 Starte Parsing...")
-subprocess.run([sys.executable, "-m", "scraper.main"], check=True)
+if __name__ == "__main__":
+    args = parse_args()
+    jobs, cache_folder = resolve_parse_arguments(args)
 
-print("🏁 Starte Processing...")
-subprocess.run([sys.executable, "-m", "scraper.processor.processor"], check=True)
+    print("🏁 Starte Parsing & Processing...")
+    with metrics.instrumented_run(args.metrics, args.profile, args.trace_memory, command="launcher", jobs=jobs):
+        run_pipeline(input_folder=args.input_folder, parser_output_folder=args.output_folder,
+                     processed_folder=args.processed_folder, jobs=jobs, cache_folder=cache_folder,
+                     storage=args.storage, db_path=args.db_path)
 
-print("✅ Alles abgeschlossen!")
+    print("✅ Alles abgeschlossen!")
@@ -2,23 +2,187 @@
 
 import sys
 import os
-import pandas as pd
+import time
+import argparse
 
 # Append Projekt-Wurzelverzeichnis
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-# Danach normale Imports
-from scraper.parser.parser_mastercard import parse_mastercard
-from scraper.parser.parser_volksbank import parse_volksbank
-from scraper.utils.utils import detect_bank_typ
-from scraper.utils.logger import setup_logger
+# Danach normale Imports – pandas und die PDF-Bibliotheken werden erst bei Bedarf geladen
+from scraper.parser import registry, extraction, page_parallel
+from scraper.utils.utils import detect_bank_typ, extract_jahr_from_filename
+from scraper.utils import parse_cache, metrics
+from scraper.utils.bank_sniffer import sniff_bank_typ
+from scraper.utils.logger import setup_logger, add_logging_arguments, apply_logging_arguments
 from scraper.utils.suppress_warnings import suppress_warnings
 
 # Setup
 logger = setup_logger(__name__)
 suppress_warnings()
 
-def main(input_folder=None, output_folder=None):
+
+def parse_volksbank(pdf_path):
+    return registry.get_parser("volksbank")(pdf_path)
+
+
+def parse_mastercard(pdf_path):
+    return registry.get_parser("mastercard")(pdf_path)
+
+
+def parse_pdf(pdf_path, cache_folder=None):
+    """Parst eine einzelne PDF und liefert (Banktyp, DataFrame oder None, Dauer in Sekunden).
+
+    Ist der Banktyp am Dateinamen nicht erkennbar, entscheidet der Inhalt der ersten Seite.
+
+    Mit cache_folder werden unveränderte PDFs (gleicher Inhalts-Hash und Parser-Version)
+    nicht erneut geparst.
+    """
+    with metrics.file_scope(pdf_path) as info:
+        bank_typ, df, dauer = _parse_pdf(pdf_path, cache_folder, info)
+        info["bank_typ"] = bank_typ
+        info["rows"] = len(df) if df is not None else 0
+    return bank_typ, df, dauer
+
+
+def _parse_pdf(pdf_path, cache_folder, info):
+    start = time.perf_counter()
+    bank_typ = detect_bank_typ(os.path.basename(pdf_path))
+    df = None
+    datei_hash = None
+
+    if bank_typ == "unbekannt":
+        # Umbenannte Dateien anhand der ersten Seite erkennen statt sie zu überspringen
+        try:
+            with metrics.stage("sniff"):
+                datei_hash = parse_cache.compute_file_hash(pdf_path)
+                bank_typ = sniff_bank_typ(pdf_path, datei_hash, cache_folder)
+        except OSError as e:
+            logger.warning(f"⚠️ {pdf_path} nicht lesbar: {e}")
+
+    if not registry.is_supported(bank_typ):
+        return bank_typ, None, time.perf_counter() - start
+
+    # Parser-Version, Extraktions-Backend und das Jahr aus dem Dateinamen bestimmen gemeinsam
+    # das Ergebnis – eine umbenannte Kopie darf keine Zeilen mit dem alten Jahr liefern
+    jahr = extract_jahr_from_filename(os.path.basename(pdf_path))
+    cache_version = f"{registry.get_parser_version(bank_typ)}_{extraction.config_key(bank_typ)}_j{jahr}"
+
+    if cache_folder:
+        try:
+            with metrics.stage("cache_lookup"):
+                datei_hash = datei_hash or parse_cache.compute_file_hash(pdf_path)
+                df = parse_cache.load_from_cache(datei_hash, bank_typ, cache_version, cache_folder)
+        except OSError as e:
+            logger.warning(f"⚠️ Cache nicht nutzbar für {pdf_path}: {e}")
+        info["cache_hit"] = df is not None
+        if df is not None:
+            metrics.count("cache_hits")
+            logger.info(f"♻️ {os.path.basename(pdf_path)} aus Cache geladen")
+            return bank_typ, df, time.perf_counter() - start
+
+    # Zur Laufzeit auflösen, damit die Modul-Funktionen austauschbar bleiben
+    parsers = {"volksbank": parse_volksbank, "mastercard": parse_mastercard}
+
+    try:
+        with metrics.stage(f"parse_{bank_typ}"):
+            df = parsers[bank_typ](pdf_path)
+    except Exception as e:
+        # Fehler bleiben auf die einzelne Datei beschränkt
+        logger.error(f"❌ Fehler beim Parsen von {pdf_path}: {e}")
+        metrics.count("parse_errors")
+        df = None
+
+    # Nur erfolgreiche Ergebnisse cachen (Lesefehler liefern einen DataFrame ohne Spalten)
+    if cache_folder and datei_hash and df is not None and len(df.columns):
+        try:
+            parse_cache.save_to_cache(df, datei_hash, bank_typ, cache_version, cache_folder)
+        except OSError as e:
+            logger.warning(f"⚠️ Cache-Eintrag für {pdf_path} nicht gespeichert: {e}")
+
+    return bank_typ, df, time.perf_counter() - start
+
+
+def _init_worker(config, trace_memory):
+    extraction.apply_config(config)
+    # Dateien sind hier schon verteilt – keine zweite Pool-Ebene je PDF
+    page_parallel.configure(1)
+    if trace_memory:
+        metrics.start_run(trace_memory)
+
+
+def _parse_pdf_worker(pdf_path, cache_folder):
+    """Wie parse_pdf, liefert zusätzlich die Metriken des Worker-Prozesses für diese Datei."""
+    metrics.reset()
+    return parse_pdf(pdf_path, cache_folder), metrics.snapshot()
+
+
+def save_bookings(df_list, bank_name, output_folder, storage="csv", db_path=None):
+    """Speichert die Buchungen einer Bank je Jahr und liefert sie als {Jahr: DataFrame} zurück."""
+    import pandas as pd
+
+    gespeichert = {}
+    if df_list:
+        df = pd.concat(df_list, ignore_index=True)
+        if "Datum" in df.columns:
+            df["Datum"] = pd.to_datetime(df["Datum"], errors="coerce")
+            df = df.dropna(subset=["Datum"])
+            if not df.empty:
+                if storage == "sqlite":
+                    from scraper.storage import sqlite_store
+                    sqlite_store.write_parsed(df, bank_name, db_path or sqlite_store.DB_PATH)
+                for jahr, group in df.groupby(df["Datum"].dt.year):
+                    if storage == "csv":
+                        output_path = os.path.join(output_folder, f"buchungen_{bank_name}_{jahr}.csv")
+                        group.to_csv(output_path, index=False)
+                        logger.info(f"✅ {bank_name.capitalize()}-Buchungen für {jahr} gespeichert: {output_path}")
+                    gespeichert[int(jahr)] = group
+    return gespeichert
+
+
+def append_bookings(df, bank_name, jahr, output_folder, storage="csv", db_path=None):
+    """Hängt die Buchungen einer neuen PDF an die Jahresdatei bzw. die Datenbank an (Watch-Modus)."""
+    if storage == "sqlite":
+        from scraper.storage import sqlite_store
+        sqlite_store.write_parsed(df, bank_name, db_path or sqlite_store.DB_PATH, append=True)
+        return
+    from scraper.utils.utils import append_csv
+    append_csv(df, os.path.join(output_folder, f"buchungen_{bank_name}_{jahr}.csv"))
+
+
+def _parse_files(pdf_files, pdf_paths, jobs, cache_folder):
+    """Parst alle PDFs seriell oder über einen Prozess-Pool (jobs=0: alle Kerne); Ergebnisse in Eingabereihenfolge."""
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    if jobs > 1 and len(pdf_paths) > 1:
+        import tracemalloc
+        from concurrent.futures import ProcessPoolExecutor
+
+        logger.info(f"⚙️ Parse {len(pdf_paths)} PDFs mit {jobs} Prozessen...")
+        # Backend-Konfiguration und Speichermessung an die Worker weitergeben (auch bei spawn)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(extraction.current_config(), tracemalloc.is_tracing())) as executor:
+            futures = [executor.submit(_parse_pdf_worker, path, cache_folder) for path in pdf_paths]
+            results = []
+            for filename, future in zip(pdf_files, futures):
+                try:
+                    result, worker_metrics = future.result()
+                    results.append(result)
+                    metrics.merge(worker_metrics)
+                except Exception as e:
+                    logger.error(f"❌ Worker-Fehler bei {filename}: {e}")
+                    results.append((detect_bank_typ(filename), None, 0.0))
+    else:
+        results = []
+        for filename, pdf_path in zip(pdf_files, pdf_paths):
+            logger.info(f"📄 Verarbeite {filename}...")
+            results.append(parse_pdf(pdf_path, cache_folder))
+    return results
+
+
+def main(input_folder=None, output_folder=None, jobs=1, cache_folder=None, storage="csv", db_path=None):
+    """Parst alle PDFs und liefert die gespeicherten Buchungen als {(Bank, Jahr): DataFrame}.
+
+    jobs=0 verteilt die PDFs auf alle Kerne.
+    """
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
     if input_folder is None:
@@ -32,41 +196,110 @@ def main(input_folder=None, output_folder=None):
     volksbank_buchungen = []
     mastercard_buchungen = []
 
-    # Alle PDFs verarbeiten
-    for filename in os.listdir(input_folder):
-        if filename.endswith(".pdf"):
-            pdf_path = os.path.join(input_folder, filename)
-            logger.info(f"📄 Verarbeite {filename}...")
+    pdf_files = [f for f in os.listdir(input_folder) if f.endswith(".pdf")]
+    pdf_paths = [os.path.join(input_folder, f) for f in pdf_files]
 
-            bank_typ = detect_bank_typ(filename)
+    start = time.perf_counter()
 
-            if bank_typ == "volksbank":
-                df_vb = parse_volksbank(pdf_path)
-                volksbank_buchungen.append(df_vb)
+    with metrics.stage("parse"):
+        results = _parse_files(pdf_files, pdf_paths, jobs, cache_folder)
 
-            elif bank_typ == "mastercard":
-                df_mc = parse_mastercard(pdf_path)
-                mastercard_buchungen.append(df_mc)
+    # Ergebnisse in Eingabereihenfolge einsammeln, damit die Ausgabe identisch bleibt
+    for filename, (bank_typ, df, dauer) in zip(pdf_files, results):
+        if bank_typ == "volksbank" and df is not None:
+            volksbank_buchungen.append(df)
+        elif bank_typ == "mastercard" and df is not None:
+            mastercard_buchungen.append(df)
+        elif bank_typ == "unbekannt":
+            logger.warning(f"⚠️ Unbekannter Dateityp: {filename}")
+            continue
 
-            else:
-                logger.warning(f"⚠️ Unbekannter Dateityp: {filename}")
+        anzahl = len(df) if df is not None else 0
+        logger.info(f"⏱️ {filename}: {anzahl} Buchungen in {dauer:.2f}s")
 
-    # ➔ Funktion zum Speichern
-    def save_bookings(df_list, bank_name):
-        if df_list:
-            df = pd.concat(df_list, ignore_index=True)
-            if "Datum" in df.columns:
-                df["Datum"] = pd.to_datetime(df["Datum"], errors="coerce")
-                df = df.dropna(subset=["Datum"])
-                if not df.empty:
-                    for jahr, group in df.groupby(df["Datum"].dt.year):
-                        output_path = os.path.join(output_folder, f"buchungen_{bank_name}_{jahr}.csv")
-                        group.to_csv(output_path, index=False)
-                        logger.info(f"✅ {bank_name.capitalize()}-Buchungen für {jahr} gespeichert: {output_path}")
+    if pdf_paths:
+        logger.info(f"⏱️ {len(pdf_paths)} PDFs in {time.perf_counter() - start:.2f}s geparst")
 
     # ➔ Speichern für beide Banktypen
-    save_bookings(volksbank_buchungen, "volksbank")
-    save_bookings(mastercard_buchungen, "mastercard")
+    ergebnisse = {}
+    with metrics.stage("save_parsed"):
+        for bank_name, df_list in (("volksbank", volksbank_buchungen), ("mastercard", mastercard_buchungen)):
+            for jahr, df in save_bookings(df_list, bank_name, output_folder, storage, db_path).items():
+                ergebnisse[(bank_name, jahr)] = df
+    return ergebnisse
+
+
+def _backend_argument(eintrag):
+    """argparse-Typ für --backend: 'bank=preset' → (Banktyp, Preset)."""
+    bank_typ, trenner, preset = eintrag.partition("=")
+    if not trenner:
+        raise argparse.ArgumentTypeError(f"'{eintrag}' hat nicht die Form BANK=PRESET")
+    if bank_typ not in extraction.DEFAULT_PRESETS:
+        raise argparse.ArgumentTypeError(f"Unbekannter Banktyp '{bank_typ}' (erwartet: {', '.join(extraction.DEFAULT_PRESETS)})")
+    if preset not in extraction.PRESETS:
+        raise argparse.ArgumentTypeError(f"Unbekanntes Preset '{preset}' (verfügbar: {', '.join(extraction.PRESETS)})")
+    return bank_typ, preset
+
+
+def _roi_argument(eintrag):
+    """argparse-Typ für --roi: 'bank=x0,top,x1,bottom' → (Banktyp, bbox)."""
+    bank_typ, _, bbox = eintrag.partition("=")
+    if bank_typ not in extraction.DEFAULT_PRESETS:
+        raise argparse.ArgumentTypeError(f"Unbekannter Banktyp '{bank_typ}' (erwartet: {', '.join(extraction.DEFAULT_PRESETS)})")
+    try:
+        return bank_typ, extraction.validate_bbox(bbox.split(","))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def add_parse_arguments(parser):
+    parser.add_argument("--input", dest="input_folder", default=None, help="Eingabeordner mit PDFs")
+    parser.add_argument("--output", dest="output_folder", default=None, help="Ausgabeordner für Parser-CSVs")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Anzahl paralleler Parser-Prozesse (Standard: 1 = seriell, 0 = alle Kerne)")
+    parser.add_argument("--page-jobs", type=int, default=1,
+                        help="Lange PDFs seitenweise auf so viele Prozesse verteilen (Standard: 1, 0 = alle Kerne); "
+                             "greift, wenn die Dateien nicht schon über -j verteilt werden")
+    parser.add_argument("--cache-dir", default=parse_cache.CACHE_FOLDER, help="Ordner für den Parse-Cache")
+    parser.add_argument("--no-cache", action="store_true", help="Parse-Cache nicht verwenden")
+    parser.add_argument("--clear-cache", nargs="?", const="alle", choices=["alle", "volksbank", "mastercard"],
+                        help="Parse-Cache vor dem Lauf leeren (optional nur für einen Banktyp)")
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default="csv",
+                        help="Ausgabe als CSV-Dateien (Standard) oder in die SQLite-Datenbank")
+    parser.add_argument("--db", dest="db_path", default=None, help="Pfad zur SQLite-Datenbank")
+    parser.add_argument("--backend", action="append", default=[], type=_backend_argument, metavar="BANK=PRESET",
+                        help=f"Text-Extraktion je Banktyp, z. B. volksbank=pdfminer-fast "
+                             f"(Presets: {', '.join(extraction.PRESETS)})")
+    parser.add_argument("--roi", action="append", default=[], type=_roi_argument, metavar="BANK=X0,TOP,X1,BOTTOM",
+                        help="Nur den Tabellenbereich extrahieren (Anteile der Seite), z. B. mastercard=0,0.15,1,0.9")
+    metrics.add_metrics_arguments(parser)
+    add_logging_arguments(parser)
+    return parser
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Parst Volksbank- und Mastercard-PDFs aus dem input/-Ordner.")
+    return add_parse_arguments(parser).parse_args(argv)
+
+
+def resolve_parse_arguments(args):
+    """Wendet --log-level, --clear-cache, --backend, --roi und --page-jobs an und liefert (jobs, cache_folder) für main()."""
+    apply_logging_arguments(args)
+    page_parallel.configure(args.page_jobs)
+    for bank_typ, preset in args.backend:
+        extraction.configure_preset(bank_typ, preset)
+    for bank_typ, bbox in args.roi:
+        extraction.configure_roi(bank_typ, bbox)
+    if args.clear_cache:
+        parse_cache.clear_cache(None if args.clear_cache == "alle" else args.clear_cache, args.cache_dir)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache_folder = None if args.no_cache else args.cache_dir
+    return jobs, cache_folder
+
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    jobs, cache_folder = resolve_parse_arguments(args)
+    with metrics.instrumented_run(args.metrics, args.profile, args.trace_memory, command="scraper.main", jobs=jobs):
+        main(input_folder=args.input_folder, output_folder=args.output_folder, jobs=jobs, cache_folder=cache_folder,
+             storage=args.storage, db_path=args.db_path)
@@ -0,0 +1,254 @@
+# scraper/parser/extraction.py
+
+import copy
+import json
+import hashlib
+from contextlib import contextmanager
+from io import StringIO
+from scraper.utils import metrics
+
+def _pdfminer_pages(pdf_path, laparams=None, pages=None):
+    """Seitenweise wie pdfminers extract_text; laparams=None schaltet die Layout-Analyse ab.
+
+    pages (0-basierte Seitennummern) beschränkt die Extraktion auf einen Seitenbereich.
+    """
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    with open(pdf_path, "rb") as fp, StringIO() as output:
+        rsrcmgr = PDFResourceManager()
+        device = TextConverter(rsrcmgr, output, laparams=LAParams(**laparams) if laparams is not None else None)
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        auswahl = {"pagenos": set(pages), "maxpages": max(pages) + 1} if pages is not None else {}
+        for page in PDFPage.get_pages(fp, **auswahl):
+            interpreter.process_page(page)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+
+
+def _pdfplumber_open(pdf_path, pages):
+    import pdfplumber
+
+    if pages is None:
+        return pdfplumber.open(pdf_path)
+    return pdfplumber.open(pdf_path, pages=[p + 1 for p in pages])
+
+
+def _pdfplumber_pages(pdf_path, pages=None, **extract_options):
+    with _pdfplumber_open(pdf_path, pages) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text(**extract_options) or ""
+            # Layout-Cache der Seite freigeben, damit nur eine Seite im Speicher liegt
+            close = getattr(page, "close", None)
+            if close:
+                close()
+            yield text
+
+
+def _group_lines(words, y_tolerance):
+    zeilen = []
+    for word in sorted(words, key=lambda w: (round(w["top"]), w["x0"])):
+        if zeilen and abs(word["top"] - zeilen[-1][0]) <= y_tolerance:
+            zeilen[-1][1].append(word)
+        else:
+            zeilen.append((word["top"], [word]))
+    return [sorted(ws, key=lambda w: w["x0"]) for _, ws in zeilen]
+
+
+def _marker_lines(page, bbox, marker):
+    """Zeilen mit einem der marker aus einem Streifen der Seite (nur dieser wird extrahiert)."""
+    text = page.crop(bbox).extract_text() or ""
+    return [zeile for zeile in text.splitlines() if any(m in zeile for m in marker)]
+
+
+def _pdfplumber_roi_pages(pdf_path, bbox=(0.0, 0.0, 1.0, 1.0), y_tolerance=3, marker=(), pages=None):
+    """Extrahiert nur den Tabellenbereich einer Seite über pdfplumbers Zuschnitt und Wortkoordinaten.
+
+    bbox ist (x0, top, x1, bottom) als Anteil der Seitengröße. Zeilen mit einem der marker
+    (Start-/Endmarker des Parsers) werden zusätzlich aus den Streifen über und unter der bbox
+    geholt und davor bzw. dahinter gestellt.
+    """
+    with _pdfplumber_open(pdf_path, pages) as pdf:
+        for page in pdf.pages:
+            x0, top, x1, bottom = bbox
+            oben, unten = top * page.height, bottom * page.height
+            region = page.crop((x0 * page.width, oben, x1 * page.width, unten))
+            words = region.extract_words(keep_blank_chars=False, use_text_flow=False)
+            zeilen = [" ".join(w["text"] for w in ws) for ws in _group_lines(words, y_tolerance)]
+            if marker and oben > 0:
+                zeilen = _marker_lines(page, (0, 0, page.width, oben), marker) + zeilen
+            if marker and unten < page.height:
+                zeilen += _marker_lines(page, (0, unten, page.width, page.height), marker)
+            close = getattr(page, "close", None)
+            if close:
+                close()
+            yield "\n".join(zeilen)
+
+
+def _pypdfium2_pages(pdf_path, pages=None):
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(pdf_path)
+    try:
+        for index in (range(len(pdf)) if pages is None else pages):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            # pdfium liefert \r\n – für die Parser auf \n vereinheitlichen
+            yield textpage.get_text_range().replace("\r\n", "\n")
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+
+
+BACKENDS = {
+    "pdfminer": _pdfminer_pages,
+    "pdfplumber": _pdfplumber_pages,
+    "pypdfium2": _pypdfium2_pages,
+    "pdfplumber-roi": _pdfplumber_roi_pages,
+}
+
+# Zeilen, an denen die Parser Beginn und Ende der Buchungen erkennen – ein Zuschnitt darf
+# sie nicht entfernen, sonst bleibt das Ergebnis leer bzw. läuft über das Seitenende hinaus
+ROI_MARKER = {
+    "volksbank": (),
+    "mastercard": ("Buchungs-Beleg-", "Umsatzaufstellung", "Seite:", "Zwischensaldo"),
+}
+
+# Tabellenbereich je Bank-Layout für das ROI-Backend. Als Anteil der Seite,
+# damit A4 und Letter funktionieren. Ohne --roi bzw. configure_roi ist das die ganze Seite,
+# das Preset schneidet dann nichts zu – den Bereich vorher mit scraper.tools.backend_benchmark
+# gegen echte Auszüge abgleichen.
+ROI_LAYOUTS = {
+    bank_typ: {"bbox": (0.0, 0.0, 1.0, 1.0), "marker": marker}
+    for bank_typ, marker in ROI_MARKER.items()
+}
+
+
+# Benannte Kombinationen aus Backend und Layout-Parametern
+PRESETS = {
+    "pdfminer": ("pdfminer", {"laparams": {}}),
+    # Ohne hierarchische Textbox-Sortierung – deutlich schneller bei einspaltigen Tabellen
+    "pdfminer-fast": ("pdfminer", {"laparams": {"boxes_flow": None}}),
+    # Ganz ohne Layout-Analyse
+    "pdfminer-raw": ("pdfminer", {"laparams": None}),
+    "pdfplumber": ("pdfplumber", {}),
+    "pypdfium2": ("pypdfium2", {}),
+    # Nur den Tabellenbereich aus ROI_LAYOUTS extrahieren
+    "pdfplumber-roi": ("pdfplumber-roi", None),
+}
+
+
+# Standard-Preset je Banktyp – entspricht dem bisherigen Verhalten der Parser
+# (pdfplumber-roi bleibt opt-in: laut backend_benchmark auf beiden Layouts langsamer)
+DEFAULT_PRESETS = {
+    "volksbank": "pdfminer",
+    "mastercard": "pdfplumber",
+}
+
+_backends = {}
+
+
+def configure_preset(bank_typ, preset):
+    if preset not in PRESETS:
+        raise ValueError(f"Unbekanntes Extraktions-Preset: {preset} (verfügbar: {', '.join(PRESETS)})")
+    backend, options = PRESETS[preset]
+    if options is None:
+        options = ROI_LAYOUTS.get(bank_typ, {})
+    configure_backend(bank_typ, backend, **copy.deepcopy(options))
+
+
+def configure_backend(bank_typ, backend, **options):
+    """Setzt Backend und Optionen (z. B. laparams=None für pdfminer ohne Layout-Analyse) für einen Banktyp."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unbekanntes Extraktions-Backend: {backend}")
+    _backends[bank_typ] = {"backend": backend, "options": options}
+
+
+for _bank_typ, _preset in DEFAULT_PRESETS.items():
+    configure_preset(_bank_typ, _preset)
+
+
+def current_config():
+    return copy.deepcopy(_backends)
+
+
+def apply_config(config):
+    """Übernimmt eine Konfiguration aus current_config(), z. B. in Worker-Prozessen."""
+    _backends.clear()
+    _backends.update(copy.deepcopy(config))
+
+
+@contextmanager
+def use_preset(bank_typ, preset):
+    """Setzt das Backend eines Banktyps vorübergehend, z. B. für Benchmarks."""
+    vorher = copy.deepcopy(_backends.get(bank_typ))
+    configure_preset(bank_typ, preset)
+    try:
+        yield
+    finally:
+        if vorher is None:
+            _backends.pop(bank_typ, None)
+        else:
+            _backends[bank_typ] = vorher
+
+
+def validate_bbox(bbox):
+    """Prüft (x0, top, x1, bottom) als Anteile der Seite; ValueError bei ungültigen Werten."""
+    bbox = tuple(float(wert) for wert in bbox)
+    if len(bbox) != 4:
+        raise ValueError(f"bbox braucht 4 Werte x0,top,x1,bottom, nicht {len(bbox)}")
+    x0, top, x1, bottom = bbox
+    if not (0.0 <= x0 < x1 <= 1.0 and 0.0 <= top < bottom <= 1.0):
+        raise ValueError(f"bbox {bbox} muss 0 <= x0 < x1 <= 1 und 0 <= top < bottom <= 1 erfüllen")
+    return bbox
+
+
+def configure_roi(bank_typ, bbox, y_tolerance=3):
+    """Setzt den Tabellenbereich eines Bank-Layouts und aktiviert das ROI-Backend dafür.
+
+    Die Start-/Endmarker des Parsers (ROI_MARKER) bleiben auch außerhalb des Bereichs erhalten.
+    """
+    ROI_LAYOUTS[bank_typ] = {"bbox": validate_bbox(bbox), "y_tolerance": y_tolerance,
+                             "marker": ROI_MARKER.get(bank_typ, ())}
+    configure_preset(bank_typ, "pdfplumber-roi")
+
+
+def config_key(bank_typ):
+    """Kurzer Schlüssel der aktuellen Backend-Konfiguration – Teil des Parse-Cache-Schlüssels."""
+    config = _backends.get(bank_typ, {})
+    digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    return f"{config.get('backend', 'default')}-{digest}"
+
+
+def page_count(pdf_path):
+    """Seitenzahl aus dem Seitenbaum der PDF, ohne Seiteninhalte zu lesen."""
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import resolve1
+
+    with open(pdf_path, "rb") as fp:
+        document = PDFDocument(PDFParser(fp))
+        anzahl = resolve1(resolve1(document.catalog.get("Pages")).get("Count"))
+        if isinstance(anzahl, int):
+            return anzahl
+        return sum(1 for _ in PDFPage.create_pages(document))
+
+
+def iter_page_texts(pdf_path, bank_typ, pages=None):
+    """Generator: liefert den Text Seite für Seite mit dem für den Banktyp konfigurierten Backend.
+
+    pages (0-basierte Seitennummern, z. B. ein range) liest nur diese Seiten.
+    """
+    config = _backends.get(bank_typ) or {"backend": "pdfminer", "options": {"laparams": {}}}
+    if pages is not None:
+        if not len(pages):
+            return
+        config = {**config, "options": {**config["options"], "pages": pages}}
+    for text in BACKENDS[config["backend"]](pdf_path, **config["options"]):
+        metrics.count("pages_extracted")
+        yield text
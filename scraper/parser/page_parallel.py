@@ -0,0 +1,78 @@
+# scraper/parser/page_parallel.py
+
+import os
+from scraper.parser import extraction, registry
+from scraper.utils import metrics
+from scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Unterhalb dieser Seitenzahl kostet der Prozessstart mehr, als die Aufteilung spart
+MIN_PAGES = 40
+# Jeder Seitenbereich öffnet die PDF neu – Bereiche nicht kleiner als das machen
+MIN_PAGES_PER_RANGE = 10
+
+# Prozesse je PDF (1 = seriell), gesetzt über configure() bzw. --page-jobs
+_config = {"jobs": 1}
+
+
+def configure(jobs):
+    """Setzt die Anzahl Prozesse, auf die eine einzelne lange PDF verteilt wird (0 = alle Kerne)."""
+    _config["jobs"] = jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+def current_jobs():
+    return _config["jobs"]
+
+
+def split_pages(seitenzahl, teile, min_seiten=None):
+    """Teilt die Seiten in höchstens teile zusammenhängende, etwa gleich große Bereiche."""
+    min_seiten = min_seiten or MIN_PAGES_PER_RANGE
+    teile = max(1, min(teile, seitenzahl // min_seiten))
+    grenzen = [seitenzahl * i // teile for i in range(teile + 1)]
+    return [range(start, ende) for start, ende in zip(grenzen, grenzen[1:])]
+
+
+def _init_worker(config):
+    extraction.apply_config(config)
+
+
+def _parse_range_worker(bank_typ, pdf_path, pages):
+    """Extrahiert und parst einen Seitenbereich; liefert zusätzlich die Metriken des Workers."""
+    metrics.reset()
+    parse_range, _ = registry.get_page_functions(bank_typ)
+    return parse_range(pdf_path, pages), metrics.snapshot()
+
+
+def parse_pages(pdf_path, bank_typ, jobs=None):
+    """Parst eine PDF seitenparallel und liefert die in Seitenreihenfolge zusammengefügten Buchungen.
+
+    Liefert None, wenn sich die Aufteilung nicht lohnt (ein Prozess oder zu wenige Seiten) –
+    dann parst der Aufrufer wie bisher seriell. Das Ergebnis entspricht dem seriellen Parsen,
+    auch wenn ein Verwendungszweck über eine Bereichsgrenze weiterläuft.
+    """
+    jobs = jobs or _config["jobs"]
+    if jobs <= 1:
+        return None
+    seitenzahl = extraction.page_count(pdf_path)
+    if seitenzahl < MIN_PAGES:
+        return None
+    bereiche = split_pages(seitenzahl, jobs)
+    if len(bereiche) < 2:
+        return None
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    _, stitch = registry.get_page_functions(bank_typ)
+    logger.info(f"⚙️ {os.path.basename(pdf_path)}: {seitenzahl} Seiten in {len(bereiche)} Bereichen parallel")
+    with ProcessPoolExecutor(max_workers=len(bereiche), initializer=_init_worker,
+                             initargs=(extraction.current_config(),)) as executor:
+        futures = [executor.submit(_parse_range_worker, bank_typ, pdf_path, bereich) for bereich in bereiche]
+        teile = []
+        for future in futures:
+            teil, worker_metrics = future.result()
+            metrics.merge(worker_metrics)
+            teile.append(teil)
+
+    with metrics.stage("stitch_pages"):
+        return stitch(teile)
@@ -1,82 +1,139 @@
 # scraper/parser/parser_mastercard.py
 import re
 import pandas as pd
-import pdfplumber
+from scraper.parser.extraction import iter_page_texts
+from scraper.parser import page_parallel
 from scraper.utils.utils import extract_jahr_from_filename
 from scraper.utils.logger import setup_logger
 from scraper.utils.utils import create_empty_transaction_dataframe
+from scraper.parser.records import TransactionColumns, betrag_to_cent
+from scraper.utils import metrics
 
 logger = setup_logger(__name__)
 
-def parse_mastercard(pdf_path):
-    logger.info(f"\n🔨 parse_mastercard() wird aufgerufen für {pdf_path}")
+# Bei jeder Änderung an Regex oder Ausgabeformat erhöhen – invalidiert den Parse-Cache
+PARSER_VERSION = 2
 
-    buchungen = []
+# Mastercard-Buchungserkennung
+PATTERN = re.compile(
+    r"(\d{2}\.\d{2}\.)\s+(\d{2}\.\d{2}\.)\s+(.*?)\s+(\d{1,3}(?:\.\d{3})*,\d{2})([+-])?$"
+)
 
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-    except Exception as e:
-        logger.warning(f"❌ Fehler beim Lesen von {pdf_path}: {e}")
-        return pd.DataFrame()
 
-    jahr = extract_jahr_from_filename(pdf_path)
+def iter_page_lines(pdf_path, pages=None):
+    """Generator: extrahiert die PDF Seite für Seite und liefert die nicht-leeren Zeilen.
+
+    Weitere Seiten werden erst extrahiert, wenn der Aufrufer sie anfordert.
+    """
+    for text in iter_page_texts(pdf_path, "mastercard", pages):
+        for line in text.splitlines():
+            line = line.strip()
+            if line:
+                yield line
+
 
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
+def _ist_kopfzeile(line):
+    return "Buchungs-Beleg-" in line or "Umsatzaufstellung" in line
 
-    # Mastercard-Buchungserkennung
-    pattern = re.compile(
-        r"(\d{2}\.\d{2}\.)\s+(\d{2}\.\d{2}\.)\s+(.*?)\s+(\d{1,3}(?:\.\d{3})*,\d{2})([+-])?$"
-    )
 
-    current = None
-    start_parsing = False
+def _scan(lines, columns, start_parsing):
+    """Kern von collect_buchungen; liefert (Zeilen, Treffer, ob ein Endmarker erreicht wurde)."""
+    zeilen = treffer = 0
 
-    for idx, line in enumerate(lines):
+    for line in lines:
+        zeilen += 1
         if not start_parsing:
-            if "Buchungs-Beleg-" in line or "Umsatzaufstellung" in line:
+            if _ist_kopfzeile(line):
                 start_parsing = True
             continue
 
         if "Seite:" in line or "Zwischensaldo" in line:
-            break
+            return zeilen, treffer, True
 
-        match = pattern.match(line)
+        match = PATTERN.match(line)
         if match:
-            if current:
-                buchungen.append(current)
-
-            datum_buchung = match.group(1)
-            belegdatum = match.group(2)
-            verwendungszweck = match.group(3).strip()
-            betrag_raw = match.group(4)
-            vorzeichen = match.group(5) if match.group(5) else "+"
-
-            # Betrag verarbeiten
-            betrag = float(betrag_raw.replace('.', '').replace(',', '.'))
-            if vorzeichen == "-":
-                betrag = -betrag
-
-            # Datum verarbeiten
-            try:
-                datum = pd.to_datetime(f"{datum_buchung}{jahr}", format="%d.%m.%Y", errors="coerce")
-            except Exception:
-                datum = pd.NaT
-
-            current = {
-                "Datum": datum,
-                "Verwendungszweck": verwendungszweck,
-                "Betrag": betrag
-            }
+            treffer += 1
+            # Betrag exakt in Cent verarbeiten
+            betrag_cent = betrag_to_cent(match.group(4))
+            if match.group(5) == "-":
+                betrag_cent = -betrag_cent
+
+            columns.add(match.group(1), match.group(3).strip(), betrag_cent)
         else:
-            if current:
-                current["Verwendungszweck"] += " " + line
+            # Fortsetzungszeilen – auch über Seitengrenzen hinweg
+            columns.append_text(line)
+
+    return zeilen, treffer, False
+
+
+def collect_buchungen(lines, columns=None):
+    """Sammelt die Buchungen spaltenweise und stoppt beim ersten Seiten-/Zwischensaldo-Marker."""
+    columns = columns if columns is not None else TransactionColumns()
+    zeilen, treffer, _ = _scan(lines, columns, False)
+    metrics.count("lines_scanned", zeilen)
+    metrics.count("regex_hits", treffer)
+    return columns
+
+
+def parse_page_range(pdf_path, pages):
+    """Parst nur die Seiten pages, ohne zu wissen, ob die Kopfzeile schon vorher kam.
+
+    Liefert beide Lesarten als (Buchungen, Endmarker erreicht): "fortgesetzt", falls das
+    Parsen in einem früheren Bereich begonnen hat, und "gestartet", falls erst eine
+    Kopfzeile in diesem Bereich es startet (None ohne Kopfzeile).
+    """
+    lines = list(iter_page_lines(pdf_path, pages))
+    ergebnis = {"fortgesetzt": None, "gestartet": None}
+
+    # Vor der ersten Seite kann das Parsen noch nicht begonnen haben
+    if pages.start > 0:
+        columns = TransactionColumns()
+        zeilen, treffer, gestoppt = _scan(lines, columns, True)
+        metrics.count("lines_scanned", zeilen)
+        metrics.count("regex_hits", treffer)
+        ergebnis["fortgesetzt"] = (columns, gestoppt)
+
+    kopf = next((i for i, line in enumerate(lines) if _ist_kopfzeile(line)), None)
+    if kopf is not None:
+        columns = TransactionColumns()
+        zeilen, treffer, gestoppt = _scan(lines[kopf + 1:], columns, True)
+        if pages.start == 0:
+            metrics.count("lines_scanned", kopf + 1 + zeilen)
+            metrics.count("regex_hits", treffer)
+        ergebnis["gestartet"] = (columns, gestoppt)
+    return ergebnis
+
+
+def stitch_page_ranges(teile):
+    """Fügt die Ergebnisse von parse_page_range in Seitenreihenfolge wie beim seriellen Parsen zusammen."""
+    columns = TransactionColumns()
+    gestartet = False
+    for teil in teile:
+        ergebnis = teil["fortgesetzt"] if gestartet else teil["gestartet"]
+        if ergebnis is None:
+            continue
+        gestartet = True
+        columns.extend(ergebnis[0])
+        if ergebnis[1]:
+            break
+    return columns
+
+
+def parse_mastercard(pdf_path):
+    logger.info(f"\n🔨 parse_mastercard() wird aufgerufen für {pdf_path}")
+
+    jahr = extract_jahr_from_filename(pdf_path)
 
-    if current:
-        buchungen.append(current)
+    try:
+        # Lange Auszüge bei --page-jobs > 1 auf mehrere Prozesse verteilen
+        buchungen = page_parallel.parse_pages(pdf_path, "mastercard")
+        if buchungen is None:
+            buchungen = collect_buchungen(iter_page_lines(pdf_path))
+    except Exception as e:
+        logger.warning(f"❌ Fehler beim Lesen von {pdf_path}: {e}")
+        return pd.DataFrame()
 
     logger.info(f"✅ Insgesamt {len(buchungen)} Mastercard-Buchungen extrahiert!")
-    if not buchungen:
+    if not len(buchungen):
         return create_empty_transaction_dataframe()
-    return pd.DataFrame(buchungen)
-
+    return buchungen.to_dataframe(jahr)
@@ -1,71 +1,92 @@
 # scraper/parser/parser_volksbank.py
 import re
 import pandas as pd
-from pdfminer.high_level import extract_text
+from scraper.parser.extraction import iter_page_texts
+from scraper.parser import page_parallel
 from scraper.utils.utils import extract_jahr_from_filename
 from scraper.utils.logger import setup_logger
 from scraper.utils.utils import create_empty_transaction_dataframe
+from scraper.parser.records import TransactionColumns, betrag_to_cent
+from scraper.utils import metrics
 
 logger = setup_logger(__name__)
 
-def parse_volksbank(pdf_path):
-    buchungen = []
-    logger.info(f"\n🔨 parse_volksbank() wird aufgerufen für {pdf_path}")
+# Bei jeder Änderung an Regex oder Ausgabeformat erhöhen – invalidiert den Parse-Cache
+PARSER_VERSION = 2
 
-    try:
-        text = extract_text(pdf_path)
-    except Exception as e:
-        logger.warning(f"❌ Fehler beim Lesen von {pdf_path}: {e}")
-        return pd.DataFrame()
+PATTERN = re.compile(r"(\d{2}\.\d{2}\.)\s+(\d{2}\.\d{2}\.)\s+(.*?)\s+(\d{1,3}(?:\.\d{3})*,\d{2})\s+([SH])$")
 
-    lines = text.splitlines()
-    current_buchung = None
 
-    # ➡️ Jahr direkt aus Dateinamen auslesen:
-    jahr_from_filename = extract_jahr_from_filename(pdf_path)
+def extract_pages_text(pdf_path, pages=None):
+    """Generator: liefert den Text Seite für Seite über das für Volksbank konfigurierte Backend.
 
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
+    Es liegt immer nur der Text der aktuellen Seite im Speicher.
+    """
+    return iter_page_texts(pdf_path, "volksbank", pages)
 
-        match = re.match(r"(\d{2}\.\d{2}\.)\s+(\d{2}\.\d{2}\.)\s+(.*?)\s+(\d{1,3}(?:\.\d{3})*,\d{2})\s+([SH])$", line)
+
+def iter_lines(pages):
+    for text in pages:
+        for line in text.splitlines():
+            line = line.strip()
+            if line:
+                yield line
+
+
+def collect_buchungen(lines, columns=None):
+    """Sammelt die Buchungen spaltenweise; Fortsetzungszeilen dürfen über Seitengrenzen gehen."""
+    columns = columns if columns is not None else TransactionColumns()
+    zeilen = treffer = 0
+
+    for line in lines:
+        zeilen += 1
+        match = PATTERN.match(line)
 
         if match:
-            if current_buchung:
-                buchungen.append(current_buchung)
-
-            datum_raw = match.group(1)
-            verwendungszweck = match.group(3).strip()
-            betrag_raw = match.group(4)
-            soll_haben = match.group(5)
-
-            betrag = float(betrag_raw.replace('.', '').replace(',', '.'))
-            if soll_haben == 'S':
-                betrag = -betrag
-
-            # 📅 Datum verarbeiten:
-            try:
-                datum = pd.to_datetime(f"{datum_raw}{jahr_from_filename}", format="%d.%m.%Y", errors="coerce")
-            except Exception:
-                datum = pd.NaT
-
-            current_buchung = {
-                "Datum": datum,
-                "Verwendungszweck": verwendungszweck,
-                "Betrag": betrag
-            }
+            treffer += 1
+            betrag_cent = betrag_to_cent(match.group(4))
+            if match.group(5) == 'S':
+                betrag_cent = -betrag_cent
+
+            columns.add(match.group(1), match.group(3).strip(), betrag_cent)
         else:
-            if current_buchung:
-                current_buchung["Verwendungszweck"] += " " + line
+            columns.append_text(line)
 
-    if current_buchung:
-        buchungen.append(current_buchung)
+    metrics.count("lines_scanned", zeilen)
+    metrics.count("regex_hits", treffer)
+    return columns
 
-    logger.info(f"✅ {len(buchungen)} Buchungen erfolgreich extrahiert!")
 
-    if not buchungen:
-        return create_empty_transaction_dataframe()
-    return pd.DataFrame(buchungen)
+def parse_page_range(pdf_path, pages):
+    """Parst nur die Seiten pages; Fortsetzungszeilen am Anfang landen im Vorspann des Ergebnisses."""
+    return collect_buchungen(iter_lines(extract_pages_text(pdf_path, pages)))
 
 
+def stitch_page_ranges(teile):
+    """Fügt die Ergebnisse von parse_page_range in Seitenreihenfolge zusammen."""
+    columns = TransactionColumns()
+    for teil in teile:
+        columns.extend(teil)
+    return columns
+
+
+def parse_volksbank(pdf_path):
+    logger.info(f"\n🔨 parse_volksbank() wird aufgerufen für {pdf_path}")
+
+    # ➡️ Jahr direkt aus Dateinamen auslesen:
+    jahr_from_filename = extract_jahr_from_filename(pdf_path)
+
+    try:
+        # Lange Auszüge bei --page-jobs > 1 auf mehrere Prozesse verteilen
+        buchungen = page_parallel.parse_pages(pdf_path, "volksbank")
+        if buchungen is None:
+            buchungen = collect_buchungen(iter_lines(extract_pages_text(pdf_path)))
+    except Exception as e:
+        logger.warning(f"❌ Fehler beim Lesen von {pdf_path}: {e}")
+        return pd.DataFrame()
+
+    logger.info(f"✅ {len(buchungen)} Buchungen erfolgreich extrahiert!")
+
+    if not len(buchungen):
+        return create_empty_transaction_dataframe()
+    return buchungen.to_dataframe(jahr_from_filename)
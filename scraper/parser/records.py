@@ -0,0 +1,70 @@
+# scraper/parser/records.py
+from array import array
+import numpy as np
+import pandas as pd
+
+
+def betrag_to_cent(betrag_raw):
+    """Wandelt einen deutschen Betrag wie '1.234,56' exakt in Cent um."""
+    return int(betrag_raw.replace('.', '').replace(',', ''))
+
+
+class TransactionColumns:
+    """Spaltenweiser Sammler für geparste Buchungen.
+
+    Tag, Monat und Betrag (in Cent) liegen in typisierten Arrays; das Datum wird
+    erst in to_dataframe() in einem einzigen vektorisierten Aufruf gebildet.
+    """
+
+    def __init__(self):
+        self.tag = array("B")
+        self.monat = array("B")
+        self.betrag_cent = array("q")
+        self.verwendungszweck = []
+        # Fortsetzungszeilen vor der ersten Buchung – beim seitenparallelen Parsen
+        # gehören sie zur letzten Buchung des vorherigen Seitenbereichs
+        self.vorspann = []
+
+    def __len__(self):
+        return len(self.verwendungszweck)
+
+    def add(self, datum_raw, verwendungszweck, betrag_cent):
+        """Fügt eine Buchung hinzu; datum_raw hat das Format 'TT.MM.'."""
+        self.tag.append(int(datum_raw[0:2]))
+        self.monat.append(int(datum_raw[3:5]))
+        self.betrag_cent.append(betrag_cent)
+        self.verwendungszweck.append(verwendungszweck)
+
+    def append_text(self, line):
+        """Hängt eine Fortsetzungszeile an den Verwendungszweck der letzten Buchung an."""
+        if self.verwendungszweck:
+            self.verwendungszweck[-1] += " " + line
+            return True
+        self.vorspann.append(line)
+        return False
+
+    def extend(self, other):
+        """Hängt die Buchungen eines folgenden Seitenbereichs an, inklusive seiner Fortsetzungszeilen."""
+        for line in other.vorspann:
+            self.append_text(line)
+        self.tag.extend(other.tag)
+        self.monat.extend(other.monat)
+        self.betrag_cent.extend(other.betrag_cent)
+        self.verwendungszweck.extend(other.verwendungszweck)
+
+    def to_dataframe(self, jahr):
+        cent = np.frombuffer(self.betrag_cent, dtype=np.int64).copy() if len(self) else np.empty(0, dtype=np.int64)
+        datum = pd.to_datetime(
+            pd.DataFrame({
+                "year": np.full(len(self), jahr, dtype=np.int64),
+                "month": np.asarray(self.monat, dtype=np.int64),
+                "day": np.asarray(self.tag, dtype=np.int64),
+            }),
+            errors="coerce",
+        )
+        return pd.DataFrame({
+            "Datum": datum,
+            "Verwendungszweck": self.verwendungszweck,
+            "Betrag": cent / 100,
+            "Betrag_Cent": cent,
+        })
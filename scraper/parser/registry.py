@@ -0,0 +1,35 @@
+# scraper/parser/registry.py
+
+import importlib
+
+# Banktyp (Ergebnis von detect_bank_typ) → (Modul, Parser-Funktion)
+PARSERS = {
+    "volksbank": ("scraper.parser.parser_volksbank", "parse_volksbank"),
+    "mastercard": ("scraper.parser.parser_mastercard", "parse_mastercard"),
+}
+
+
+def is_supported(bank_typ):
+    return bank_typ in PARSERS
+
+
+def _load_module(bank_typ):
+    if bank_typ not in PARSERS:
+        raise KeyError(f"Kein Parser für Banktyp: {bank_typ}")
+    # importlib cached das Modul – teure Imports (pandas, pdfplumber, pdfminer) passieren nur beim ersten Aufruf
+    return importlib.import_module(PARSERS[bank_typ][0])
+
+
+def get_parser(bank_typ):
+    """Liefert die Parser-Funktion eines Banktyps und importiert das Modul erst bei Bedarf."""
+    return getattr(_load_module(bank_typ), PARSERS[bank_typ][1])
+
+
+def get_parser_version(bank_typ):
+    return _load_module(bank_typ).PARSER_VERSION
+
+
+def get_page_functions(bank_typ):
+    """(parse_page_range, stitch_page_ranges) eines Parsers für das seitenparallele Parsen."""
+    module = _load_module(bank_typ)
+    return module.parse_page_range, module.stitch_page_ranges
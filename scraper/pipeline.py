@@ -0,0 +1,62 @@
+# scraper/pipeline.py
+
+import sys
+import os
+import time
+import argparse
+
+# Append Projekt-Wurzelverzeichnis
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scraper.main import main as parse_all, add_parse_arguments, resolve_parse_arguments
+from scraper.processor.processor import load_matcher, process_dataframe, save_processed, store_processed
+from scraper.utils import metrics
+from scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def run_pipeline(input_folder=None, parser_output_folder=None, processed_folder=None,
+                 jobs=1, cache_folder=None, storage="csv", db_path=None):
+    """Parsing und Processing in einem Prozess.
+
+    Die geparsten DataFrames gehen direkt in die Verarbeitung, statt über die
+    Parser-CSV neu eingelesen zu werden. Die Dateien auf der Platte entstehen wie bisher.
+    """
+    start = time.perf_counter()
+    geparst = parse_all(input_folder=input_folder, output_folder=parser_output_folder, jobs=jobs,
+                        cache_folder=cache_folder, storage=storage, db_path=db_path)
+    logger.info(f"⏱️ Parsing abgeschlossen in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    matcher = load_matcher()
+    ergebnisse = {}
+    for (bank, jahr), df in geparst.items():
+        logger.info(f"🔧 Verarbeite {bank} {jahr}...")
+        with metrics.stage("process"):
+            processed = process_dataframe(df, matcher)
+        if storage == "sqlite":
+            store_processed(processed, bank, db_path)
+        else:
+            save_processed(processed, f"buchungen_{bank}_{jahr}.csv", processed_folder)
+        ergebnisse[(bank, jahr)] = processed
+    logger.info(f"⏱️ Processing abgeschlossen in {time.perf_counter() - start:.2f}s")
+
+    return ergebnisse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Parst und verarbeitet alle PDFs in einem Prozess.")
+    add_parse_arguments(parser)
+    parser.add_argument("--processed", dest="processed_folder", default=None,
+                        help="Ausgabeordner für verarbeitete CSVs")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    jobs, cache_folder = resolve_parse_arguments(args)
+    with metrics.instrumented_run(args.metrics, args.profile, args.trace_memory, command="scraper.pipeline", jobs=jobs):
+        run_pipeline(input_folder=args.input_folder, parser_output_folder=args.output_folder,
+                     processed_folder=args.processed_folder, jobs=jobs, cache_folder=cache_folder,
+                     storage=args.storage, db_path=args.db_path)
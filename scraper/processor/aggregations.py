@@ -0,0 +1,167 @@
+# scraper/processor/aggregations.py
+
+import pandas as pd
+from scraper.utils import schema
+
+WOCHENTAGE = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def monthly_cashflow(df):
+    """Monatssummen je (Banktyp, Jahr) als DataFrame mit Spalten 1–12."""
+    if df.empty:
+        return pd.DataFrame(columns=range(1, 13))
+    summen = df.groupby(["Banktyp", "Jahr", df["Datum"].dt.month], observed=True)["Betrag"].sum()
+    return summen.unstack(fill_value=0).reindex(columns=range(1, 13), fill_value=0)
+
+
+def top_provider(df, top_n=10):
+    """Die Provider mit dem größten absoluten Gesamtbetrag."""
+    return (
+        df.groupby("Provider", observed=True)["Betrag"]
+        .sum()
+        .abs()
+        .sort_values(ascending=False)
+        .head(top_n)
+        .reset_index()
+        # Nur die Top-N als Text – Diagramme zeigen sonst alle Kategorien als leere Balken
+        .astype({"Provider": str})
+    )
+
+
+def provider_pivot(df, top_n=10):
+    """Summen je Provider und Jahr plus Gesamtspalte, sortiert nach Gesamt."""
+    pivot = df.pivot_table(
+        index="Provider",
+        columns="Jahr",
+        values="Betrag",
+        aggfunc="sum",
+        fill_value=0,
+        observed=True,
+    )
+    pivot["Gesamt"] = pivot.sum(axis=1)
+    return pivot.sort_values("Gesamt", ascending=False).head(top_n)
+
+
+def category_totals(df):
+    """Summe und Anzahl je Kategorie, absteigend nach absolutem Betrag."""
+    spalten = ["Kategorie", "Betrag", "Anzahl"]
+    if df.empty:
+        return pd.DataFrame(columns=spalten)
+    anzahl = df["Anzahl"] if "Anzahl" in df.columns else pd.Series(1, index=df.index)
+    summen = (
+        df.assign(Anzahl=anzahl)
+        .groupby("Kategorie", observed=True)[["Betrag", "Anzahl"]]
+        .sum()
+        .reset_index()
+        .astype({"Kategorie": str})
+    )
+    return summen.reindex(summen["Betrag"].abs().sort_values(ascending=False).index)[spalten].reset_index(drop=True)
+
+
+def weekday_heatmap(df):
+    """Summen je Wochentag (Zeilen) und Monat (Spalten, 'YYYY-MM')."""
+    pivot_table = df.pivot_table(
+        index=df["Datum"].dt.day_name(),
+        columns=df["Datum"].dt.to_period("M").astype(str),
+        values="Betrag",
+        aggfunc="sum",
+        fill_value=0,
+        observed=True,
+    )
+    pivot_table.index.name = "Wochentag"
+    pivot_table.columns.name = "Monat_Year"
+    return pivot_table.reindex(WOCHENTAGE)
+
+
+# === Rollups ===
+# Vorverdichtete Summen, die der Processor mitschreibt. Ihre Größe hängt nur von Monaten,
+# Kategorien und Providern ab, nicht von der Zahl der Buchungen.
+
+ROLLUP_MONTHLY_KEYS = ["Jahr", "Monat", "Kategorie", "Provider"]
+ROLLUP_WEEKDAY_KEYS = ["Jahr", "Monat", "Wochentag", "Kategorie", "Provider"]
+
+
+def _mit_sonstiges(series):
+    # Kategoriale Spalten kennen "Sonstiges" für fehlende Werte nicht zwingend als Kategorie
+    if not series.hasnans:
+        return series
+    if isinstance(series.dtype, pd.CategoricalDtype) and "Sonstiges" not in series.cat.categories:
+        series = series.cat.add_categories("Sonstiges")
+    return series.fillna("Sonstiges")
+
+
+def _rollup(df, keys):
+    datum = pd.to_datetime(df["Datum"], errors="coerce")
+    if "Betrag_Cent" in df.columns:
+        cent = pd.to_numeric(df["Betrag_Cent"], errors="coerce").fillna((df["Betrag"] * 100).round())
+    else:
+        cent = (df["Betrag"] * 100).round()
+    basis = pd.DataFrame({
+        "Jahr": datum.dt.year,
+        "Monat": datum.dt.month,
+        "Wochentag": datum.dt.dayofweek,
+        "Kategorie": _mit_sonstiges(df["Kategorie"]),
+        "Provider": _mit_sonstiges(df["Provider"]),
+        "Betrag_Cent": cent.astype("int64"),
+    })[datum.notna().to_numpy()]
+    rollup = basis.groupby(keys, sort=True, observed=True)["Betrag_Cent"].agg(["sum", "size"]).reset_index()
+    rollup = rollup.rename(columns={"sum": "Betrag_Cent", "size": "Anzahl"})
+    rollup["Betrag"] = rollup["Betrag_Cent"] / 100
+    return schema.apply_schema(rollup, schema.ROLLUP_SCHEMA)
+
+
+def build_monthly_rollup(df):
+    """Summen und Anzahl je Jahr × Monat × Kategorie × Provider aus verarbeiteten Buchungen."""
+    return _rollup(df, ROLLUP_MONTHLY_KEYS)
+
+
+def build_weekday_rollup(df):
+    """Summen und Anzahl je Jahr × Monat × Wochentag (0 = Montag) × Kategorie × Provider."""
+    return _rollup(df, ROLLUP_WEEKDAY_KEYS)
+
+
+def merge_rollups(*rollups):
+    """Fasst Rollups gleicher Art zusammen, z. B. vorhandene Summen und die einer neuen PDF."""
+    rollups = [r for r in rollups if r is not None and not r.empty]
+    if not rollups:
+        return None
+    combined = schema.concat(rollups, schema.ROLLUP_SCHEMA)
+    keys = [k for k in ROLLUP_WEEKDAY_KEYS if k in combined.columns]
+    merged = combined.groupby(keys, sort=True, observed=True)[["Betrag_Cent", "Anzahl"]].sum().reset_index()
+    merged["Betrag"] = merged["Betrag_Cent"] / 100
+    return schema.apply_schema(merged, schema.ROLLUP_SCHEMA)
+
+
+def monthly_cashflow_from_rollup(rollup):
+    """Wie monthly_cashflow, aber aus dem Monats-Rollup (Spalten Banktyp und Jahr wie im Dashboard)."""
+    if rollup.empty:
+        return pd.DataFrame(columns=range(1, 13))
+    summen = rollup.groupby(["Banktyp", "Jahr", "Monat"], observed=True)["Betrag"].sum()
+    return summen.unstack(fill_value=0).reindex(columns=range(1, 13), fill_value=0)
+
+
+def top_provider_from_rollup(rollup, top_n=10):
+    return top_provider(rollup, top_n)
+
+
+def category_totals_from_rollup(rollup):
+    return category_totals(rollup)
+
+
+def provider_pivot_from_rollup(rollup, top_n=10):
+    return provider_pivot(rollup, top_n)
+
+
+def weekday_heatmap_from_rollup(rollup):
+    """Wie weekday_heatmap, aber aus dem Wochentags-Rollup."""
+    pivot_table = rollup.pivot_table(
+        index=rollup["Wochentag"].map(dict(enumerate(WOCHENTAGE))),
+        columns=rollup["Jahr"].astype(int).astype(str) + "-" + rollup["Monat"].astype(int).map("{:02d}".format),
+        values="Betrag",
+        aggfunc="sum",
+        fill_value=0,
+        observed=True,
+    )
+    pivot_table.index.name = "Wochentag"
+    pivot_table.columns.name = "Monat_Year"
+    return pivot_table.reindex(WOCHENTAGE)
@@ -1,11 +1,20 @@
 # scraper/processor/processor.py
 import os
+import argparse
+import numpy as np
 import pandas as pd
 import json
 import re
+import time
+import shutil
 import datetime
-from scraper.utils.utils import normalize_text
-from scraper.utils.logger import setup_logger
+from functools import lru_cache
+from scraper.utils.logger import setup_logger, add_logging_arguments, apply_logging_arguments
+from scraper.utils.provider_matcher import ProviderMatcher, get_matcher
+from scraper.utils.utils import append_csv
+from scraper.storage import sqlite_store
+from scraper.processor import aggregations
+from scraper.utils import metrics, schema
 
 logger = setup_logger(__name__)
 
@@ -13,6 +22,14 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 INPUT_FOLDER = os.path.join(BASE_DIR, "output", "parser_output")
 OUTPUT_FOLDER = os.path.join(BASE_DIR, "output", "processed")
 
+# Zeilen je Block im speicherschonenden Modus (process_file mit chunksize)
+CHUNK_ROWS = 100_000
+
+# Unscharfe Vorschläge ersetzen "Sonstiges" nur, wenn eine Schwelle gesetzt ist
+# (--fuzzy-threshold oder ${FUZZY_ENV}); ohne Angabe bleibt es bei exakten Treffern
+FUZZY_THRESHOLD = None
+FUZZY_ENV = "BANKDATEN_FUZZY_THRESHOLD"
+
 
 def load_mapping():
     mapping_path = os.path.join(BASE_DIR, "mapping", "provider_mapping.json")
@@ -23,93 +40,516 @@ def load_mapping():
         return json.load(f)
 
 
-def map_verwendungszweck(zeile, mapping):
-    verwendungszweck = normalize_text(str(zeile))
-    matches = []
-    for provider, kategorie in mapping.items():
-        normalized_provider = normalize_text(provider)
-        if normalized_provider in verwendungszweck:
-            matches.append((provider, kategorie))
+def fuzzy_threshold(value=None):
+    """Schwelle aus Argument, sonst ${FUZZY_ENV}, sonst FUZZY_THRESHOLD (aus); "off" schaltet ab (None)."""
+    value = value if value is not None else os.environ.get(FUZZY_ENV)
+    if value is None:
+        return FUZZY_THRESHOLD
+    if str(value).lower() in ("off", "none", ""):
+        return None
+    return float(value)
 
-    if matches:
-        provider, kategorie = sorted(matches, key=lambda x: len(x[0]), reverse=True)[0]
-        return provider, kategorie
 
-    return "Sonstiges", "Sonstiges"
+def load_matcher(fuzzy=None):
+    """Lädt das Mapping und kompiliert es einmalig zu einem ProviderMatcher."""
+    return ProviderMatcher(load_mapping(), fuzzy_threshold=fuzzy_threshold(fuzzy))
 
 
-ENTGELT_KEYWORDS = ["Auslandseinsatzentgelt", "Barauszahlungsgebühr"]
+def map_verwendungszweck(zeile, mapping):
+    """Ordnet den längsten enthaltenen Provider zu; mapping darf ein dict oder ein ProviderMatcher sein."""
+    match = get_matcher(mapping).longest_match(str(zeile))
+    if match:
+        return match
+
+    return "Sonstiges", "Sonstiges"
 
-def extract_entgelt_and_create_new_rows(df):
-    new_rows = []
 
-    for index, row in df.iterrows():
-        verwendungszweck = row['Verwendungszweck']
+def categorize_verwendungszwecke(verwendungszwecke, matcher):
+    """Ordnet eine ganze Spalte zu: jeder eindeutige Verwendungszweck wird nur einmal gematcht.
+
+    Hat der Matcher eine fuzzy_threshold, werden alle Verwendungszwecke ohne exakten Treffer
+    anschließend in einem Batch über den n-Gramm-Index nachgeordnet.
+    Liefert einen DataFrame mit den kategorialen Spalten Provider und Kategorie und gleichem Index.
+    """
+    codes, uniques = pd.factorize(verwendungszwecke, use_na_sentinel=False)
+
+    providers = np.empty(len(uniques), dtype=object)
+    kategorien = np.empty(len(uniques), dtype=object)
+    offen = []
+    for i, vz in enumerate(uniques):
+        providers[i], kategorien[i] = map_verwendungszweck(vz, matcher)
+        if providers[i] == "Sonstiges" and not pd.isna(vz):
+            offen.append(i)
+
+    threshold = getattr(matcher, "fuzzy_threshold", None)
+    if offen and threshold is not None:
+        with metrics.stage("categorize_fuzzy"):
+            offen = np.asarray(offen)
+            indices, scores = matcher.ngram_index().suggest(uniques[offen])
+            treffer = (indices >= 0) & (scores >= threshold)
+            for i, idx in zip(offen[treffer], indices[treffer]):
+                providers[i], kategorien[i] = matcher.providers[idx]
+            zeilen = int(np.bincount(codes, minlength=len(uniques))[offen[treffer]].sum())
+        metrics.count("rows_fuzzy", zeilen)
+        if zeilen:
+            logger.info(f"🔎 {zeilen} Buchungen unscharf zugeordnet (Score ≥ {threshold:.2f})")
+
+    # Codes direkt weiterreichen, statt pro Zeile einen Python-String zu materialisieren
+    def kategorial(werte):
+        werte_codes, kategorien_ = pd.factorize(werte, sort=True)
+        return pd.Categorical.from_codes(werte_codes[codes], categories=kategorien_)
+
+    return pd.DataFrame(
+        {"Provider": kategorial(providers), "Kategorie": kategorial(kategorien)},
+        index=verwendungszwecke.index,
+    )
 
-        for keyword in ENTGELT_KEYWORDS:
-            if keyword in verwendungszweck:
-                match = re.search(rf"{re.escape(keyword)}\s*([0-9]+,[0-9]+|-?[0-9]+\.[0-9]+|-?[0-9]+)", verwendungszweck)
-                if match:
-                    betrag_raw = match.group(1).replace(',', '.').strip()
 
-                    if betrag_raw.endswith('-'):
-                        betrag_raw = '-' + betrag_raw[:-1]
+ENTGELT_KEYWORDS = ["Auslandseinsatzentgelt", "Barauszahlungsgebühr"]
 
-                    betrag_float = float(betrag_raw)
+ENTGELT_BETRAG_PATTERN = r"([0-9]+,[0-9]+|-?[0-9]+\.[0-9]+|-?[0-9]+)"
+
+
+@lru_cache(maxsize=None)
+def _compile_entgelt_patterns(keywords):
+    """Vorfilter über alle Keywords und ein Regex je Keyword.
+
+    Je Keyword ein eigener Regex, weil eine Alternation an einer Stelle nur eine Alternative
+    findet – ist ein Keyword Präfix eines anderen, ginge sonst eine Entgeltzeile verloren.
+    """
+    vorfilter = re.compile("|".join(re.escape(k) for k in keywords))
+    return vorfilter, [re.compile(rf"{re.escape(k)}\s*{ENTGELT_BETRAG_PATTERN}") for k in keywords]
+
+
+def extract_entgelt_and_create_new_rows(df, keywords=None):
+    """Erzeugt für jedes Entgelt-Keyword mit Betrag im Verwendungszweck eine Zusatzzeile.
+
+    Ein Durchlauf über die Spalte findet die Zeilen mit irgendeinem Keyword; nur auf diesen
+    wird je Keyword der erste Betrag gesucht. Weitere Entgeltarten lassen sich über
+    ENTGELT_KEYWORDS oder den Parameter keywords ergänzen.
+    """
+    keywords = tuple(ENTGELT_KEYWORDS if keywords is None else keywords)
+    if df.empty or not keywords or "Verwendungszweck" not in df.columns:
+        return df
+
+    vorfilter, patterns = _compile_entgelt_patterns(keywords)
+    verwendungszwecke = df["Verwendungszweck"].reset_index(drop=True).astype("string")
+    kandidaten = verwendungszwecke[verwendungszwecke.str.contains(vorfilter, na=False)]
+    if kandidaten.empty:
+        return df
+
+    teile = []
+    for reihenfolge, (keyword, pattern) in enumerate(zip(keywords, patterns)):
+        betrag = kandidaten.str.extract(pattern, expand=False).dropna()
+        teile.append(pd.DataFrame({"position": betrag.index.to_numpy(), "reihenfolge": reihenfolge,
+                                   "keyword": keyword, "betrag": betrag.to_numpy(dtype=object)}))
+    # Reihenfolge wie zeilenweise: je Zeile die Keywords in der Reihenfolge von ENTGELT_KEYWORDS
+    treffer = pd.concat(teile, ignore_index=True).sort_values(["position", "reihenfolge"], kind="stable")
+    if treffer.empty:
+        return df
+
+    betrag_raw = treffer["betrag"].astype("string").str.replace(",", ".", regex=False).str.strip()
+    negativ = betrag_raw.str.endswith("-")
+    betrag_raw = betrag_raw.where(~negativ, "-" + betrag_raw.str[:-1])
+
+    positionen = treffer["position"].to_numpy()
+    new_rows = {
+        "Datum": df["Datum"].to_numpy()[positionen],
+        "Verwendungszweck": treffer["keyword"].to_numpy(dtype=object),
+        "Betrag": betrag_raw.astype(float).to_numpy(),
+        "Provider": df["Provider"].to_numpy()[positionen] if "Provider" in df.columns else "",
+        "Kategorie": df["Kategorie"].to_numpy()[positionen] if "Kategorie" in df.columns else "",
+    }
+    if "Konto" in df.columns:
+        new_rows["Konto"] = df["Konto"].to_numpy()[positionen]
+    if "Betrag_Cent" in df.columns:
+        new_rows["Betrag_Cent"] = np.rint(new_rows["Betrag"] * 100).astype(np.int64)
+
+    return pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
+
+
+def process_dataframe(df, matcher=None):
+    """Ordnet Provider/Kategorie zu, ergänzt Entgeltzeilen und entfernt den Verwendungszweck."""
+    # Ein übergebener Matcher behält sein Memo über mehrere Dateien eines Laufs
+    if matcher is None:
+        matcher = load_matcher()
+
+    df = df.copy()
+    with metrics.stage("categorize"):
+        df[["Provider", "Kategorie"]] = categorize_verwendungszwecke(df["Verwendungszweck"], matcher)
+    sonstiges = int((df["Provider"] == "Sonstiges").sum())
+    metrics.count("rows_mapped", len(df) - sonstiges)
+    metrics.count("rows_sonstiges", sonstiges)
+
+    anzahl = len(df)
+    with metrics.stage("extract_entgelt"):
+        df = extract_entgelt_and_create_new_rows(df)
+    metrics.count("entgelt_rows", len(df) - anzahl)
 
-                    # Jetzt neue Zusatzzeile erstellen
-                    new_row = {
-                        'Datum': row['Datum'],
-                        'Verwendungszweck': keyword,
-                        'Betrag': betrag_float,
-                        'Provider': row.get('Provider', ''),
-                        'Kategorie': row.get('Kategorie', ''),
-                    }
+    if 'Verwendungszweck' in df.columns:
+        df.drop(columns=['Verwendungszweck'], inplace=True)
+    return schema.apply_schema(df, schema.PROCESSED_SCHEMA)
 
 
-                    if 'Konto' in df.columns:
-                        new_row['Konto'] = row['Konto']
+def processed_path(source_filename, output_folder=None):
+    """Pfad der <bank>_<jahr>_mapped_<datum>.csv zu einer Parser-CSV; legt den Ordner an."""
+    output_folder = output_folder or OUTPUT_FOLDER
 
-                    new_rows.append(new_row)
+    os.makedirs(output_folder, exist_ok=True)
 
-    if new_rows:
-        df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
+    original_filename = os.path.basename(source_filename)
+    clean_filename = original_filename.replace("buchungen_", "").replace(".csv", "")
 
-    return df
+    today_str = datetime.datetime.now().strftime("%Y%m%d")
+    final_filename = f"{clean_filename}_mapped_{today_str}.csv"
 
+    return os.path.join(output_folder, final_filename)
 
-def process_file(csv_path):
-    logger.info(f"🔧 Verarbeite {csv_path}...")
-    df = pd.read_csv(csv_path)
 
-    mapping = load_mapping()
+def save_processed(df, source_filename, output_folder=None):
+    """Schreibt verarbeitete Buchungen als <bank>_<jahr>_mapped_<datum>.csv und liefert den Pfad."""
+    output_path = processed_path(source_filename, output_folder)
 
-    df[["Provider", "Kategorie"]] = df["Verwendungszweck"].apply(
-        lambda vz: pd.Series(map_verwendungszweck(vz, mapping))
+    with metrics.stage("save_processed"):
+        df.to_csv(output_path, index=False)
+    logger.info(f"✅ Datei gespeichert unter {output_path}")
+    save_rollups(df, output_path)
+    return output_path
+
+
+PROCESSED_FILE_PATTERN = re.compile(r"^(?P<bank>[a-z]+)_(?P<jahr>\d{4})_mapped_(?P<datum>\d{8})\.csv$")
+
+
+def find_processed_files(folder=None):
+    """Findet die neueste <bank>_<jahr>_mapped_<datum>.csv je (Bank, Jahr).
+
+    Maßgeblich ist das Datum im Namen, bei gleichem Datum die Änderungszeit.
+    """
+    folder = folder or OUTPUT_FOLDER
+    if not os.path.isdir(folder):
+        return {}
+
+    neueste = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            match = PROCESSED_FILE_PATTERN.match(entry.name)
+            if not match or not entry.is_file():
+                continue
+            key = (match.group("bank"), int(match.group("jahr")))
+            rang = (match.group("datum"), entry.stat().st_mtime_ns)
+            if key not in neueste or rang > neueste[key][0]:
+                neueste[key] = (rang, entry.path)
+    return {key: path for key, (_, path) in sorted(neueste.items())}
+
+
+def rollup_paths(processed_path):
+    """Pfade der Rollups (Monat, Wochentag) zu einer verarbeiteten CSV, im Unterordner rollups/."""
+    folder, filename = os.path.split(processed_path)
+    name = filename[:-len(".csv")] if filename.endswith(".csv") else filename
+    return (
+        os.path.join(folder, "rollups", f"{name}_monthly.csv"),
+        os.path.join(folder, "rollups", f"{name}_weekday.csv"),
     )
 
-    df = extract_entgelt_and_create_new_rows(df)
 
-    if 'Verwendungszweck' in df.columns:
-        df.drop(columns=['Verwendungszweck'], inplace=True)
-    output_folder = OUTPUT_FOLDER
+def save_rollups(df, processed_path):
+    """Schreibt die vorverdichteten Summen für das Dashboard neben die verarbeitete CSV."""
+    monthly_path, weekday_path = rollup_paths(processed_path)
+    os.makedirs(os.path.dirname(monthly_path), exist_ok=True)
+    with metrics.stage("rollups"):
+        aggregations.build_monthly_rollup(df).to_csv(monthly_path, index=False)
+        aggregations.build_weekday_rollup(df).to_csv(weekday_path, index=False)
+    return monthly_path, weekday_path
+
+
+def store_processed(df, bank, db_path=None):
+    """Schreibt verarbeitete Buchungen samt Rollups in die SQLite-Datenbank."""
+    db_path = db_path or sqlite_store.DB_PATH
+    with metrics.stage("save_processed"):
+        sqlite_store.write_processed(df, bank, db_path)
+    with metrics.stage("rollups"):
+        sqlite_store.write_rollups(
+            aggregations.build_monthly_rollup(df), aggregations.build_weekday_rollup(df), bank, db_path
+        )
+
+
+def append_processed(df, bank, jahr, output_folder=None):
+    """Hängt verarbeitete Buchungen an die neueste <bank>_<jahr>_mapped_*.csv an und ergänzt die Rollups.
+
+    Gibt es für Bank und Jahr noch keine Datei, wird sie wie von save_processed angelegt.
+    """
+    output_folder = output_folder or OUTPUT_FOLDER
+    output_path = find_processed_files(output_folder).get((bank, int(jahr)))
+    if output_path is None:
+        return save_processed(df, f"buchungen_{bank}_{jahr}.csv", output_folder)
+
+    with metrics.stage("save_processed"):
+        append_csv(df, output_path)
+    with metrics.stage("rollups"):
+        for path, neu in zip(rollup_paths(output_path),
+                             (aggregations.build_monthly_rollup(df), aggregations.build_weekday_rollup(df))):
+            vorhanden = schema.read_csv(path, schema.ROLLUP_SCHEMA) if os.path.exists(path) else None
+            aggregations.merge_rollups(vorhanden, neu).to_csv(path, index=False)
+    logger.info(f"✅ {len(df)} Buchungen angehängt an {output_path}")
+    return output_path
+
+
+def append_store(df, bank, db_path=None):
+    """Wie append_processed, aber in die SQLite-Datenbank."""
+    db_path = db_path or sqlite_store.DB_PATH
+    with metrics.stage("save_processed"):
+        jahre = sqlite_store.write_processed(df, bank, db_path, append=True)
+    with metrics.stage("rollups"):
+        rollups = []
+        for table, neu in (("rollup_monthly", aggregations.build_monthly_rollup(df)),
+                           ("rollup_weekday", aggregations.build_weekday_rollup(df))):
+            vorhanden = [sqlite_store.read_rollup(table, bank, jahr, db_path) for jahr in jahre]
+            rollups.append(aggregations.merge_rollups(*vorhanden, neu))
+        sqlite_store.write_rollups(*rollups, bank, db_path)
+
+
+def _datum_formate(csv_path, chunksize):
+    """Vorlauf nur über die Datumsspalte: (Eingabeformat, Ausgabeformat) wie für die ganze Datei.
+
+    pd.read_csv erkennt das Eingabeformat am ersten Wert der Spalte, to_csv wählt das
+    Ausgabeformat nach allen Werten (nur Tage → ohne Uhrzeit). Blockweise verarbeitet
+    müssen beide für die ganze Datei feststehen, sonst entscheidet jeder Block selbst.
+    Liefert None als Ausgabeformat, wenn Zeiten Sekundenbruchteile haben.
+    """
+    from pandas.tseries.api import guess_datetime_format
+
+    if "Datum" not in pd.read_csv(csv_path, nrows=0).columns:
+        return None, None
+    eingabe, nur_tage, ganze_sekunden = None, True, True
+    with pd.read_csv(csv_path, usecols=["Datum"], dtype=str, chunksize=chunksize) as reader:
+        for chunk in reader:
+            werte = chunk["Datum"].dropna()
+            if eingabe is None and len(werte):
+                eingabe = guess_datetime_format(werte.iloc[0]) or "mixed"
+            datum = pd.to_datetime(werte, format=eingabe, errors="coerce").dropna()
+            nur_tage &= bool((datum == datum.dt.normalize()).all())
+            ganze_sekunden &= bool((datum == datum.dt.floor("s")).all())
+    if nur_tage:
+        return eingabe, "%Y-%m-%d"
+    return eingabe, "%Y-%m-%d %H:%M:%S" if ganze_sekunden else None
+
+
+def _add_rollup(bisher, neu):
+    # merge_rollups liefert None, solange alle Blöcke leer sind – dann das leere Rollup behalten
+    zusammen = aggregations.merge_rollups(bisher, neu)
+    return neu if zusammen is None else zusammen
+
+
+def _process_file_chunked(csv_path, matcher, output_folder, chunksize, info):
+    """Verarbeitet die CSV blockweise; der Speicherbedarf hängt nur von chunksize ab.
+
+    Buchungen jedes Blocks werden sofort angehängt, seine Entgeltzeilen in eine
+    Nebendatei – am Ende folgen sie wie bei process_dataframe hinter allen Buchungen.
+    Die Datei ist byte-gleich zur Verarbeitung am Stück.
+    """
+    eingabe, ausgabe = _datum_formate(csv_path, chunksize)
+    if ausgabe is None:
+        logger.warning(f"⚠️ {os.path.basename(csv_path)}: Zeiten mit Sekundenbruchteilen, verarbeite am Stück")
+        return None
+
+    output_path = processed_path(csv_path, output_folder)
+    tmp_path, entgelt_path = f"{output_path}.tmp", f"{output_path}.entgelte.tmp"
+    header = pd.read_csv(csv_path, nrows=0).columns
+    dtype = {c: (str if c == "Datum" else t) for c, t in {**schema.PARSED_SCHEMA, **schema.PROCESSED_SCHEMA}.items()
+             if c in header and (c == "Datum" or t == schema.KATEGORIAL)}
+    typen = {c: t for c, t in schema.PARSED_SCHEMA.items() if c != "Datum"}
+    monthly = weekday = spalten = None
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as out, \
+                open(entgelt_path, "w+", newline="", encoding="utf-8") as entgelte:
+            with pd.read_csv(csv_path, chunksize=chunksize, dtype=dtype) as reader:
+                for chunk in reader:
+                    chunk["Datum"] = pd.to_datetime(chunk["Datum"], format=eingabe, errors="coerce")
+                    chunk = schema.apply_schema(chunk, typen)
+                    info["rows_in"] += len(chunk)
+
+                    df = process_dataframe(chunk, matcher)
+                    if spalten is None:
+                        spalten = list(df.columns)
+                        df.iloc[:0].to_csv(out, index=False)
+                    df = df.reindex(columns=spalten)
+                    with metrics.stage("save_processed"):
+                        df.iloc[:len(chunk)].to_csv(out, index=False, header=False, date_format=ausgabe)
+                        df.iloc[len(chunk):].to_csv(entgelte, index=False, header=False, date_format=ausgabe)
+                    info["rows_out"] += len(df)
+
+                    # Rollups sind klein (Monate × Kategorien × Provider) und werden fortlaufend summiert
+                    with metrics.stage("rollups"):
+                        monthly = _add_rollup(monthly, aggregations.build_monthly_rollup(df))
+                        weekday = _add_rollup(weekday, aggregations.build_weekday_rollup(df))
+
+            if spalten is None:
+                return None
+            entgelte.seek(0)
+            shutil.copyfileobj(entgelte, out)
+        os.replace(tmp_path, output_path)
+    finally:
+        for path in (tmp_path, entgelt_path):
+            if os.path.exists(path):
+                os.remove(path)
 
-    os.makedirs(output_folder, exist_ok=True)
+    logger.info(f"✅ Datei gespeichert unter {output_path}")
+    monthly_path, weekday_path = rollup_paths(output_path)
+    os.makedirs(os.path.dirname(monthly_path), exist_ok=True)
+    monthly.to_csv(monthly_path, index=False)
+    weekday.to_csv(weekday_path, index=False)
+    return output_path
 
-    original_filename = os.path.basename(csv_path)
-    clean_filename = original_filename.replace("buchungen_", "").replace(".csv", "")
 
-    today_str = datetime.datetime.now().strftime("%Y%m%d")
-    final_filename = f"{clean_filename}_mapped_{today_str}.csv"
+def process_file(csv_path, matcher=None, output_folder=None, chunksize=None):
+    """Verarbeitet eine Parser-CSV und schreibt sie samt Rollups nach output_folder.
 
-    output_path = os.path.join(output_folder, final_filename)
+    Mit chunksize wird die Datei in Blöcken dieser Zeilenzahl gelesen und geschrieben –
+    für sehr große Exporte; das Ergebnis ist dasselbe.
+    """
+    return _process_file(csv_path, matcher, output_folder, chunksize)[0]
 
-    df.to_csv(output_path, index=False)
-    logger.info(f"✅ Datei gespeichert unter {output_path}")
+
+def _process_file(csv_path, matcher, output_folder, chunksize):
+    """Wie process_file; liefert (Ausgabepfad, Angaben aus metrics.file_scope: rows_in, rows_out, seconds)."""
+    logger.info(f"🔧 Verarbeite {csv_path}...")
+    with metrics.file_scope(csv_path) as info:
+        output_path = None
+        if chunksize:
+            if matcher is None:
+                matcher = load_matcher()
+            info["rows_in"] = info["rows_out"] = 0
+            output_path = _process_file_chunked(csv_path, matcher, output_folder, chunksize, info)
+
+        if output_path is None:
+            with metrics.stage("read_csv"):
+                df = schema.read_csv(csv_path, schema.PARSED_SCHEMA)
+            info["rows_in"] = len(df)
+
+            df = process_dataframe(df, matcher)
+            info["rows_out"] = len(df)
+
+            output_path = save_processed(df, csv_path, output_folder)
+    return output_path, info
+
+
+# Im Worker-Prozess: der im Hauptprozess kompilierte Matcher, einmal je Worker übertragen
+_worker_matcher = None
+
+
+def _init_worker(matcher, trace_memory):
+    global _worker_matcher
+    _worker_matcher = matcher
+    if trace_memory:
+        metrics.start_run(trace_memory)
+
+
+def _process_file_worker(csv_path, output_folder, chunksize):
+    """Wie _process_file, liefert zusätzlich die Metriken des Worker-Prozesses für diese Datei."""
+    metrics.reset()
+    return _process_file(csv_path, _worker_matcher, output_folder, chunksize), metrics.snapshot()
+
+
+def find_parser_files(folder=None):
+    """Alle Parser-CSVs eines Ordners, sortiert."""
+    folder = folder or INPUT_FOLDER
+    return [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.endswith(".csv")]
+
+
+def process_files(csv_paths, matcher=None, output_folder=None, jobs=1, chunksize=None):
+    """Verarbeitet mehrere Parser-CSVs; bei jobs > 1 (0 = alle Kerne) verteilt über einen Prozess-Pool.
+
+    Das Mapping wird nur einmal geladen und kompiliert; jeder Worker erhält den fertigen
+    Matcher einmal beim Start statt provider_mapping.json je Datei neu zu lesen.
+    Liefert je Datei (in Eingabereihenfolge) ein Dict mit file, output, rows_in, rows_out
+    und seconds; output ist None, wenn die Datei nicht verarbeitet werden konnte.
+    """
+    if matcher is None:
+        matcher = load_matcher()
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    start = time.perf_counter()
+    ergebnisse = []
+
+    if jobs > 1 and len(csv_paths) > 1:
+        import tracemalloc
+        from concurrent.futures import ProcessPoolExecutor
+
+        if matcher.fuzzy_threshold is not None:
+            matcher.ngram_index()  # einmal hier bauen statt in jedem Worker
+        logger.info(f"⚙️ Verarbeite {len(csv_paths)} CSVs mit {jobs} Prozessen...")
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(matcher, tracemalloc.is_tracing())) as executor:
+            futures = [executor.submit(_process_file_worker, path, output_folder, chunksize) for path in csv_paths]
+            for path, future in zip(csv_paths, futures):
+                try:
+                    ergebnis, worker_metrics = future.result()
+                    metrics.merge(worker_metrics)
+                except Exception as e:
+                    logger.error(f"❌ Worker-Fehler bei {os.path.basename(path)}: {e}")
+                    metrics.count("process_errors")
+                    ergebnis = (None, {})
+                ergebnisse.append(ergebnis)
+    else:
+        for path in csv_paths:
+            try:
+                ergebnisse.append(_process_file(path, matcher, output_folder, chunksize))
+            except Exception as e:
+                logger.error(f"❌ Fehler bei {os.path.basename(path)}: {e}")
+                metrics.count("process_errors")
+                ergebnisse.append((None, {}))
+
+    report = []
+    for path, (output_path, info) in zip(csv_paths, ergebnisse):
+        eintrag = {"file": os.path.basename(path), "output": output_path, "rows_in": info.get("rows_in"),
+                   "rows_out": info.get("rows_out"), "seconds": info.get("seconds")}
+        report.append(eintrag)
+        if output_path is not None:
+            logger.info(f"⏱️ {eintrag['file']}: {eintrag['rows_in']} → {eintrag['rows_out']} Zeilen in {eintrag['seconds']:.2f}s")
+    zeilen = sum(e["rows_out"] or 0 for e in report if e["output"])
+    logger.info(f"✅ {sum(e['output'] is not None for e in report)}/{len(report)} Dateien, {zeilen} Zeilen "
+                f"in {time.perf_counter() - start:.2f}s ({jobs} Prozesse)")
+    return report
+
+
+def process_store(db_path=None, matcher=None):
+    """Verarbeitet alle Parser-Buchungen aus der SQLite-Datenbank und schreibt sie dorthin zurück."""
+    db_path = db_path or sqlite_store.DB_PATH
+    if matcher is None:
+        matcher = load_matcher()
+
+    for bank, jahr in sqlite_store.list_partitions("parsed", db_path):
+        logger.info(f"🔧 Verarbeite {bank} {jahr} aus {db_path}...")
+        df = sqlite_store.read_parsed(bank=bank, jahr=jahr, db_path=db_path)
+        store_processed(process_dataframe(df, matcher), bank, db_path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ordnet geparste Buchungen Providern und Kategorien zu.")
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default="csv",
+                        help="Quelle und Ziel: CSV-Dateien (Standard) oder SQLite-Datenbank")
+    parser.add_argument("--db", dest="db_path", default=None, help="Pfad zur SQLite-Datenbank")
+    parser.add_argument("--input", dest="input_folder", default=None, help="Ordner mit Parser-CSVs")
+    parser.add_argument("--output", dest="output_folder", default=None, help="Ausgabeordner für verarbeitete CSVs")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Anzahl paralleler Prozesse für die CSVs (0 = alle Kerne)")
+    parser.add_argument("--chunksize", type=int, default=None, metavar="ZEILEN",
+                        help=f"CSV blockweise verarbeiten, z. B. {CHUNK_ROWS} (begrenzt den Speicherbedarf)")
+    parser.add_argument("--fuzzy-threshold", default=None, metavar="SCORE",
+                        help=f"Unscharfe Vorschläge ab diesem Score übernehmen, z. B. 0.8; 'off' schaltet ab "
+                             f"(Standard: ${FUZZY_ENV}, sonst aus)")
+    metrics.add_metrics_arguments(parser)
+    add_logging_arguments(parser)
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    for filename in os.listdir(INPUT_FOLDER):
-        if filename.endswith(".csv"):
-            process_file(os.path.join(INPUT_FOLDER, filename))
+    args = parse_args()
+    apply_logging_arguments(args)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    with metrics.instrumented_run(args.metrics, args.profile, args.trace_memory, command="processor", jobs=jobs):
+        matcher = load_matcher(args.fuzzy_threshold)
+        if args.storage == "sqlite":
+            process_store(args.db_path, matcher)
+        else:
+            process_files(find_parser_files(args.input_folder), matcher, args.output_folder, jobs, args.chunksize)
 
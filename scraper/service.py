@@ -0,0 +1,483 @@
+# scraper/service.py
+
+import sys
+import os
+import json
+import hashlib
+import time
+import asyncio
+import argparse
+from collections import OrderedDict, defaultdict, deque
+from urllib.parse import urlsplit, parse_qs
+
+# Append Projekt-Wurzelverzeichnis
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scraper.main import add_parse_arguments, resolve_parse_arguments
+from scraper.parser import extraction
+from scraper.utils import metrics, parse_cache
+from scraper.utils.logger import setup_logger
+from scraper import watcher
+
+logger = setup_logger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+INPUT_FOLDER = os.path.join(BASE_DIR, "input")
+PROCESSED_FOLDER = os.path.join(BASE_DIR, "output", "processed")
+
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+# Latenzen je Route für p50/p99 – nur die letzten Anfragen zählen
+LATENCY_WINDOW = 10_000
+# Dateistände höchstens so oft prüfen (Sekunden)
+REFRESH_INTERVAL = 1.0
+# Zwischengespeicherte Antworten (LRU) und die Query-Parameter, die eine Antwort bestimmen
+ANTWORT_CACHE_GROESSE = 256
+ANFRAGE_PARAMETER = ("bank", "jahr", "kategorie", "n")
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error",
+               503: "Service Unavailable"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def percentile(werte, p):
+    """Perzentil nach Nearest-Rank (p zwischen 0 und 100)."""
+    if not werte:
+        return None
+    sortiert = sorted(werte)
+    rang = max(1, -(-len(sortiert) * p // 100))
+    return sortiert[int(rang) - 1]
+
+
+class BankdatenService:
+    """Lokaler HTTP-Dienst: PDF-Upload und JSON-Auswertungen aus den im Speicher gehaltenen Rollups.
+
+    Mapping (in den Worker-Prozessen) und Rollups bleiben zwischen Anfragen geladen; geänderte
+    Dateien werden anhand von mtime und Größe nachgeladen.
+    """
+
+    def __init__(self, input_folder=None, parser_output_folder=None, processed_folder=None, jobs=1,
+                 cache_folder=None, storage="csv", db_path=None, max_requests=64, max_uploads=None,
+                 state_path=None):
+        self.input_folder = input_folder or INPUT_FOLDER
+        self.parser_output_folder = parser_output_folder or watcher.PARSER_OUTPUT_FOLDER
+        self.processed_folder = processed_folder or PROCESSED_FOLDER
+        self.jobs = jobs
+        self.cache_folder = cache_folder
+        self.storage = storage
+        self.db_path = db_path
+        self.max_requests = max_requests
+        self.max_uploads = max_uploads or 2 * jobs
+        self.state_path = state_path or watcher.STATE_PATH
+
+        self.executor = None
+        self._connections = 0
+        self._in_flight = 0
+        self._uploads = 0
+        self._write_lock = asyncio.Lock()
+        self._laufende_uploads = {}  # Inhalts-Hash → Task, damit gleiche Uploads nur einmal laufen
+        self._rejected = defaultdict(int)
+        self._latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._requests = defaultdict(int)
+
+        self._datasets = {}  # (Bank, Jahr) → (Signatur, Monats-Rollup, Wochentags-Rollup)
+        self._monthly = self._weekday = None
+        self._last_refresh = 0.0
+        # Fertige Antworten je (Pfad, normalisierte Parameter) bis zur nächsten Datenänderung
+        self._antworten = OrderedDict()
+
+    # === Daten ===
+    def _discover(self):
+        from scraper.processor.processor import find_processed_files, rollup_paths
+
+        if self.storage == "sqlite":
+            from scraper.storage import sqlite_store
+
+            db_path = self.db_path or sqlite_store.DB_PATH
+            if not os.path.exists(db_path):
+                return {}
+            signatur = tuple(_signature(p) for p in (db_path, f"{db_path}-wal"))
+            return {(bank, int(jahr)): signatur for bank, jahr in sqlite_store.list_partitions("processed", db_path)}
+        return {
+            key: (path, *(_signature(p) for p in (path, *rollup_paths(path))))
+            for key, path in find_processed_files(self.processed_folder).items()
+        }
+
+    def _load(self, bank, jahr, signatur):
+        from scraper.processor import aggregations
+        from scraper.processor.processor import rollup_paths
+        from scraper.utils import schema
+
+        if self.storage == "sqlite":
+            from scraper.storage import sqlite_store
+
+            db_path = self.db_path or sqlite_store.DB_PATH
+            monthly = sqlite_store.read_rollup("rollup_monthly", bank, jahr, db_path)
+            weekday = sqlite_store.read_rollup("rollup_weekday", bank, jahr, db_path)
+        else:
+            path = signatur[0]
+            monthly_path, weekday_path = rollup_paths(path)
+            if os.path.exists(monthly_path) and os.path.exists(weekday_path):
+                monthly = schema.read_csv(monthly_path, schema.ROLLUP_SCHEMA)
+                weekday = schema.read_csv(weekday_path, schema.ROLLUP_SCHEMA)
+            else:
+                # Ältere Ausgaben ohne Rollups einmalig verdichten
+                df = schema.read_csv(path, schema.PROCESSED_SCHEMA)
+                monthly, weekday = aggregations.build_monthly_rollup(df), aggregations.build_weekday_rollup(df)
+        return monthly.assign(Banktyp=bank), weekday.assign(Banktyp=bank)
+
+    def refresh(self, force=False):
+        """Lädt nur Datensätze neu, deren Dateien sich geändert haben."""
+        from scraper.utils import schema
+
+        jetzt = time.monotonic()
+        if not force and jetzt - self._last_refresh < REFRESH_INTERVAL:
+            return
+        self._last_refresh = jetzt
+
+        aktuell = self._discover()
+        geaendert = set(aktuell) != set(self._datasets)
+        for key, signatur in aktuell.items():
+            if key not in self._datasets or self._datasets[key][0] != signatur:
+                self._datasets[key] = (signatur, *self._load(*key, signatur))
+                geaendert = True
+        for key in set(self._datasets) - set(aktuell):
+            del self._datasets[key]
+
+        if geaendert or self._monthly is None:
+            self._antworten.clear()
+            if self._datasets:
+                self._monthly = schema.concat([d[1] for d in self._datasets.values()], schema.ROLLUP_SCHEMA)
+                self._weekday = schema.concat([d[2] for d in self._datasets.values()], schema.ROLLUP_SCHEMA)
+            else:
+                self._monthly = self._weekday = None
+            logger.info(f"📚 {len(self._datasets)} Datensätze im Speicher")
+
+    def _filtered(self, rollup, params):
+        if rollup is None:
+            raise HttpError(404, "Keine verarbeiteten Daten vorhanden")
+        maske = None
+        for spalte, name in (("Banktyp", "bank"), ("Jahr", "jahr"), ("Kategorie", "kategorie")):
+            if name not in params:
+                continue
+            werte = params[name]
+            if spalte == "Jahr":
+                try:
+                    werte = [int(w) for w in werte]
+                except ValueError:
+                    raise HttpError(400, "jahr muss eine Zahl sein")
+            treffer = rollup[spalte].isin(werte)
+            maske = treffer if maske is None else maske & treffer
+        return rollup if maske is None else rollup[maske]
+
+    # === Endpunkte ===
+    def _route_monthly(self, params):
+        from scraper.processor import aggregations
+
+        cashflow = aggregations.monthly_cashflow_from_rollup(self._filtered(self._monthly, params))
+        return [
+            {"bank": bank, "jahr": int(jahr), "monate": {str(m): round(float(v), 2) for m, v in werte.items()}}
+            for (bank, jahr), werte in cashflow.iterrows()
+        ]
+
+    def _route_top_providers(self, params):
+        from scraper.processor import aggregations
+
+        try:
+            top_n = int(params.get("n", ["10"])[0])
+        except ValueError:
+            raise HttpError(400, "n muss eine Zahl sein")
+        top = aggregations.top_provider_from_rollup(self._filtered(self._monthly, params), top_n)
+        return [{"provider": p, "betrag": round(float(b), 2)} for p, b in zip(top["Provider"], top["Betrag"])]
+
+    def _route_categories(self, params):
+        from scraper.processor import aggregations
+
+        summen = aggregations.category_totals_from_rollup(self._filtered(self._monthly, params))
+        return [
+            {"kategorie": k, "betrag": round(float(b), 2), "anzahl": int(a)}
+            for k, b, a in zip(summen["Kategorie"], summen["Betrag"], summen["Anzahl"])
+        ]
+
+    def _route_weekday(self, params):
+        from scraper.processor import aggregations
+
+        heatmap = aggregations.weekday_heatmap_from_rollup(self._filtered(self._weekday, params)).fillna(0)
+        return {tag: {monat: round(float(v), 2) for monat, v in werte.items()} for tag, werte in heatmap.iterrows()}
+
+    def _route_datasets(self, params):
+        return [{"bank": bank, "jahr": jahr} for bank, jahr in sorted(self._datasets)]
+
+    def _route_metrics(self, params):
+        routes = {}
+        for route, werte in self._latencies.items():
+            werte = list(werte)
+            routes[route] = {
+                "requests": self._requests[route],
+                "p50_ms": round(percentile(werte, 50), 3),
+                "p99_ms": round(percentile(werte, 99), 3),
+                "max_ms": round(max(werte), 3),
+            }
+        return {
+            "connections": self._connections,
+            "in_flight": self._in_flight,
+            "uploads_in_flight": self._uploads,
+            "max_requests": self.max_requests,
+            "max_uploads": self.max_uploads,
+            "rejected": dict(self._rejected),
+            "routes": routes,
+        }
+
+    async def _upload(self, params, body):
+        dateiname = os.path.basename(params.get("filename", [""])[0])
+        if not dateiname.lower().endswith(".pdf"):
+            raise HttpError(400, "filename=<name>.pdf angeben (Bank und Jahr werden daran erkannt)")
+        if not body.startswith(b"%PDF"):
+            raise HttpError(400, "Keine PDF-Datei")
+        if self._uploads >= self.max_uploads:
+            self._rejected["upload"] += 1
+            raise HttpError(429, "Zu viele gleichzeitige Uploads")
+
+        self._uploads += 1
+        try:
+            datei_hash = hashlib.sha256(body).hexdigest()
+            async with self._write_lock:
+                state = watcher.load_state(self.state_path)
+            if datei_hash in state:
+                return {**state[datei_hash], "status": "bereits übernommen"}
+
+            # Gleichzeitige Uploads derselben Datei warten auf den ersten statt erneut anzuhängen
+            laufend = self._laufende_uploads.get(datei_hash)
+            if laufend is not None:
+                return {**await asyncio.shield(laufend), "status": "bereits übernommen"}
+            task = asyncio.ensure_future(self._ingest(datei_hash, dateiname, body))
+            self._laufende_uploads[datei_hash] = task
+            task.add_done_callback(lambda _: self._laufende_uploads.pop(datei_hash, None))
+            return await asyncio.shield(task)
+        finally:
+            self._uploads -= 1
+
+    async def _ingest(self, datei_hash, dateiname, body):
+        # Wie im Watch-Modus in input/ ablegen, damit spätere Komplettläufe die PDF enthalten
+        os.makedirs(self.input_folder, exist_ok=True)
+        pdf_path = os.path.join(self.input_folder, dateiname)
+        if os.path.exists(pdf_path) and parse_cache.compute_file_hash(pdf_path) != datei_hash:
+            stamm, endung = os.path.splitext(dateiname)
+            pdf_path = os.path.join(self.input_folder, f"{stamm}_{datei_hash[:8]}{endung}")
+        with open(pdf_path, "wb") as f:
+            f.write(body)
+
+        loop = asyncio.get_running_loop()
+        bank_typ, jahre, worker_metrics = await loop.run_in_executor(
+            self.executor, watcher.ingest_file, pdf_path, self.cache_folder
+        )
+        metrics.merge(worker_metrics)
+        if bank_typ == "unbekannt":
+            raise HttpError(400, "Banktyp nicht erkannt")
+
+        # Ein Schreiber zur Zeit; Datei-I/O nicht im Event-Loop. commit_result prüft den Zustand
+        # erneut – er kann sich seit der ersten Prüfung geändert haben
+        async with self._write_lock:
+            zeilen, eintrag = await loop.run_in_executor(
+                None, watcher.commit_result, datei_hash, os.path.basename(pdf_path), bank_typ, jahre,
+                self.parser_output_folder, self.processed_folder, self.storage, self.db_path, self.state_path,
+            )
+        if zeilen is None:
+            return {**eintrag, "status": "bereits übernommen"}
+        self.refresh(force=True)
+        status = "übernommen" if eintrag["status"] == "ok" else eintrag["status"]
+        return {"status": status, "bank": bank_typ, "jahre": sorted(jahre), "rows": zeilen}
+
+    ROUTES = {
+        ("GET", "/health"): lambda self, params: {"status": "ok"},
+        ("GET", "/datasets"): _route_datasets,
+        ("GET", "/aggregates/monthly"): _route_monthly,
+        ("GET", "/aggregates/top-providers"): _route_top_providers,
+        ("GET", "/aggregates/categories"): _route_categories,
+        ("GET", "/aggregates/weekday"): _route_weekday,
+        ("GET", "/metrics"): _route_metrics,
+    }
+
+    async def dispatch(self, method, target, body):
+        """Liefert (Status, JSON-Objekt) für eine Anfrage."""
+        teile = urlsplit(target)
+        params = parse_qs(teile.query)
+        if (method, teile.path) == ("POST", "/upload"):
+            return 200, await self._upload(params, body)
+        handler = self.ROUTES.get((method, teile.path))
+        if handler is None:
+            if any(path == teile.path for _, path in self.ROUTES):
+                raise HttpError(405, f"{method} nicht erlaubt")
+            raise HttpError(404, f"Unbekannter Pfad: {teile.path}")
+        if not (teile.path.startswith("/aggregates") or teile.path == "/datasets"):
+            return 200, handler(self, params)
+        self.refresh()
+        key = (teile.path, _cache_key(params))
+        if key in self._antworten:
+            self._antworten.move_to_end(key)
+            return 200, self._antworten[key]
+        antwort = self._antworten[key] = handler(self, params)
+        if len(self._antworten) > ANTWORT_CACHE_GROESSE:
+            self._antworten.popitem(last=False)
+        return 200, antwort
+
+    # === HTTP ===
+    async def handle_connection(self, reader, writer):
+        """Bedient eine Verbindung; max_requests begrenzt die gleichzeitig offenen Verbindungen.
+
+        Auch ruhende Keep-Alive-Verbindungen zählen. Darüber wird die erste Anfrage noch
+        gelesen und mit 503 beantwortet, dann schließt der Dienst die Verbindung.
+        """
+        ueberlastet = self._connections >= self.max_requests
+        if not ueberlastet:
+            self._connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await _respond(writer, 400, {"error": "Ungültige Anfrage"}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                laenge = int(headers.get("content-length") or 0)
+                if laenge > MAX_UPLOAD_BYTES:
+                    await _respond(writer, 413, {"error": "Datei zu groß"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(laenge) if laenge else b""
+
+                if ueberlastet:
+                    self._rejected["requests"] += 1
+                    await _respond(writer, 503, {"error": "Zu viele gleichzeitige Verbindungen"}, keep_alive=False)
+                    break
+                await self._handle_request(writer, method, target, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if not ueberlastet:
+                self._connections -= 1
+            writer.close()
+
+    async def _handle_request(self, writer, method, target, body, keep_alive):
+        route = f"{method} {urlsplit(target).path}"
+        start = time.perf_counter()
+        self._in_flight += 1
+        try:
+            status, payload = await self.dispatch(method, target, body)
+        except HttpError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            logger.error(f"❌ Fehler bei {route}: {e}")
+            status, payload = 500, {"error": str(e)}
+        finally:
+            self._in_flight -= 1
+
+        await _respond(writer, status, payload, keep_alive)
+        if status < 500 and status != 404:
+            self._requests[route] += 1
+            self._latencies[route].append((time.perf_counter() - start) * 1000)
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Startet Worker-Pool und Server; liefert den asyncio-Server (Port 0 = frei wählen)."""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Kein fork: Worker entstehen erst beim ersten Upload und würden sonst offene
+        # Client-Sockets erben – deren Verbindungen gingen dann nie zu
+        self.executor = ProcessPoolExecutor(max_workers=self.jobs, mp_context=multiprocessing.get_context("forkserver"),
+                                            initializer=watcher._init_worker, initargs=(extraction.current_config(),))
+        # PDFs früherer Komplettläufe nicht durch einen erneuten Upload doppelt anhängen
+        watcher.seed_state(self.input_folder, self.parser_output_folder, self.storage, self.db_path, self.state_path)
+        self.refresh(force=True)
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        adresse = server.sockets[0].getsockname()
+        logger.info(f"🌐 Dienst läuft auf http://{adresse[0]}:{adresse[1]} ({self.jobs} Prozesse)")
+        return server
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+
+def _cache_key(params):
+    """Normalisierte Query: nur bekannte Parameter, Reihenfolge egal (n zählt nur einmal)."""
+    return tuple(
+        (name, tuple(params[name][:1]) if name == "n" else tuple(sorted(set(params[name]))))
+        for name in ANFRAGE_PARAMETER if name in params
+    )
+
+
+def _signature(path):
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+async def _respond(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    kopf = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(kopf.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def serve(service, host="127.0.0.1", port=8765):
+    server = await service.start(host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Lokaler HTTP-Dienst für PDF-Uploads und Auswertungen.")
+    add_parse_arguments(parser)
+    parser.add_argument("--processed", dest="processed_folder", default=None,
+                        help="Ordner der verarbeiteten CSVs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-requests", type=int, default=64,
+                        help="Gleichzeitig offene Verbindungen (auch Keep-Alive), darüber antwortet der Dienst mit 503")
+    parser.add_argument("--max-uploads", type=int, default=None,
+                        help="Gleichzeitige Uploads, darüber 429 (Standard: 2 × Prozesse)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    jobs, cache_folder = resolve_parse_arguments(args)
+    service = BankdatenService(
+        input_folder=args.input_folder, parser_output_folder=args.output_folder,
+        processed_folder=args.processed_folder, jobs=jobs, cache_folder=cache_folder, storage=args.storage,
+        db_path=args.db_path, max_requests=args.max_requests, max_uploads=args.max_uploads,
+    )
+    with metrics.instrumented_run(args.metrics, args.profile, args.trace_memory, command="scraper.service", jobs=jobs):
+        try:
+            asyncio.run(serve(service, args.host, args.port))
+        except KeyboardInterrupt:
+            logger.info("🛑 Dienst beendet")
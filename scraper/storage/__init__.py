@@ -0,0 +1 @@
+# scraper/storage/__init__.py
@@ -0,0 +1,284 @@
+# scraper/storage/sqlite_store.py
+
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+from scraper.utils.logger import setup_logger
+from scraper.utils import schema
+
+logger = setup_logger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+DB_PATH = os.path.join(BASE_DIR, "output", "buchungen.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parsed (
+    id INTEGER PRIMARY KEY,
+    bank TEXT NOT NULL,
+    jahr INTEGER NOT NULL,
+    datum TEXT NOT NULL,
+    verwendungszweck TEXT,
+    betrag REAL NOT NULL,
+    betrag_cent INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_parsed_bank_jahr ON parsed (bank, jahr);
+CREATE INDEX IF NOT EXISTS idx_parsed_datum ON parsed (datum);
+
+CREATE TABLE IF NOT EXISTS processed (
+    id INTEGER PRIMARY KEY,
+    bank TEXT NOT NULL,
+    jahr INTEGER NOT NULL,
+    datum TEXT NOT NULL,
+    betrag REAL NOT NULL,
+    betrag_cent INTEGER NOT NULL,
+    provider TEXT,
+    kategorie TEXT,
+    konto TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_processed_bank_jahr ON processed (bank, jahr);
+CREATE INDEX IF NOT EXISTS idx_processed_datum ON processed (datum);
+CREATE INDEX IF NOT EXISTS idx_processed_provider ON processed (provider);
+CREATE INDEX IF NOT EXISTS idx_processed_kategorie ON processed (kategorie);
+
+CREATE TABLE IF NOT EXISTS rollup_monthly (
+    bank TEXT NOT NULL,
+    jahr INTEGER NOT NULL,
+    monat INTEGER NOT NULL,
+    kategorie TEXT,
+    provider TEXT,
+    betrag_cent INTEGER NOT NULL,
+    anzahl INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_monthly_bank_jahr ON rollup_monthly (bank, jahr);
+
+CREATE TABLE IF NOT EXISTS rollup_weekday (
+    bank TEXT NOT NULL,
+    jahr INTEGER NOT NULL,
+    monat INTEGER NOT NULL,
+    wochentag INTEGER NOT NULL,
+    kategorie TEXT,
+    provider TEXT,
+    betrag_cent INTEGER NOT NULL,
+    anzahl INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_weekday_bank_jahr ON rollup_weekday (bank, jahr);
+"""
+
+# Erlaubte Spalten für Gruppierungen (werden direkt ins SQL übernommen)
+GROUP_COLUMNS = {"bank", "jahr", "monat", "provider", "kategorie", "konto"}
+
+
+def connect(db_path=DB_PATH):
+    """Öffnet die Datenbank und legt Tabellen und Indizes bei Bedarf an."""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _betrag_cent(df):
+    # Fehlende Cent-Werte (ältere CSVs) aus dem Float-Betrag ableiten
+    cent = np.rint(df["Betrag"].astype(float).to_numpy() * 100)
+    if "Betrag_Cent" in df.columns:
+        vorhanden = pd.to_numeric(df["Betrag_Cent"], errors="coerce").to_numpy(dtype=float)
+        cent = np.where(np.isnan(vorhanden), cent, vorhanden)
+    return cent.astype(np.int64)
+
+
+def _prepare(df):
+    df = df.copy()
+    df["Datum"] = pd.to_datetime(df["Datum"], errors="coerce")
+    return df.dropna(subset=["Datum"])
+
+
+def _optional_column(df, name):
+    if name in df.columns:
+        return df[name].astype(object).where(df[name].notna(), None).tolist()
+    return [None] * len(df)
+
+
+def _replace_years(conn, table, bank, df, columns, rows, append=False):
+    # Wie bei den CSV-Dateien ersetzt ein Schreibvorgang alle Buchungen von Bank und Jahr,
+    # im Watch-Modus (append=True) kommen die Zeilen einer neuen PDF hinzu
+    jahre = sorted(set(int(j) for j in df["Datum"].dt.year))
+    placeholders = ", ".join("?" for _ in columns)
+    with conn:
+        if not append:
+            conn.executemany(f"DELETE FROM {table} WHERE bank = ? AND jahr = ?", [(bank, j) for j in jahre])
+        conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+    return jahre
+
+
+def write_parsed(df, bank, db_path=DB_PATH, append=False):
+    """Speichert Parser-Output einer Bank; vorhandene Jahre werden ersetzt, mit append ergänzt."""
+    df = _prepare(df)
+    if df.empty:
+        return []
+
+    rows = zip(
+        [bank] * len(df),
+        df["Datum"].dt.year.astype(int).tolist(),
+        df["Datum"].dt.strftime("%Y-%m-%d").tolist(),
+        _optional_column(df, "Verwendungszweck"),
+        df["Betrag"].astype(float).tolist(),
+        _betrag_cent(df).tolist(),
+    )
+    conn = connect(db_path)
+    try:
+        jahre = _replace_years(conn, "parsed", bank, df,
+                               ["bank", "jahr", "datum", "verwendungszweck", "betrag", "betrag_cent"], rows, append)
+    finally:
+        conn.close()
+    logger.info(f"✅ {len(df)} {bank.capitalize()}-Buchungen in {db_path} gespeichert ({jahre})")
+    return jahre
+
+
+def write_processed(df, bank, db_path=DB_PATH, append=False):
+    """Speichert verarbeitete Buchungen einer Bank; vorhandene Jahre werden ersetzt, mit append ergänzt."""
+    df = _prepare(df)
+    if df.empty:
+        return []
+
+    rows = zip(
+        [bank] * len(df),
+        df["Datum"].dt.year.astype(int).tolist(),
+        df["Datum"].dt.strftime("%Y-%m-%d").tolist(),
+        df["Betrag"].astype(float).tolist(),
+        _betrag_cent(df).tolist(),
+        _optional_column(df, "Provider"),
+        _optional_column(df, "Kategorie"),
+        _optional_column(df, "Konto"),
+    )
+    conn = connect(db_path)
+    try:
+        jahre = _replace_years(conn, "processed", bank, df,
+                               ["bank", "jahr", "datum", "betrag", "betrag_cent", "provider", "kategorie", "konto"],
+                               rows, append)
+    finally:
+        conn.close()
+    logger.info(f"✅ {len(df)} verarbeitete {bank.capitalize()}-Buchungen in {db_path} gespeichert ({jahre})")
+    return jahre
+
+
+ROLLUP_COLUMNS = {
+    "rollup_monthly": ["jahr", "monat", "kategorie", "provider", "betrag_cent", "anzahl"],
+    "rollup_weekday": ["jahr", "monat", "wochentag", "kategorie", "provider", "betrag_cent", "anzahl"],
+}
+
+
+def write_rollups(monthly, weekday, bank, db_path=DB_PATH):
+    """Ersetzt die Rollups (aus scraper.processor.aggregations) der enthaltenen Jahre einer Bank."""
+    conn = connect(db_path)
+    try:
+        with conn:
+            for table, df in (("rollup_monthly", monthly), ("rollup_weekday", weekday)):
+                columns = ROLLUP_COLUMNS[table]
+                jahre = sorted(set(int(j) for j in df["Jahr"]))
+                conn.executemany(f"DELETE FROM {table} WHERE bank = ? AND jahr = ?", [(bank, j) for j in jahre])
+                rows = df[[c.capitalize() if c != "betrag_cent" else "Betrag_Cent" for c in columns]]
+                conn.executemany(
+                    f"INSERT INTO {table} (bank, {', '.join(columns)}) VALUES (?, {', '.join('?' for _ in columns)})",
+                    [(bank, *row) for row in rows.astype(object).itertuples(index=False, name=None)],
+                )
+    finally:
+        conn.close()
+
+
+def read_rollup(table, bank=None, jahr=None, db_path=DB_PATH):
+    """Liest ein Rollup im Spaltenformat von build_monthly_rollup/build_weekday_rollup."""
+    if table not in ROLLUP_COLUMNS:
+        raise ValueError(f"Unbekanntes Rollup: {table}")
+    where, params = _where(bank=bank, jahr=jahr)
+    columns = ROLLUP_COLUMNS[table]
+    conn = connect(db_path)
+    try:
+        df = pd.read_sql_query(f"SELECT {', '.join(columns)} FROM {table}{where}", conn, params=params)
+    finally:
+        conn.close()
+    df = df.rename(columns={c: ("Betrag_Cent" if c == "betrag_cent" else c.capitalize()) for c in columns})
+    df["Betrag"] = df["Betrag_Cent"] / 100
+    return schema.apply_schema(df, schema.ROLLUP_SCHEMA)
+
+
+def _where(bank=None, jahr=None, start=None, end=None):
+    clauses, params = [], []
+    if bank is not None:
+        clauses.append("bank = ?")
+        params.append(bank)
+    if jahr is not None:
+        clauses.append("jahr = ?")
+        params.append(int(jahr))
+    if start is not None:
+        clauses.append("datum >= ?")
+        params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+    if end is not None:
+        clauses.append("datum <= ?")
+        params.append(pd.Timestamp(end).strftime("%Y-%m-%d"))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _read(table, columns, renames, typen, db_path, **filters):
+    where, params = _where(**filters)
+    conn = connect(db_path)
+    try:
+        df = pd.read_sql_query(f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY id", conn, params=params)
+    finally:
+        conn.close()
+    return schema.apply_schema(df.rename(columns=renames), typen)
+
+
+def read_parsed(bank=None, jahr=None, start=None, end=None, db_path=DB_PATH):
+    """Liest Parser-Output im gleichen Spaltenformat wie die buchungen_<bank>_<jahr>.csv-Dateien."""
+    return _read(
+        "parsed",
+        ["datum", "verwendungszweck", "betrag", "betrag_cent"],
+        {"datum": "Datum", "verwendungszweck": "Verwendungszweck", "betrag": "Betrag", "betrag_cent": "Betrag_Cent"},
+        schema.PARSED_SCHEMA, db_path, bank=bank, jahr=jahr, start=start, end=end,
+    )
+
+
+def read_processed(bank=None, jahr=None, start=None, end=None, db_path=DB_PATH):
+    """Liest verarbeitete Buchungen im Spaltenformat der *_mapped_*.csv-Dateien."""
+    return _read(
+        "processed",
+        ["datum", "betrag", "betrag_cent", "provider", "kategorie", "konto"],
+        {"datum": "Datum", "betrag": "Betrag", "betrag_cent": "Betrag_Cent",
+         "provider": "Provider", "kategorie": "Kategorie", "konto": "Konto"},
+        schema.PROCESSED_SCHEMA, db_path, bank=bank, jahr=jahr, start=start, end=end,
+    )
+
+
+def list_partitions(table="parsed", db_path=DB_PATH):
+    """Liefert alle vorhandenen (Bank, Jahr)-Kombinationen einer Tabelle."""
+    if table not in ("parsed", "processed"):
+        raise ValueError(f"Unbekannte Tabelle: {table}")
+    conn = connect(db_path)
+    try:
+        return conn.execute(f"SELECT DISTINCT bank, jahr FROM {table} ORDER BY bank, jahr").fetchall()
+    finally:
+        conn.close()
+
+
+def aggregate(group_by=("bank", "jahr", "monat"), bank=None, jahr=None, start=None, end=None, db_path=DB_PATH):
+    """Summiert Beträge direkt in SQLite, ohne die Einzelbuchungen nach pandas zu laden."""
+    unknown = set(group_by) - GROUP_COLUMNS
+    if unknown:
+        raise ValueError(f"Unbekannte Gruppierungsspalten: {sorted(unknown)}")
+
+    select = [("CAST(substr(datum, 6, 2) AS INTEGER) AS monat" if col == "monat" else col) for col in group_by]
+    where, params = _where(bank=bank, jahr=jahr, start=start, end=end)
+    group = ", ".join(group_by)
+    sql = (
+        f"SELECT {', '.join(select + ['SUM(betrag_cent) AS betrag_cent', 'COUNT(*) AS anzahl'])} "
+        f"FROM processed{where}"
+        + (f" GROUP BY {group} ORDER BY {group}" if group_by else "")
+    )
+    conn = connect(db_path)
+    try:
+        df = pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+    df["betrag"] = df["betrag_cent"] / 100
+    return df
@@ -0,0 +1,117 @@
+# scraper/tools/backend_benchmark.py
+
+import os
+import sys
+import json
+import time
+import argparse
+from scraper.parser import registry
+from scraper.parser.extraction import PRESETS, DEFAULT_PRESETS, use_preset
+from scraper.utils.utils import detect_bank_typ
+from scraper.utils.bank_sniffer import sniff_bank_typ
+from scraper.utils.logger import setup_logger
+from scraper.utils.suppress_warnings import suppress_warnings
+
+logger = setup_logger(__name__)
+suppress_warnings()
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+INPUT_FOLDER = os.path.join(BASE_DIR, "input")
+
+
+def count_pages(pdf_path):
+    from pdfminer.pdfpage import PDFPage
+
+    with open(pdf_path, "rb") as fp:
+        return sum(1 for _ in PDFPage.get_pages(fp))
+
+
+def _rows_equal(df, referenz):
+    spalten = ["Datum", "Verwendungszweck", "Betrag"]
+    if any(col not in df.columns for col in spalten) or any(col not in referenz.columns for col in spalten):
+        return df.empty and referenz.empty
+    return df[spalten].reset_index(drop=True).equals(referenz[spalten].reset_index(drop=True))
+
+
+def benchmark_backends(pdf_paths, presets=None, repeat=1):
+    """Parst jede PDF mit jedem Preset und vergleicht die Zeilen mit dem Standard-Backend des Banktyps."""
+    presets = presets or list(PRESETS)
+    ergebnisse = []
+
+    for pdf_path in pdf_paths:
+        bank_typ = detect_bank_typ(os.path.basename(pdf_path))
+        if bank_typ == "unbekannt":
+            bank_typ = sniff_bank_typ(pdf_path)
+        if not registry.is_supported(bank_typ):
+            logger.warning(f"⚠️ Überspringe {pdf_path}: unbekannter Banktyp")
+            continue
+
+        parser = registry.get_parser(bank_typ)
+        seiten = count_pages(pdf_path)
+        standard = DEFAULT_PRESETS.get(bank_typ)
+        # Referenz zuerst, damit jedes Preset gegen das bisherige Ergebnis geprüft wird
+        reihenfolge = [standard] + [p for p in presets if p != standard]
+        referenz = None
+
+        for preset in reihenfolge:
+            dauer = float("inf")
+            try:
+                with use_preset(bank_typ, preset):
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        df = parser(pdf_path)
+                        dauer = min(dauer, time.perf_counter() - start)
+            except Exception as e:
+                logger.warning(f"⚠️ {preset} fehlgeschlagen für {pdf_path}: {e}")
+                continue
+
+            if referenz is None:
+                referenz = df
+
+            ergebnisse.append({
+                "datei": os.path.basename(pdf_path),
+                "bank_typ": bank_typ,
+                "preset": preset,
+                "standard": preset == standard,
+                "seiten": seiten,
+                "sekunden": round(dauer, 4),
+                "seiten_pro_sekunde": round(seiten / dauer, 2) if dauer > 0 else None,
+                "zeilen": len(df),
+                "identisch": _rows_equal(df, referenz),
+            })
+
+    return ergebnisse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vergleicht Text-Extraktions-Backends auf denselben Auszügen.")
+    parser.add_argument("pdfs", nargs="*", help="PDF-Dateien (Standard: alle PDFs in input/)")
+    parser.add_argument("--presets", nargs="+", choices=list(PRESETS), default=None)
+    parser.add_argument("--repeat", type=int, default=1, help="Wiederholungen je Preset (bester Lauf zählt)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args(argv)
+
+    pdf_paths = args.pdfs
+    if not pdf_paths and os.path.exists(INPUT_FOLDER):
+        pdf_paths = [os.path.join(INPUT_FOLDER, f) for f in sorted(os.listdir(INPUT_FOLDER)) if f.endswith(".pdf")]
+
+    ergebnisse = benchmark_backends(pdf_paths, args.presets, args.repeat)
+
+    for r in ergebnisse:
+        status = "✅" if r["identisch"] else "❌"
+        standard = " (Standard)" if r["standard"] else ""
+        logger.info(
+            f"{status} {r['datei']} | {r['preset']:<14}{standard} | {r['sekunden']:.3f}s | "
+            f"{r['seiten_pro_sekunde']} Seiten/s | {r['zeilen']} Zeilen"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(ergebnisse, f, indent=2, ensure_ascii=False)
+        logger.info(f"💾 Ergebnisse gespeichert unter {args.json_path}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
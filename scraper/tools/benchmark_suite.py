@@ -0,0 +1,185 @@
+# scraper/tools/benchmark_suite.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import platform
+import tempfile
+from scraper.tools import synthetic_statements
+from scraper.utils import schema
+from scraper.utils.logger import setup_logger
+from scraper.utils.suppress_warnings import suppress_warnings
+
+logger = setup_logger(__name__)
+suppress_warnings()
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+BENCHMARK_FOLDER = os.path.join(BASE_DIR, "output", "benchmarks")
+
+# PDFs mit 1M Buchungen haben >20.000 Seiten – PDF-Stufen laufen standardmäßig nur bis hierhin
+PDF_MAX = 10_000
+# map_verwendungszweck zeilenweise nur auf einer Stichprobe messen
+MAP_SAMPLE = 10_000
+
+STAGES = [
+    "parse_volksbank",
+    "parse_mastercard",
+    "map_verwendungszweck",
+    "categorize_verwendungszwecke",
+    "process_file",
+    "extract_entgelt",
+    "monthly_cashflow",
+    "top_provider",
+    "provider_pivot",
+    "weekday_heatmap",
+]
+
+
+def _measure(func, repeat):
+    """Führt func repeat-mal aus und liefert (beste Laufzeit, letztes Ergebnis)."""
+    beste, ergebnis = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ergebnis = func()
+        beste = min(beste, time.perf_counter() - start)
+    return beste, ergebnis
+
+
+def _stage_functions(groesse, folder, stages, pdf_max, mapping):
+    """Bereitet die Daten einer Größe vor und liefert (Stufe, Eingabezeilen, Funktion)."""
+    from scraper.parser import registry
+    from scraper.processor import processor, aggregations
+    from scraper.utils.provider_matcher import ProviderMatcher
+
+    daten = {bank: synthetic_statements.generate_transactions(groesse, bank) for bank in ("volksbank", "mastercard")}
+    csv_path = synthetic_statements.write_parser_csv(daten["mastercard"], "mastercard", folder)
+    verwendungszwecke = daten["mastercard"]["Verwendungszweck"]
+
+    for bank in ("volksbank", "mastercard"):
+        stage = f"parse_{bank}"
+        if stage in stages and groesse <= pdf_max:
+            pdf_path = synthetic_statements.write_statement_pdf(daten[bank], bank, folder)
+            yield stage, groesse, lambda p=pdf_path, b=bank: registry.get_parser(b)(p)
+
+    # Jeder Lauf bekommt einen frischen Matcher, damit das Memo keine Wiederholung beschönigt
+    def map_stichprobe(stichprobe=verwendungszwecke.head(MAP_SAMPLE).tolist()):
+        matcher = ProviderMatcher(mapping)
+        return [processor.map_verwendungszweck(vz, matcher) for vz in stichprobe]
+
+    if "map_verwendungszweck" in stages:
+        yield "map_verwendungszweck", min(groesse, MAP_SAMPLE), map_stichprobe
+    if "categorize_verwendungszwecke" in stages:
+        yield "categorize_verwendungszwecke", groesse, lambda: processor.categorize_verwendungszwecke(
+            verwendungszwecke, ProviderMatcher(mapping)
+        )
+    if "process_file" in stages:
+        yield "process_file", groesse, lambda: processor.process_file(
+            csv_path, ProviderMatcher(mapping), os.path.join(folder, "processed")
+        )
+    if "extract_entgelt" in stages:
+        yield "extract_entgelt", groesse, lambda: processor.extract_entgelt_and_create_new_rows(
+            daten["mastercard"].drop(columns=["_Zweck", "_Fortsetzung"])
+        )
+
+    # Aggregationen auf dem Dashboard-Frame beider Banken
+    dashboard = []
+    for bank, df in daten.items():
+        df = processor.process_dataframe(df.drop(columns=["_Zweck", "_Fortsetzung"]), ProviderMatcher(mapping))
+        dashboard.append(df.assign(Jahr=df["Datum"].dt.year, Banktyp=bank, Monat=df["Datum"].dt.month))
+    dashboard = schema.concat(dashboard, schema.DASHBOARD_SCHEMA)
+    for name in ("monthly_cashflow", "top_provider", "provider_pivot", "weekday_heatmap"):
+        if name in stages:
+            yield name, len(dashboard), lambda f=getattr(aggregations, name): f(dashboard)
+
+
+def run_suite(sizes, stages=None, repeat=3, pdf_max=PDF_MAX, work_folder=None):
+    """Misst alle Stufen für jede Größe und liefert die Ergebnisse als Liste von Dicts."""
+    from scraper.processor.processor import load_mapping
+
+    stages = stages or STAGES
+    mapping = load_mapping()
+    ergebnisse = []
+
+    with tempfile.TemporaryDirectory(dir=work_folder) as tmp:
+        for groesse in sizes:
+            folder = os.path.join(tmp, str(groesse))
+            for stage, zeilen, func in _stage_functions(groesse, folder, stages, pdf_max, mapping):
+                sekunden, _ = _measure(func, repeat)
+                ergebnisse.append({
+                    "stage": stage,
+                    "size": groesse,
+                    "rows": zeilen,
+                    "seconds": round(sekunden, 6),
+                    "rows_per_second": round(zeilen / sekunden, 1) if sekunden > 0 else None,
+                })
+                logger.info(f"⏱️ {stage:<28} {groesse:>9} | {sekunden:.4f}s | {zeilen / sekunden:,.0f} Zeilen/s")
+
+    return ergebnisse
+
+
+def save_baseline(ergebnisse, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    baseline = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": ergebnisse,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+    logger.info(f"💾 Baseline gespeichert unter {path}")
+    return path
+
+
+def compare_with_baseline(ergebnisse, baseline_path, tolerance=0.2):
+    """Vergleicht mit einer gespeicherten Baseline und liefert alle Stufen, die langsamer als erlaubt sind."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["stage"], r["size"]): r for r in json.load(f)["results"]}
+
+    regressionen = []
+    for r in ergebnisse:
+        alt = baseline.get((r["stage"], r["size"]))
+        if not alt or not alt["seconds"]:
+            continue
+        faktor = r["seconds"] / alt["seconds"]
+        if faktor > 1 + tolerance:
+            regressionen.append({**r, "baseline_seconds": alt["seconds"], "factor": round(faktor, 2)})
+            logger.warning(
+                f"⚠️ Regression {r['stage']} ({r['size']}): {alt['seconds']:.4f}s → {r['seconds']:.4f}s (x{faktor:.2f})"
+            )
+    return regressionen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Misst alle Pipeline-Stufen auf synthetischen Auszügen.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000, 10_000, 100_000],
+                        help="Anzahl Buchungen je Durchlauf (bis 1000000)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=None)
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen je Stufe (bester Lauf zählt)")
+    parser.add_argument("--pdf-max", type=int, default=PDF_MAX, help="Größte Buchungsanzahl für PDF-Stufen")
+    parser.add_argument("--output", default=None, help="Pfad der JSON-Baseline")
+    parser.add_argument("--compare", default=None, help="Mit dieser Baseline vergleichen")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Erlaubte Verlangsamung (0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+
+    ergebnisse = run_suite(args.sizes, args.stages, args.repeat, args.pdf_max)
+
+    output = args.output or os.path.join(
+        BENCHMARK_FOLDER, f"benchmark_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    save_baseline(ergebnisse, output)
+
+    if args.compare:
+        regressionen = compare_with_baseline(ergebnisse, args.compare, args.tolerance)
+        if regressionen:
+            logger.error(f"❌ {len(regressionen)} Stufen langsamer als die Baseline")
+            return 1
+        logger.info("✅ Keine Regression gegenüber der Baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,14 +8,21 @@ logger = setup_logger(__name__)
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 FOLDERS_TO_CLEAN = [
     os.path.join(BASE_DIR, "output", "parser_output"),
+    os.path.join(BASE_DIR, "output", "processed", "rollups"),
     os.path.join(BASE_DIR, "output", "processed"),
 ]
+# Ohne die Ausgaben muss der Watch-Modus alle PDFs neu übernehmen
+FILES_TO_CLEAN = [
+    os.path.join(BASE_DIR, "output", "watcher_state.json"),
+]
 
 def clean_folders():
     for folder in FOLDERS_TO_CLEAN:
         if os.path.exists(folder):
             for filename in os.listdir(folder):
                 file_path = os.path.join(folder, filename)
+                if os.path.isdir(file_path):
+                    continue
                 try:
                     os.remove(file_path)
                     logger.info(f"🧹 Gelöscht: {file_path}")
@@ -23,6 +30,10 @@ def clean_folders():
                     logger.error(f"⚠️ Fehler beim Löschen {file_path}: {e}")
         else:
             logger.warning(f"⚠️ Ordner existiert nicht: {folder}")
+    for file_path in FILES_TO_CLEAN:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            logger.info(f"🧹 Gelöscht: {file_path}")
 
 if __name__ == "__main__":
     clean_folders()
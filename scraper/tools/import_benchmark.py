@@ -0,0 +1,75 @@
+# scraper/tools/import_benchmark.py
+
+import os
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+from scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+# Module, die beim reinen Start von scraper.main nicht geladen werden sollen
+HEAVY_MODULES = ["pandas", "numpy", "pdfplumber", "pdfminer"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_cold_start(module="scraper.main", runs=5):
+    """Misst die Import-Zeit eines Moduls in frischen Interpretern.
+
+    Liefert (Median in ms, schwerste direkte Imports als (kumulierte µs, Modul), geladene schwere Module).
+    """
+    code = (
+        "import sys, time; t = time.perf_counter(); "
+        f"import {module}; "
+        "print(round((time.perf_counter() - t) * 1000, 2)); "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    zeiten = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=BASE_DIR, check=True)
+        zeile_zeit, zeile_module = (result.stdout.strip().splitlines() + [""])[:2]
+        zeiten.append(float(zeile_zeit))
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, cwd=BASE_DIR, check=True)
+    # Direkte Imports des Moduls sind in der -X importtime-Ausgabe eine Ebene eingerückt
+    top_level = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 3:
+            top_level.append((int(match.group(2)), match.group(4)))
+    top_level.sort(reverse=True)
+
+    geladen = [m for m in zeile_module.split(",") if m]
+    return statistics.median(zeiten), top_level[:10], geladen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Misst die Kaltstart-Importzeit von scraper.main.")
+    parser.add_argument("--module", default="scraper.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Exit-Code 1, wenn der Median diesen Wert überschreitet")
+    args = parser.parse_args(argv)
+
+    median_ms, top_level, geladen = measure_cold_start(args.module, args.runs)
+
+    logger.info(f"⏱️ Import von {args.module}: Median {median_ms:.1f} ms über {args.runs} Läufe")
+    for dauer_us, name in top_level:
+        logger.info(f"   {dauer_us / 1000:8.1f} ms  {name}")
+    if geladen:
+        logger.warning(f"⚠️ Schwere Module beim Start geladen: {geladen}")
+
+    if args.max_ms is not None and median_ms > args.max_ms:
+        logger.error(f"❌ Importzeit {median_ms:.1f} ms liegt über dem Limit von {args.max_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
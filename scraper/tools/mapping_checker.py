@@ -1,36 +1,71 @@
 # scraper/tools/mapping_checker.py
 
 import os
+import argparse
 import pandas as pd
 from scraper.utils.logger import setup_logger
-from scraper.processor.processor import load_mapping
-from scraper.utils.utils import normalize_text
+from scraper.utils.ngram_index import NgramIndex
+from scraper.processor.processor import load_matcher, fuzzy_threshold
 
 logger = setup_logger(__name__)
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 INPUT_FOLDER = os.path.join(BASE_DIR, "output", "parser_output")
 
-def check_mappings():
-    mapping = load_mapping()
-    known_providers = [normalize_text(k) for k in mapping.keys()]
+def check_mappings(input_folder=None, threshold=None, matcher=None):
+    """Prüft alle Verwendungszwecke der Parser-CSVs gegen das Mapping.
 
-    unmatched = set()
+    Ohne exakten Treffer wird der ähnlichste Provider gesucht – über die Provider-Schlüssel und
+    die bereits exakt zugeordneten Verwendungszwecke aller Dateien. Liefert (zuordenbar, offen)
+    als Listen von (Verwendungszweck, Provider oder None, Score); nur offen braucht Handarbeit.
+    """
+    input_folder = input_folder or INPUT_FOLDER
+    matcher = matcher or load_matcher()
+    threshold = fuzzy_threshold(threshold)
 
-    for filename in os.listdir(INPUT_FOLDER):
+    verwendungszwecke = set()
+    for filename in os.listdir(input_folder):
         if filename.endswith(".csv"):
-            df = pd.read_csv(os.path.join(INPUT_FOLDER, filename))
-            for vz in df["Verwendungszweck"].dropna():
-                vz_norm = normalize_text(vz)
-                if not any(provider in vz_norm for provider in known_providers):
-                    unmatched.add(vz)
-
-    if unmatched:
-        logger.warning("❌ Nicht zugeordnete Verwendungszwecke gefunden:")
-        for vz in unmatched:
-            logger.warning(f" - {vz}")
+            df = pd.read_csv(os.path.join(input_folder, filename))
+            verwendungszwecke.update(df["Verwendungszweck"].dropna().astype(str))
+
+    zugeordnet, unmatched = {}, []
+    for vz in sorted(verwendungszwecke):
+        match = matcher.longest_match(vz)
+        if match:
+            zugeordnet[vz] = match[0]
+        else:
+            unmatched.append(vz)
+
+    index = NgramIndex(matcher.providers)
+    index.add_references(zugeordnet.keys(), zugeordnet.values())
+    indices, scores = index.suggest(unmatched)
+
+    zuordenbar, offen = [], []
+    for vz, idx, score in sorted(zip(unmatched, indices, scores), key=lambda x: -x[2]):
+        eintrag = (vz, matcher.providers[idx][0] if idx >= 0 else None, float(score))
+        (zuordenbar if threshold is not None and score >= threshold else offen).append(eintrag)
+
+    if zuordenbar:
+        logger.info(f"🔎 {len(zuordenbar)} Verwendungszwecke ohne exakten Treffer werden unscharf zugeordnet")
+        for vz, provider, score in zuordenbar:
+            logger.debug(f" - {vz} → {provider} ({score:.2f})")
+    if offen:
+        logger.warning(f"❌ {len(offen)} nicht zugeordnete Verwendungszwecke gefunden:")
+        for vz, provider, score in offen:
+            vorschlag = f" (Vorschlag: {provider}, {score:.2f})" if provider else ""
+            logger.warning(f" - {vz}{vorschlag}")
     else:
         logger.info("✅ Alle Verwendungszwecke korrekt zugeordnet.")
+    return zuordenbar, offen
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Prüft, welche Verwendungszwecke das Mapping nicht abdeckt.")
+    parser.add_argument("--input", dest="input_folder", default=None, help="Ordner mit Parser-CSVs")
+    parser.add_argument("--fuzzy-threshold", dest="threshold", default=None, metavar="SCORE",
+                        help="Ab diesem Score gilt ein unscharfer Vorschlag als zugeordnet (ohne Angabe werden alle gelistet)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    check_mappings()
+    args = parse_args()
+    check_mappings(args.input_folder, args.threshold)
@@ -0,0 +1,57 @@
+# scraper/tools/memory_report.py
+
+import sys
+import argparse
+import pandas as pd
+from scraper.tools import synthetic_statements
+from scraper.utils import schema
+from scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def dashboard_frames(anzahl, jahr=2024, seed=0):
+    """Dashboard-Frame beider Banken einmal im alten Format (Text-Spalten) und einmal typisiert."""
+    from scraper.processor.processor import load_matcher, process_dataframe
+
+    matcher = load_matcher()
+    frames = []
+    for bank in ("volksbank", "mastercard"):
+        df = synthetic_statements.generate_transactions(anzahl // 2, bank, jahr, seed)
+        df = process_dataframe(df.drop(columns=["_Zweck", "_Fortsetzung"]), matcher)
+        frames.append(df.assign(Jahr=jahr, Banktyp=bank, Monat=df["Datum"].dt.month))
+    typisiert = schema.concat(frames, schema.DASHBOARD_SCHEMA)
+
+    # Bisheriges Format: Python-Strings je Zeile, Jahr als Text und Monat als "YYYY-MM"
+    alt = typisiert.astype({c: object for c in ("Provider", "Kategorie", "Banktyp")})
+    alt["Jahr"] = str(jahr)
+    alt["Monat"] = alt["Datum"].dt.to_period("M").astype(str).astype(object)
+    return alt, typisiert
+
+
+def memory_report(alt, typisiert):
+    """Speicher je Spalte in Bytes (deep) für beide Formate samt Ersparnis."""
+    report = pd.DataFrame({"vorher": schema.memory_usage(alt), "nachher": schema.memory_usage(typisiert)})
+    report.loc["Gesamt"] = report.sum()
+    report["Ersparnis_%"] = (100 * (1 - report["nachher"] / report["vorher"])).round(1)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vergleicht den Speicherbedarf des Dashboard-Frames vor und nach dem Schema.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Anzahl Buchungen (beide Banken zusammen)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = memory_report(*dashboard_frames(args.rows, seed=args.seed))
+    print(report.to_string(float_format="{:,.1f}".format))
+    gesamt = report.loc["Gesamt"]
+    logger.info(
+        f"🧮 {args.rows:,} Buchungen: {gesamt['vorher'] / 2**20:,.1f} MiB → {gesamt['nachher'] / 2**20:,.1f} MiB"
+        f" ({gesamt['Ersparnis_%']:.1f} % weniger)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
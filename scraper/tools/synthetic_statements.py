@@ -0,0 +1,198 @@
+# scraper/tools/synthetic_statements.py
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+MAPPING_PATH = os.path.join(BASE_DIR, "mapping", "provider_mapping.json")
+OUTPUT_FOLDER = os.path.join(BASE_DIR, "output", "synthetic")
+
+GROESSEN = [1_000, 10_000, 100_000, 1_000_000]
+
+# Händler, die bewusst in keinem Mapping stehen (landen bei "Sonstiges")
+UNBEKANNTE_HAENDLER = [
+    "Baeckerei Kornblume", "Kiosk am Markt", "Stadtwerke Nord", "Blumen Schmidt",
+    "Parkhaus Zentrum", "Buchhandlung Lesezeichen", "Eiscafe Venezia", "Getraenke Huber",
+]
+
+ZEILEN_PRO_SEITE = 60
+ANTEIL_FORTSETZUNG = 0.25
+ANTEIL_ENTGELT = 0.03
+
+
+def _haendler(mapping_path=MAPPING_PATH):
+    with open(mapping_path, "r", encoding="utf-8") as f:
+        bekannte = list(json.load(f))
+    return bekannte + UNBEKANNTE_HAENDLER
+
+
+def generate_transactions(anzahl, bank_typ="volksbank", jahr=2024, seed=0, mapping_path=MAPPING_PATH):
+    """Erzeugt deterministisch synthetische Buchungen im Format des Parser-Outputs.
+
+    Zusätzlich zu Datum, Verwendungszweck, Betrag und Betrag_Cent enthält das Ergebnis die
+    Hilfsspalten _Zweck und _Fortsetzung, aus denen write_statement_pdf die PDF-Zeilen baut.
+    """
+    rng = np.random.default_rng(seed)
+    haendler = np.array(_haendler(mapping_path), dtype=object)
+
+    tage = np.sort(rng.integers(0, 365, size=anzahl))
+    datum = pd.Timestamp(year=jahr, month=1, day=1) + pd.to_timedelta(tage, unit="D")
+
+    zweck = haendler[rng.integers(0, len(haendler), size=anzahl)]
+    betrag_cent = rng.integers(1, 250_000, size=anzahl, dtype=np.int64)
+    betrag_cent = np.where(rng.random(anzahl) < 0.8, -betrag_cent, betrag_cent)
+
+    # Fortsetzungszeilen wie in echten Auszügen (Referenzen, Entgelte bei Kreditkarten)
+    fortsetzung = np.full(anzahl, "", dtype=object)
+    mit_referenz = rng.random(anzahl) < ANTEIL_FORTSETZUNG
+    referenzen = rng.integers(100_000, 999_999, size=anzahl)
+    fortsetzung[mit_referenz] = [f"Ref {r}" for r in referenzen[mit_referenz]]
+    if bank_typ == "mastercard":
+        mit_entgelt = rng.random(anzahl) < ANTEIL_ENTGELT
+        fortsetzung[mit_entgelt] = [
+            f"{f} Auslandseinsatzentgelt 1,75".strip() for f in fortsetzung[mit_entgelt]
+        ]
+
+    verwendungszweck = np.where(fortsetzung != "", zweck + " " + fortsetzung, zweck)
+
+    return pd.DataFrame({
+        "Datum": datum,
+        "Verwendungszweck": verwendungszweck.astype(object),
+        "Betrag": betrag_cent / 100,
+        "Betrag_Cent": betrag_cent,
+        "_Zweck": zweck,
+        "_Fortsetzung": fortsetzung,
+    })
+
+
+def _format_betrag(cent):
+    euro, rest = divmod(abs(int(cent)), 100)
+    return f"{euro:,}".replace(",", ".") + f",{rest:02d}"
+
+
+def _buchungszeilen(df, bank_typ):
+    for datum, zweck, cent, fortsetzung in zip(
+        df["Datum"].dt.strftime("%d.%m."), df["_Zweck"], df["Betrag_Cent"], df["_Fortsetzung"]
+    ):
+        if bank_typ == "volksbank":
+            yield f"{datum} {datum} {zweck} {_format_betrag(cent)} {'S' if cent < 0 else 'H'}"
+        else:
+            yield f"{datum} {datum} {zweck} {_format_betrag(cent)}{'-' if cent < 0 else ''}"
+        if fortsetzung:
+            yield fortsetzung
+
+
+def _kopfzeilen(bank_typ, jahr):
+    if bank_typ == "volksbank":
+        return ["Volksbank Musterstadt eG", f"Kontoauszug 12/{jahr}", "Bu-Tag Wert Vorgang Betrag"]
+    # Der Parser beginnt nach der Zeile mit "Buchungs-Beleg-"
+    return ["Mastercard Gold", f"Kreditkarten-Umsatzaufstellung 12/{jahr}", "Buchungs-Beleg- Datum Umsatz Betrag"]
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _write_pdf(path, seiten, font_size=9, leading=12):
+    """Minimaler PDF-Writer: eine Helvetica-Textzeile pro Eintrag, ohne zusätzliche Abhängigkeit."""
+    offsets = {}
+    page_ids = []
+
+    with open(path, "wb") as f:
+        def write_object(obj_id, body):
+            offsets[obj_id] = f.tell()
+            f.write(f"{obj_id} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        write_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+        obj_id = 4
+        for zeilen in seiten:
+            inhalt = [f"BT /F1 {font_size} Tf {leading} TL 40 800 Td".encode("ascii")]
+            inhalt += [b"(" + _escape(z).encode("latin-1", "replace") + b") Tj T*" for z in zeilen]
+            inhalt.append(b"ET")
+            stream = b"\n".join(inhalt)
+
+            write_object(obj_id + 1, f"<< /Length {len(stream)} >>\nstream\n".encode("ascii") + stream + b"\nendstream")
+            write_object(obj_id, (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {obj_id + 1} 0 R >>"
+            ).encode("ascii"))
+            page_ids.append(obj_id)
+            obj_id += 2
+
+        kids = " ".join(f"{p} 0 R" for p in page_ids)
+        write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("ascii"))
+
+        xref_offset = f.tell()
+        f.write(f"xref\n0 {obj_id}\n0000000000 65535 f \n".encode("ascii"))
+        for i in range(1, obj_id):
+            f.write(f"{offsets[i]:010d} 00000 n \n".encode("ascii"))
+        f.write(f"trailer\n<< /Size {obj_id} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii"))
+
+
+def _seiten(df, bank_typ, jahr):
+    zeilen = _kopfzeilen(bank_typ, jahr)
+    for zeile in _buchungszeilen(df, bank_typ):
+        zeilen.append(zeile)
+        if len(zeilen) == ZEILEN_PRO_SEITE:
+            yield zeilen
+            zeilen = []
+    if bank_typ == "mastercard":
+        zeilen.append("Zwischensaldo")
+    if zeilen:
+        yield zeilen
+
+
+def statement_filename(bank_typ, jahr):
+    """Dateiname, an dem detect_bank_typ und extract_jahr_from_filename Bank und Jahr erkennen."""
+    if bank_typ == "volksbank":
+        return f"kontoauszug_vom_{jahr}.12.31.pdf"
+    return f"kreditkarten-umsatzaufstellung_vom_{jahr}.12.31.pdf"
+
+
+def write_statement_pdf(df, bank_typ, folder, jahr=2024):
+    """Schreibt die Buchungen als Auszugs-PDF im Layout des jeweiligen Parsers und liefert den Pfad."""
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, statement_filename(bank_typ, jahr))
+    _write_pdf(path, _seiten(df, bank_typ, jahr))
+    return path
+
+
+def write_parser_csv(df, bank_typ, folder, jahr=2024):
+    """Schreibt die Buchungen wie scraper.main als buchungen_<bank>_<jahr>.csv."""
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"buchungen_{bank_typ}_{jahr}.csv")
+    df.drop(columns=["_Zweck", "_Fortsetzung"]).to_csv(path, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Erzeugt synthetische Kontoauszüge (PDF und Parser-CSV).")
+    parser.add_argument("--sizes", nargs="+", type=int, default=GROESSEN, help="Anzahl Buchungen je Datensatz")
+    parser.add_argument("--banks", nargs="+", choices=["volksbank", "mastercard"], default=["volksbank", "mastercard"])
+    parser.add_argument("--output", default=OUTPUT_FOLDER)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-pdf", action="store_true", help="Nur CSVs erzeugen")
+    args = parser.parse_args(argv)
+
+    for anzahl in args.sizes:
+        for bank_typ in args.banks:
+            df = generate_transactions(anzahl, bank_typ, seed=args.seed)
+            folder = os.path.join(args.output, str(anzahl))
+            logger.info(f"💾 {write_parser_csv(df, bank_typ, folder)}")
+            if not args.no_pdf:
+                logger.info(f"💾 {write_statement_pdf(df, bank_typ, folder)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# scraper/utils/bank_sniffer.py
+
+import os
+from scraper.utils.utils import detect_bank_typ_from_text
+from scraper.utils.parse_cache import compute_file_hash
+from scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Erhöhen, wenn sich detect_bank_typ_from_text ändert – alte Ergebnisse im Cache gelten dann nicht mehr
+SNIFF_VERSION = 2
+
+# Im Prozess bereits erkannte Dateien: Inhalts-Hash → Banktyp
+_sniffed = {}
+
+
+def read_first_page_text(pdf_path):
+    """Extrahiert nur den Text der ersten Seite – nicht das ganze Dokument."""
+    from pdfminer.high_level import extract_text
+
+    return extract_text(pdf_path, maxpages=1)
+
+
+def _cache_file(datei_hash, cache_folder):
+    return os.path.join(cache_folder, f"banktyp_v{SNIFF_VERSION}_{datei_hash}.txt")
+
+
+def sniff_bank_typ(pdf_path, datei_hash=None, cache_folder=None):
+    """Erkennt den Banktyp aus dem Inhalt der ersten Seite; Ergebnisse werden pro Datei-Hash gecacht."""
+    datei_hash = datei_hash or compute_file_hash(pdf_path)
+    if datei_hash in _sniffed:
+        return _sniffed[datei_hash]
+
+    if cache_folder and os.path.exists(_cache_file(datei_hash, cache_folder)):
+        with open(_cache_file(datei_hash, cache_folder), encoding="utf-8") as f:
+            bank_typ = f.read().strip()
+        _sniffed[datei_hash] = bank_typ
+        return bank_typ
+
+    try:
+        bank_typ = detect_bank_typ_from_text(read_first_page_text(pdf_path))
+    except Exception as e:
+        logger.warning(f"⚠️ Erste Seite von {pdf_path} nicht lesbar: {e}")
+        return "unbekannt"
+
+    _sniffed[datei_hash] = bank_typ
+    if cache_folder:
+        os.makedirs(cache_folder, exist_ok=True)
+        tmp_path = f"{_cache_file(datei_hash, cache_folder)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(bank_typ)
+        os.replace(tmp_path, _cache_file(datei_hash, cache_folder))
+
+    logger.info(f"🔎 {os.path.basename(pdf_path)} am Inhalt als {bank_typ} erkannt")
+    return bank_typ
@@ -1,23 +1,181 @@
 # scraper/utils/logger.py
+import atexit
+import datetime
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import sys
+import threading
 
-def setup_logger(name):
-    formatter = logging.Formatter(fmt="%(asctime)s [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+# Log-Level, Log-Ordner und JSON-Ausgabe lassen sich ohne Code-Änderung per Umgebung setzen
+LEVEL_ENV = "BANKDATEN_LOG_LEVEL"
+JSON_ENV = "BANKDATEN_LOG_JSON"
+DIR_ENV = "BANKDATEN_LOG_DIR"
 
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO) #logging.DEBUG
+LOGS_DIR = os.environ.get(DIR_ENV) or os.path.abspath(os.path.join(os.path.dirname(__file__), "../..", "logs"))
+LOG_FILE = os.path.join(LOGS_DIR, "bankdaten_scraper.log")
+JSON_LOG_FILE = os.path.join(LOGS_DIR, "bankdaten_scraper.jsonl")
+
+
+class LazyFileHandler(logging.FileHandler):
+    """FileHandler, der Log-Ordner und Datei erst beim ersten Log-Eintrag anlegt."""
+
+    def __init__(self, filename, encoding=None):
+        super().__init__(filename, encoding=encoding, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Ein JSON-Objekt pro Zeile, z. B. für jq oder Log-Sammler."""
+
+    def format(self, record):
+        eintrag = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            eintrag["exc_info"] = record.exc_text
+        return json.dumps(eintrag, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Nur die Nachricht auflösen; Formatierung und Datei-I/O übernimmt der Listener-Thread
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_text = logging.Formatter().formatException(record.exc_info) if record.exc_info else None
+        record.exc_info = None
+        return record
+
+
+# Ein Handler für alle Logger des Projekts, der Listener schreibt in Konsole und Datei(en)
+_lock = threading.RLock()
+_queue_handler = None
+_listener = None
+_loggers = set()
+_config = {"level": None, "json_path": None}
+
+
+def _resolve_level(level):
+    level = level or os.environ.get(LEVEL_ENV) or "INFO"
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unbekanntes Log-Level: {level}")
+    return level
+
+
+def _build_handlers(json_path):
+    formatter = logging.Formatter(fmt="%(asctime)s [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
-
-    logs_dir = os.path.join(os.path.dirname(__file__), "../..", "logs")
-    os.makedirs(logs_dir, exist_ok=True)
 
-    file_path = os.path.join(logs_dir, "bankdaten_scraper.log")
-    file_handler = logging.FileHandler(file_path, encoding="utf-8")
+    file_handler = LazyFileHandler(LOG_FILE, encoding="utf-8")
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
+    handlers = [stream_handler, file_handler]
+    if json_path:
+        json_handler = LazyFileHandler(json_path, encoding="utf-8")
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+    return handlers
+
+
+def _start():
+    global _queue_handler, _listener
+    log_queue = queue.SimpleQueue()
+    if _queue_handler is None:
+        _queue_handler = _QueueHandler(log_queue)
+    else:
+        _queue_handler.queue = log_queue
+    json_path = _config["json_path"] or os.environ.get(JSON_ENV) or None
+    if json_path in ("1", "true"):
+        json_path = JSON_LOG_FILE
+    _listener = logging.handlers.QueueListener(log_queue, *_build_handlers(json_path), respect_handler_level=True)
+    _listener.start()
+
+    # Worker-Prozesse beenden sich ohne atexit – die Queue vorher noch leeren
+    multiprocessing = sys.modules.get("multiprocessing")
+    if multiprocessing is not None and multiprocessing.parent_process() is not None:
+        from multiprocessing.util import Finalize
+        Finalize(None, shutdown_logging, exitpriority=100)
+
+
+def shutdown_logging():
+    """Stoppt den Listener und schreibt alle noch wartenden Einträge."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+def configure_logging(level=None, json_path=None):
+    """(Neu-)Konfiguriert Level und Ausgaben für alle Projekt-Logger.
+
+    level: Name oder Zahl, sonst Umgebungsvariable BANKDATEN_LOG_LEVEL, sonst INFO.
+    json_path: zusätzliche JSON-Lines-Datei, sonst Umgebungsvariable BANKDATEN_LOG_JSON.
+    """
+    with _lock:
+        if level is not None:
+            _config["level"] = level
+        if json_path is not None:
+            _config["json_path"] = json_path
+        shutdown_logging()
+        _start()
+        resolved = _resolve_level(_config["level"])
+        for name in _loggers:
+            logging.getLogger(name).setLevel(resolved)
+
+
+def setup_logger(name):
+    """Liefert den Logger für name; Handler werden pro Prozess nur einmal angelegt."""
+    logger = logging.getLogger(name)
+    with _lock:
+        if _listener is None:
+            _start()
+        if name not in _loggers:
+            _loggers.add(name)
+            logger.setLevel(_resolve_level(_config["level"]))
+        if _queue_handler not in logger.handlers:
+            logger.addHandler(_queue_handler)
     return logger
+
+
+def _after_fork_in_child():
+    # Der Listener-Thread überlebt fork nicht – im Worker einen eigenen starten
+    global _listener, _lock
+    _lock = threading.RLock()
+    if _listener is not None:
+        _listener = None
+        _start()
+
+
+def add_logging_arguments(parser):
+    parser.add_argument("--log-level", default=None, choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        type=str.upper, help=f"Log-Level (Standard: ${LEVEL_ENV} oder INFO)")
+    parser.add_argument("--log-json", nargs="?", const=JSON_LOG_FILE, default=None, metavar="PATH",
+                        help="Logs zusätzlich als JSON-Lines schreiben (Standard: logs/bankdaten_scraper.jsonl)")
+    return parser
+
+
+def apply_logging_arguments(args):
+    if args.log_level or args.log_json:
+        configure_logging(level=args.log_level, json_path=args.log_json)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+atexit.register(shutdown_logging)
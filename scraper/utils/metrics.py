@@ -0,0 +1,192 @@
+# scraper/utils/metrics.py
+
+import os
+import sys
+import json
+import time
+import datetime
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+METRICS_FOLDER = os.path.join(BASE_DIR, "output", "metrics")
+
+# Zähler und Zeiten des aktuellen Laufs (pro Prozess; Worker liefern snapshot() an den Hauptprozess)
+_counters = defaultdict(int)
+_stages = {}
+_files = {}
+# Offene Stufen für die Spitzen-Speichermessung: [Name, Peak in Bytes]
+_peak_stack = []
+
+
+def reset():
+    _counters.clear()
+    _stages.clear()
+    _files.clear()
+    _peak_stack.clear()
+
+
+def count(name, n=1):
+    """Erhöht einen Zähler. In Schleifen lokal zählen und einmal am Ende aufrufen."""
+    _counters[name] += n
+
+
+def _fold_peak():
+    # Bisherigen tracemalloc-Peak in alle offenen Stufen übernehmen
+    if tracemalloc.is_tracing():
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in _peak_stack:
+            frame[1] = max(frame[1], peak)
+
+
+@contextmanager
+def stage(name):
+    """Misst Wandzeit (und bei aktivem tracemalloc den Speicher-Peak) eines Abschnitts."""
+    _fold_peak()
+    frame = [name, 0]
+    _peak_stack.append(frame)
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        dauer = time.perf_counter() - start
+        _fold_peak()
+        _peak_stack.remove(frame)
+        eintrag = _stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+        eintrag["seconds"] += dauer
+        eintrag["calls"] += 1
+        if tracemalloc.is_tracing():
+            eintrag["peak_bytes"] = max(eintrag.get("peak_bytes", 0), frame[1])
+
+
+@contextmanager
+def file_scope(path, **info):
+    """Ordnet alle Zähler, die während des Blocks anfallen, einer Datei zu.
+
+    Schlüssel ist der Pfad, damit gleichnamige Dateien aus verschiedenen Ordnern getrennt bleiben.
+    Der Block erhält ein Dict, in das weitere Angaben (z. B. Zeilen, Cache-Treffer) geschrieben werden können.
+    """
+    vorher = dict(_counters)
+    eintrag = dict(info)
+    start = time.perf_counter()
+    try:
+        with stage("file"):
+            yield eintrag
+    finally:
+        eintrag["seconds"] = round(time.perf_counter() - start, 6)
+        eintrag["counters"] = {k: v - vorher.get(k, 0) for k, v in _counters.items() if v != vorher.get(k, 0)}
+        _files[path] = eintrag
+
+
+def snapshot():
+    """Aktueller Stand als einfaches Dict (picklebar, z. B. als Rückgabe eines Worker-Prozesses)."""
+    return {
+        "counters": dict(_counters),
+        "stages": {k: dict(v) for k, v in _stages.items()},
+        "files": {k: dict(v) for k, v in _files.items()},
+    }
+
+
+def merge(daten):
+    """Übernimmt einen snapshot() aus einem anderen Prozess."""
+    for name, wert in daten["counters"].items():
+        _counters[name] += wert
+    for name, werte in daten["stages"].items():
+        eintrag = _stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+        eintrag["seconds"] += werte["seconds"]
+        eintrag["calls"] += werte["calls"]
+        if "peak_bytes" in werte:
+            eintrag["peak_bytes"] = max(eintrag.get("peak_bytes", 0), werte["peak_bytes"])
+    _files.update(daten["files"])
+
+
+def start_run(trace_memory=False):
+    """Setzt alle Werte zurück und startet bei Bedarf tracemalloc (kostet spürbar Laufzeit)."""
+    reset()
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def _max_rss_bytes():
+    # Spitzen-RSS von Hauptprozess und beendeten Workern – ohne Mess-Overhead, nur Unix
+    try:
+        import resource
+    except ImportError:
+        return None
+    faktor = 1 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * faktor,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * faktor,
+    }
+
+
+def write_metrics(path=None, **extra):
+    """Schreibt die Metriken des Laufs als JSON und beendet tracemalloc; liefert den Pfad."""
+    path = path or os.path.join(METRICS_FOLDER, f"metrics_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    daten = {"created": datetime.datetime.now().isoformat(timespec="seconds"), **extra, **snapshot()}
+    daten["max_rss_bytes"] = _max_rss_bytes()
+    if tracemalloc.is_tracing():
+        daten["peak_memory_bytes"] = max(
+            [tracemalloc.get_traced_memory()[1]] + [s.get("peak_bytes", 0) for s in _stages.values()]
+        )
+        tracemalloc.stop()
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(daten, f, indent=2, ensure_ascii=False)
+    logger.info(f"📊 Metriken gespeichert unter {path}")
+    return path
+
+
+@contextmanager
+def profiled(path=None):
+    """Schreibt bei gesetztem path einen cProfile-Dump (auswertbar mit pstats oder snakeviz)."""
+    if not path:
+        yield
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        profiler.dump_stats(path)
+        logger.info(f"🔬 Profil gespeichert unter {path}")
+
+
+@contextmanager
+def instrumented_run(metrics_path=None, profile_path=None, trace_memory=False, **extra):
+    """Rahmen für einen CLI-Lauf: metrics_path "auto" schreibt nach output/metrics/, None schaltet ab.
+
+    Auch ein abgebrochener Lauf schreibt seine Metriken (mit "error") und beendet tracemalloc.
+    """
+    if metrics_path:
+        start_run(trace_memory)
+    try:
+        with profiled(profile_path):
+            yield
+    except BaseException as e:
+        extra["error"] = repr(e)
+        raise
+    finally:
+        if metrics_path:
+            write_metrics(None if metrics_path == "auto" else metrics_path, **extra)
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument("--metrics", nargs="?", const="auto", default=None, metavar="PATH",
+                        help="Zeiten, Zähler und Spitzen-RSS als JSON schreiben (Standard: output/metrics/)")
+    parser.add_argument("--tracemalloc", dest="trace_memory", action="store_true",
+                        help="Bei --metrics zusätzlich den Python-Speicher-Peak je Stufe messen (deutlich langsamer)")
+    parser.add_argument("--profile", default=None, metavar="PATH", help="cProfile-Dump des Laufs schreiben")
+    return parser
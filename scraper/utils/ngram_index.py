@@ -0,0 +1,227 @@
+# scraper/utils/ngram_index.py
+
+import re
+import numpy as np
+from scraper.utils.utils import normalize_text
+
+NGRAM = 3
+# n-Gramme, die in mehr als diesem Anteil der Dokumente vorkommen ("ref", " gm"), tragen
+# kaum zur Unterscheidung bei, vervielfachen aber die Postings – sie werden nicht indiziert
+MAX_DF = 0.05
+# Bereits zugeordnete Verwendungszwecke je Provider, die als zusätzliche Dokumente dienen
+MAX_REFERENZEN_PRO_PROVIDER = 20
+# Obergrenze für die dichte Score-Matrix eines Abfrageblocks (Anfragen × Dokumente)
+MAX_BLOCK_ZELLEN = 4_000_000
+
+_ZIFFERN = re.compile(r"\d+")
+
+
+def ngram_text(text):
+    """Normalisiert wie der exakte Matcher, entfernt Ziffern und markiert Wortanfänge.
+
+    Nur Wortanfänge, nicht Wortenden: abgeschnittene Händlernamen ("NETFLI") verlieren so
+    nur die n-Gramme der fehlenden Buchstaben.
+    """
+    return " " + " ".join(_ZIFFERN.sub(" ", normalize_text(text)).split())
+
+
+def _wortanzahl(text):
+    return ngram_text(text).count(" ")
+
+
+def ngrams(text, n=NGRAM):
+    s = ngram_text(text)
+    return {s[i:i + n] for i in range(len(s) - n + 1)}
+
+
+def _ngram_codes(texte, n):
+    """Kodiert die n-Gramme aller (bereits normalisierten) Texte als Zahlen: (Zeilen, Wörter, Codes).
+
+    Alle Texte liegen NUL-getrennt in einem Byte-Puffer; die n-Gramme entstehen durch
+    verschobene Sichten darauf statt durch eine Python-Schleife je Zeichen. Wörter sind über
+    alle Texte fortlaufend ab 1 nummeriert (jedes Wort beginnt mit genau einem Leerzeichen).
+    """
+    puffer = np.frombuffer("\0".join(texte).encode("ascii"), dtype=np.uint8).astype(np.int64)
+    if len(puffer) < n:
+        leer = np.empty(0, dtype=np.int64)
+        return leer, leer, leer
+    anzahl = len(puffer) - n + 1
+    codes = np.zeros(anzahl, dtype=np.int64)
+    gueltig = np.ones(anzahl, dtype=bool)
+    for k in range(n):
+        teil = puffer[k:k + anzahl]
+        codes = (codes << 8) | teil
+        gueltig &= teil != 0
+    zeilen = np.cumsum(puffer == 0)[:anzahl]
+    woerter = np.cumsum(puffer == ord(" "))[:anzahl]
+    return zeilen[gueltig], woerter[gueltig], codes[gueltig]
+
+
+class NgramIndex:
+    """Zeichen-n-Gramm-Index über Provider-Schlüssel und bereits zugeordnete Verwendungszwecke.
+
+    Dokumente und Anfragen sind binäre n-Gramm-Vektoren mit IDF-Gewichten, gespeichert als
+    CSR-artige NumPy-Arrays (Postings je n-Gramm). suggest() bewertet alle Anfragen eines
+    Blocks auf einmal: Score ist der gewichtete Anteil der n-Gramme eines Dokuments, die
+    auch in der Anfrage vorkommen – 1.0 heißt, das Dokument steckt vollständig darin.
+
+    Für das beste Dokument zählen dabei nur Treffer innerhalb eines zusammenhängenden
+    Fensters aus so vielen Wörtern, wie das Dokument hat: über die ganze Anfrage verstreute
+    n-Gramme ("Arabella Ralf" für "Aral") ergeben so keinen vollen Treffer.
+    """
+
+    def __init__(self, providers, n=NGRAM):
+        self.providers = list(providers)
+        self.n = n
+        self._provider_idx = {provider: i for i, (provider, _) in enumerate(self.providers)}
+        # Dokumente: (n-Gramm-Menge, Provider-Index, Wortanzahl); zuerst die Schlüssel selbst
+        self._docs = [(ngrams(provider, n), i, _wortanzahl(provider)) for i, (provider, _) in enumerate(self.providers)]
+        self._referenzen = {}  # Provider-Index → Menge bereits aufgenommener Texte
+        self._build()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add_references(self, texte, providers):
+        """Nimmt exakt zugeordnete Verwendungszwecke als weitere Dokumente ihres Providers auf.
+
+        Je Provider zählen höchstens MAX_REFERENZEN_PRO_PROVIDER verschiedene Texte.
+        """
+        neu = False
+        for text, provider in zip(texte, providers):
+            idx = self._provider_idx.get(provider)
+            if idx is None:
+                continue
+            text = ngram_text(text)
+            bekannte = self._referenzen.setdefault(idx, set())
+            if len(bekannte) >= MAX_REFERENZEN_PRO_PROVIDER or text in bekannte:
+                continue
+            bekannte.add(text)
+            self._docs.append((ngrams(text, self.n), idx, _wortanzahl(text)))
+            neu = True
+        if neu:
+            self._build()
+
+    def _build(self):
+        vocab = {}
+        doc_ids, term_ids = [], []
+        for doc, (grams, _, _) in enumerate(self._docs):
+            for gram in grams:
+                term_ids.append(vocab.setdefault(gram, len(vocab)))
+                doc_ids.append(doc)
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+
+        anzahl_docs = len(self._docs)
+        df = np.bincount(term_ids, minlength=len(vocab))
+        idf = np.log((anzahl_docs + 1) / (df + 1)) + 1
+        # Häufige n-Gramme nur weglassen, wenn es genug Dokumente gibt, um sie als häufig zu erkennen
+        behalten = df <= max(1, MAX_DF * anzahl_docs) if anzahl_docs >= 100 else np.ones(len(vocab), dtype=bool)
+
+        neue_id = np.full(len(vocab), -1, dtype=np.int64)
+        neue_id[behalten] = np.arange(int(behalten.sum()))
+        _, _, vocab_codes = _ngram_codes(list(vocab), self.n)
+        reihenfolge = np.argsort(vocab_codes)
+        self._vocab_codes = vocab_codes[reihenfolge]
+        self._vocab_ids = neue_id[reihenfolge]
+        self._idf = idf[behalten]
+
+        maske = behalten[term_ids]
+        doc_ids, term_ids = doc_ids[maske], neue_id[term_ids[maske]]
+        reihenfolge = np.argsort(term_ids, kind="stable")
+        self._post_doc = doc_ids[reihenfolge]
+        self._post_ptr = np.concatenate(([0], np.cumsum(np.bincount(term_ids, minlength=len(self._idf)))))
+        self._doc_norm = np.bincount(doc_ids, weights=self._idf[term_ids], minlength=anzahl_docs)
+        self._doc_provider = np.array([idx for _, idx, _ in self._docs], dtype=np.int64)
+        self._doc_woerter = np.array([max(1, woerter) for _, _, woerter in self._docs], dtype=np.int64)
+        # (Dokument, n-Gramm)-Paare sortiert, für den Nachschlag "enthält Dokument d das n-Gramm t"
+        self._doc_terme = np.sort(doc_ids * len(self._idf) + term_ids)
+
+    def _query_terms(self, texte):
+        """Treffer der (normalisierten) Anfragen im Vokabular als (Zeilen, Wörter, n-Gramm-IDs)."""
+        zeilen, woerter, codes = _ngram_codes(texte, self.n)
+        if not len(self._vocab_codes):
+            return zeilen[:0], woerter[:0], codes[:0]
+        pos = np.minimum(np.searchsorted(self._vocab_codes, codes), len(self._vocab_codes) - 1)
+        terme = self._vocab_ids[pos]
+        treffer = (self._vocab_codes[pos] == codes) & (terme >= 0)
+        return zeilen[treffer], woerter[treffer], terme[treffer]
+
+    def _distinct(self, gruppen, terme):
+        """Binäre Vektoren: jedes n-Gramm zählt je Gruppe einmal (sortieren + Nachbarvergleich)."""
+        paare = np.sort(gruppen * len(self._idf) + terme)
+        erste = np.ones(len(paare), dtype=bool)
+        erste[1:] = paare[1:] != paare[:-1]
+        paare = paare[erste]
+        return paare // len(self._idf), paare % len(self._idf)
+
+    def suggest(self, texte):
+        """Bester Provider je Text als (Provider-Indizes, Scores); -1 und 0.0, wenn nichts passt."""
+        texte = [ngram_text(text) for text in texte]
+        beste = np.full(len(texte), -1, dtype=np.int64)
+        scores = np.zeros(len(texte))
+        anzahl_docs = len(self._docs)
+        if not texte or not anzahl_docs:
+            return beste, scores
+
+        treffer = self._query_terms(texte)
+        zeilen, terme = self._distinct(treffer[0], treffer[2])
+        beste_doc = np.zeros(len(texte), dtype=np.int64)
+        # Postings aller Anfrage-n-Gramme in einem Schritt aufspannen (Sparse × Sparse)
+        laengen = self._post_ptr[terme + 1] - self._post_ptr[terme]
+        block = max(1, MAX_BLOCK_ZELLEN // anzahl_docs)
+        grenzen = np.searchsorted(zeilen, np.arange(0, len(texte) + block, block))
+        for b, (von, bis) in enumerate(zip(grenzen, grenzen[1:])):
+            if von == bis:
+                continue
+            start = b * block
+            anzahl = min(block, len(texte) - start)
+            l = laengen[von:bis]
+            gesamt = int(l.sum())
+            versatz = np.arange(gesamt) - np.repeat(np.cumsum(l) - l, l)
+            docs = self._post_doc[np.repeat(self._post_ptr[terme[von:bis]], l) + versatz]
+            gewichte = np.repeat(self._idf[terme[von:bis]], l)
+            matrix = np.bincount(
+                np.repeat(zeilen[von:bis] - start, l) * anzahl_docs + docs,
+                weights=gewichte, minlength=anzahl * anzahl_docs,
+            ).reshape(anzahl, anzahl_docs)
+            matrix /= np.maximum(self._doc_norm, 1e-12)
+            doc = matrix.argmax(axis=1)
+            scores[start:start + anzahl] = matrix[np.arange(anzahl), doc]
+            beste_doc[start:start + anzahl] = doc
+
+        scores = np.minimum(scores, self._fenster_scores(texte, treffer, beste_doc))
+        beste[scores > 0] = self._doc_provider[beste_doc[scores > 0]]
+        return beste, np.where(scores > 0, scores, 0.0)
+
+    def _fenster_scores(self, texte, treffer, beste_doc):
+        """Score des besten Dokuments je Text, gezählt im besten zusammenhängenden Wortfenster.
+
+        Das Fenster ist so breit wie das Dokument Wörter hat (höchstens so breit wie der Text);
+        Treffer werden je Wort aufsummiert, die Fenstersummen über kumulierte Summen gebildet.
+        """
+        wortanzahl = np.array([text.count(" ") for text in texte], dtype=np.int64)
+        erstes_wort = np.cumsum(wortanzahl) - wortanzahl + 1
+        summen = np.zeros(int(wortanzahl.sum()) + 1)
+
+        zeilen, woerter, terme = treffer
+        wort_zeile = np.repeat(np.arange(len(texte)), wortanzahl)
+        woerter, terme = self._distinct(woerter, terme)
+        if len(woerter):
+            schluessel = beste_doc[wort_zeile[woerter - 1]] * len(self._idf) + terme
+            pos = np.minimum(np.searchsorted(self._doc_terme, schluessel), len(self._doc_terme) - 1)
+            im_doc = self._doc_terme[pos] == schluessel
+            summen[1:] = np.bincount(woerter[im_doc] - 1, weights=self._idf[terme[im_doc]], minlength=len(summen) - 1)
+        kumuliert = np.cumsum(summen)
+
+        breite = np.minimum(self._doc_woerter[beste_doc], wortanzahl)
+        starts = np.maximum(wortanzahl - breite + 1, 0)
+        fenster = np.zeros(len(texte))
+        mit = starts > 0
+        if mit.any():
+            s = starts[mit]
+            versatz = np.arange(int(s.sum())) - np.repeat(np.cumsum(s) - s, s)
+            anfang = np.repeat(erstes_wort[mit], s) + versatz
+            werte = kumuliert[anfang + np.repeat(breite[mit], s) - 1] - kumuliert[anfang - 1]
+            fenster[mit] = np.maximum.reduceat(werte, np.cumsum(s) - s)
+        return fenster / np.maximum(self._doc_norm[beste_doc], 1e-12)
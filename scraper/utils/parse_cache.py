@@ -0,0 +1,63 @@
+# scraper/utils/parse_cache.py
+
+import os
+import hashlib
+import pickle
+from scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+CACHE_FOLDER = os.path.join(BASE_DIR, "cache", "parser")
+
+
+def compute_file_hash(path, chunk_size=1024 * 1024):
+    """Berechnet den SHA-256-Hash des Dateiinhalts."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _cache_file(datei_hash, bank_typ, parser_version, cache_folder):
+    return os.path.join(cache_folder, f"{bank_typ}_v{parser_version}_{datei_hash}.pkl")
+
+
+def load_from_cache(datei_hash, bank_typ, parser_version, cache_folder=CACHE_FOLDER):
+    """Liefert die gecachten Buchungen oder None, falls kein gültiger Eintrag existiert."""
+    path = _cache_file(datei_hash, bank_typ, parser_version, cache_folder)
+    if not os.path.exists(path):
+        return None
+    try:
+        # pickle statt pd.read_pickle: pandas wird erst beim Entpacken importiert
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        logger.warning(f"⚠️ Defekter Cache-Eintrag {path}: {e}")
+        return None
+
+
+def save_to_cache(df, datei_hash, bank_typ, parser_version, cache_folder=CACHE_FOLDER):
+    """Speichert die Buchungen atomar, damit parallele Worker sich nicht stören."""
+    os.makedirs(cache_folder, exist_ok=True)
+    path = _cache_file(datei_hash, bank_typ, parser_version, cache_folder)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def clear_cache(bank_typ=None, cache_folder=CACHE_FOLDER):
+    """Löscht alle Cache-Einträge (optional nur für einen Banktyp) und liefert deren Anzahl."""
+    if not os.path.exists(cache_folder):
+        return 0
+
+    removed = 0
+    for filename in os.listdir(cache_folder):
+        if bank_typ and not filename.startswith(f"{bank_typ}_"):
+            continue
+        os.remove(os.path.join(cache_folder, filename))
+        removed += 1
+
+    logger.info(f"🧹 {removed} Cache-Einträge gelöscht")
+    return removed
@@ -0,0 +1,157 @@
+# scraper/utils/provider_matcher.py
+
+from collections import OrderedDict, deque
+from scraper.utils.utils import normalize_text
+
+
+class ProviderMatcher:
+    """Aho-Corasick-Automat über die normalisierten Provider-Schlüssel eines Mappings.
+
+    Wird einmal pro geladenem Mapping gebaut und findet alle enthaltenen Provider
+    in einem Durchlauf über den Text, statt jeden Provider einzeln zu prüfen.
+    Ergebnisse von longest_match werden in einem begrenzten LRU-Memo gehalten.
+    Mit fuzzy_threshold schlägt suggest() für Texte ohne exakten Treffer den ähnlichsten
+    Provider vor; Vorschläge ab dieser Schwelle übernimmt die Verarbeitung automatisch.
+    """
+
+    def __init__(self, mapping, memo_size=100_000, fuzzy_threshold=None):
+        self.mapping = dict(mapping)
+        self.providers = list(self.mapping.items())
+        self.memo_size = memo_size
+        self.fuzzy_threshold = fuzzy_threshold
+        self._memo = OrderedDict()
+        self._ngram_index = None
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._longest = [-1]
+        self._first = [-1]
+        # Provider, deren normalisierter Schlüssel leer ist, sind in jedem Text enthalten
+        self._always_longest = -1
+        self._always_first = -1
+
+        for idx, (provider, _) in enumerate(self.providers):
+            key = normalize_text(provider)
+            if not key:
+                self._always_longest = self._better_longest(self._always_longest, idx)
+                self._always_first = self._better_first(self._always_first, idx)
+                continue
+            state = 0
+            for ch in key:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._longest.append(-1)
+                    self._first.append(-1)
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._longest[state] = self._better_longest(self._longest[state], idx)
+            self._first[state] = self._better_first(self._first[state], idx)
+
+        self._build_fail_links()
+
+    def _better_longest(self, a, b):
+        # Längster Original-Schlüssel gewinnt, bei Gleichstand der frühere Eintrag
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        len_a, len_b = len(self.providers[a][0]), len(self.providers[b][0])
+        if len_a != len_b:
+            return a if len_a > len_b else b
+        return min(a, b)
+
+    @staticmethod
+    def _better_first(a, b):
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        return min(a, b)
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Treffer der Suffix-Zustände übernehmen (BFS: fail ist bereits fertig)
+                self._longest[nxt] = self._better_longest(self._longest[nxt], self._longest[self._fail[nxt]])
+                self._first[nxt] = self._better_first(self._first[nxt], self._first[self._fail[nxt]])
+
+    def scan(self, normalized_text):
+        """Liefert (Index längster Treffer, Index erster Treffer im Mapping) oder -1."""
+        goto, fail = self._goto, self._fail
+        longest_idx, first_idx = self._always_longest, self._always_first
+        state = 0
+        for ch in normalized_text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if self._longest[state] >= 0:
+                longest_idx = self._better_longest(longest_idx, self._longest[state])
+                first_idx = self._better_first(first_idx, self._first[state])
+        return longest_idx, first_idx
+
+    def longest_match(self, text):
+        """Liefert (Provider, Kategorie) des längsten enthaltenen Providers oder None."""
+        memo = self._memo
+        if text in memo:
+            memo.move_to_end(text)
+            return memo[text]
+
+        idx, _ = self.scan(normalize_text(text))
+        result = self.providers[idx] if idx >= 0 else None
+
+        if self.memo_size:
+            memo[text] = result
+            if len(memo) > self.memo_size:
+                memo.popitem(last=False)
+        return result
+
+    def first_match(self, text):
+        """Liefert (Provider, Kategorie) des ersten enthaltenen Providers in Mapping-Reihenfolge oder None."""
+        _, idx = self.scan(normalize_text(text))
+        return self.providers[idx] if idx >= 0 else None
+
+    def has_match(self, text):
+        return self.scan(normalize_text(text))[0] >= 0
+
+    def ngram_index(self):
+        """n-Gramm-Index über die Provider-Schlüssel, beim ersten Bedarf gebaut."""
+        if self._ngram_index is None:
+            from scraper.utils.ngram_index import NgramIndex
+
+            self._ngram_index = NgramIndex(self.providers)
+        return self._ngram_index
+
+    def suggest(self, texts):
+        """Ähnlichster Provider je Text als Liste von ((Provider, Kategorie) oder None, Score)."""
+        indices, scores = self.ngram_index().suggest(texts)
+        return [(self.providers[i] if i >= 0 else None, float(score)) for i, score in zip(indices, scores)]
+
+
+# Zuletzt kompiliertes Mapping: (dict-Objekt, Anzahl Einträge, Matcher)
+_compiled = None
+
+
+def get_matcher(mapping):
+    """Liefert einen kompilierten Matcher; ein bereits kompilierter wird direkt zurückgegeben.
+
+    Ein dict wird nach Identität (und Länge) wiedererkannt statt Eintrag für Eintrag verglichen,
+    damit jeder Aufruf O(1) bleibt. Nach dem Ändern vorhandener Einträge ein neues dict oder
+    einen ProviderMatcher übergeben.
+    """
+    global _compiled
+    if isinstance(mapping, ProviderMatcher):
+        return mapping
+    if _compiled is None or _compiled[0] is not mapping or _compiled[1] != len(mapping):
+        _compiled = (mapping, len(mapping), ProviderMatcher(mapping))
+    return _compiled[2]
@@ -0,0 +1,107 @@
+# scraper/utils/schema.py
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Gemeinsame Spaltentypen für alle Stufen – vom Parser-Output bis zum Dashboard.
+# Text mit wenigen verschiedenen Werten (Provider, Kategorie, Bank) ist kategorial,
+# Jahr und Monat sind kleine Ganzzahlen, Beträge zusätzlich exakt in Cent (int64).
+# Das Datum bleibt datetime64 (8 Byte, vektorisierte .dt-Zugriffe); der frühere
+# Monat-Text pro Zeile entfällt zugunsten eines int8.
+
+DATUM = "datetime64[ns]"
+KATEGORIAL = "category"
+
+# Verwendungszweck ist fast immer eindeutig und bleibt beim String-Typ von pandas
+PARSED_SCHEMA = {
+    "Datum": DATUM,
+    "Betrag": "float64",
+    "Betrag_Cent": "int64",
+}
+
+PROCESSED_SCHEMA = {
+    "Datum": DATUM,
+    "Betrag": "float64",
+    "Betrag_Cent": "int64",
+    "Provider": KATEGORIAL,
+    "Kategorie": KATEGORIAL,
+    "Konto": KATEGORIAL,
+}
+
+DASHBOARD_SCHEMA = {
+    **PROCESSED_SCHEMA,
+    "Banktyp": KATEGORIAL,
+    "Jahr": "int16",
+    "Monat": "int8",
+}
+
+ROLLUP_SCHEMA = {
+    "Jahr": "int16",
+    "Monat": "int8",
+    "Wochentag": "int8",
+    "Kategorie": KATEGORIAL,
+    "Provider": KATEGORIAL,
+    "Banktyp": KATEGORIAL,
+    "Betrag_Cent": "int64",
+    "Anzahl": "int64",
+    "Betrag": "float64",
+}
+
+
+def _convert(series, dtype):
+    if dtype == DATUM:
+        return pd.to_datetime(series, errors="coerce").astype(DATUM)
+    return series.astype(dtype)
+
+
+def apply_schema(df, schema):
+    """Wandelt alle vorhandenen Spalten in die Typen des Schemas; fehlende Spalten bleiben fehlend.
+
+    Fehlende Cent-Beträge (ältere CSVs) werden aus Betrag abgeleitet.
+    """
+    df = df.copy()
+    if "Betrag_Cent" in schema and "Betrag" in df.columns:
+        abgeleitet = np.rint(df["Betrag"].astype("float64") * 100)
+        if "Betrag_Cent" in df.columns:
+            df["Betrag_Cent"] = pd.to_numeric(df["Betrag_Cent"], errors="coerce").fillna(abgeleitet)
+        else:
+            df["Betrag_Cent"] = abgeleitet
+        df["Betrag_Cent"] = df["Betrag_Cent"].astype("int64")
+
+    for column, dtype in schema.items():
+        if column in df.columns and df[column].dtype != dtype:
+            df[column] = _convert(df[column], dtype)
+    return df
+
+
+def read_csv(path, schema):
+    """Liest eine CSV direkt mit den Typen des Schemas (Kategorien ohne Umweg über Python-Strings)."""
+    header = pd.read_csv(path, nrows=0).columns
+    df = pd.read_csv(
+        path,
+        dtype={c: t for c, t in schema.items() if t == KATEGORIAL and c in header},
+        parse_dates=[c for c, t in schema.items() if t == DATUM and c in header],
+    )
+    return apply_schema(df, schema)
+
+
+def concat(frames, schema):
+    """pd.concat, das kategoriale Spalten kategorial hält (gemeinsame Kategorien statt object)."""
+    frames = [f.copy() for f in frames]
+    for column, dtype in schema.items():
+        if dtype != KATEGORIAL:
+            continue
+        vorhanden = [f[column].astype(KATEGORIAL) for f in frames if column in f.columns]
+        if not vorhanden:
+            continue
+        gemeinsam = pd.CategoricalDtype(union_categoricals(vorhanden, sort_categories=True, ignore_order=True).categories)
+        for f in frames:
+            if column in f.columns:
+                f[column] = f[column].astype(gemeinsam)
+    return apply_schema(pd.concat(frames, ignore_index=True), schema)
+
+
+def memory_usage(df):
+    """Tatsächlicher Speicherbedarf in Bytes je Spalte (inklusive Python-Strings)."""
+    return df.memory_usage(deep=True, index=False)
@@ -1,8 +1,8 @@
 # scraper/utils/utils.py
 
 import re
+import datetime
 import unicodedata
-import pandas as pd
 
 def normalize_text(text):
     """Normalisiert Text auf Kleinbuchstaben, ASCII und entfernt Sonderzeichen."""
@@ -21,21 +21,56 @@ def detect_bank_typ(filename):
     else:
         return "unbekannt"
 
+# Nur Kopfzeilen der Umsatzaufstellung – "Mastercard"/"Kreditkarte" stehen auch in
+# Volksbank-Auszügen (z. B. bei der Abrechnung der Kreditkarte)
+MASTERCARD_MARKER = ("Umsatzaufstellung", "Buchungs-Beleg-")
+VOLKSBANK_MARKER = ("Volksbank", "Raiffeisenbank", "Kontoauszug")
+# Volksbank-Buchungszeilen enden mit S (Soll) oder H (Haben)
+VOLKSBANK_ZEILE = re.compile(r"^\s*\d{2}\.\d{2}\.\s+\d{2}\.\d{2}\.\s+.*\s+\d{1,3}(?:\.\d{3})*,\d{2}\s+[SH]\s*$", re.M)
+
+def detect_bank_typ_from_text(text):
+    """Erkennt den Banktyp anhand von Kopfzeilen/Layout im Text der ersten Seite.
+
+    Das Layout der Buchungszeilen (S/H) ist das stärkste Merkmal und wird zuerst geprüft.
+    """
+    if VOLKSBANK_ZEILE.search(text):
+        return "volksbank"
+    if any(marker in text for marker in MASTERCARD_MARKER):
+        return "mastercard"
+    if any(marker in text for marker in VOLKSBANK_MARKER):
+        return "volksbank"
+    return "unbekannt"
+
 def extract_jahr_from_filename(filename):
     """Extrahiert das Jahr aus einem Dateinamen im Format 'vom_YYYY.MM.DD'."""
     jahr_match = re.search(r"vom_(\d{4})\.\d{2}\.\d{2}", filename)
     if jahr_match:
         return int(jahr_match.group(1))
-    return pd.Timestamp.now().year  # Fallback: aktuelles Jahr
+    return datetime.date.today().year  # Fallback: aktuelles Jahr
 
 def map_company(verwendungszweck, mapping):
     """Mapped einen Verwendungszweck auf einen bekannten Anbieter oder 'Sonstiges'."""
-    verwendungszweck = normalize_text(verwendungszweck)
-    for anbieter, kategorie in mapping.items():
-        if normalize_text(anbieter) in verwendungszweck:
-            return kategorie
+    from scraper.utils.provider_matcher import get_matcher
+
+    match = get_matcher(mapping).first_match(verwendungszweck)
+    if match:
+        return match[1]
     return "Sonstiges"
 
 def create_empty_transaction_dataframe():
+    import pandas as pd  # erst hier importieren, damit scraper.main schnell startet
+
     return pd.DataFrame(columns=["Datum", "Betrag", "Verwendungszweck", "Provider", "Kategorie"])
 
+def append_csv(df, path):
+    """Hängt Zeilen an eine CSV an; Spaltenreihenfolge folgt dem vorhandenen Header, neue Dateien bekommen einen."""
+    import os
+    import pandas as pd
+
+    if os.path.exists(path) and os.path.getsize(path):
+        df = df.reindex(columns=pd.read_csv(path, nrows=0).columns)
+        df.to_csv(path, mode="a", header=False, index=False)
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        df.to_csv(path, index=False)
+    return path
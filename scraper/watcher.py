@@ -0,0 +1,426 @@
+# scraper/watcher.py
+
+import sys
+import os
+import json
+import time
+import errno
+import select
+import struct
+import argparse
+import threading
+
+# Append Projekt-Wurzelverzeichnis
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scraper.main import add_parse_arguments, resolve_parse_arguments, append_bookings, parse_pdf
+from scraper.main import _init_worker as _init_parse_worker
+from scraper.parser import extraction
+from scraper.utils import metrics, parse_cache
+from scraper.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+INPUT_FOLDER = os.path.join(BASE_DIR, "input")
+PARSER_OUTPUT_FOLDER = os.path.join(BASE_DIR, "output", "parser_output")
+# Inhalts-Hashes bereits übernommener PDFs – ein Neustart hängt nichts doppelt an
+STATE_PATH = os.path.join(BASE_DIR, "output", "watcher_state.json")
+
+# Eine Datei gilt als fertig geschrieben, wenn Größe und mtime so lange unverändert sind
+SETTLE_SECONDS = 1.0
+POLL_INTERVAL = 1.0
+
+
+# === Änderungen erkennen ===
+class InotifyWatcher:
+    """Meldet neue oder fertig geschriebene Dateien eines Ordners über Linux-inotify (ohne Zusatzpaket)."""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_Q_OVERFLOW = 0x4000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, folder):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify nicht verfügbar")
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fehlgeschlagen")
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch für {folder} fehlgeschlagen")
+        self.folder = folder
+
+    def wait(self, timeout):
+        """Liefert die Pfade mit Ereignissen; None heißt: Ereignisse verloren, Ordner neu einlesen."""
+        bereit, _, _ = select.select([self.fd], [], [], timeout)
+        if not bereit:
+            return set()
+        try:
+            daten = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        pfade, offset = set(), 0
+        while offset < len(daten):
+            _, mask, _, laenge = self._EVENT.unpack_from(daten, offset)
+            offset += self._EVENT.size
+            name = daten[offset:offset + laenge].rstrip(b"\0")
+            offset += laenge
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if name:
+                pfade.add(os.path.join(self.folder, os.fsdecode(name)))
+        return pfade
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback ohne inotify (macOS, Windows, Netzlaufwerke): liest den Ordner in festen Abständen neu ein."""
+
+    def __init__(self, folder, interval=POLL_INTERVAL):
+        self.folder = folder
+        self.interval = interval
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        return None
+
+    def close(self):
+        pass
+
+
+def create_watcher(folder, polling=False, interval=POLL_INTERVAL):
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(folder)
+        except OSError as e:
+            logger.warning(f"⚠️ inotify nicht nutzbar ({e}) – wechsle auf Polling")
+    return PollingWatcher(folder, interval)
+
+
+class Debouncer:
+    """Hält Dateien zurück, bis Größe und mtime settle Sekunden lang unverändert sind."""
+
+    def __init__(self, settle=SETTLE_SECONDS):
+        self.settle = settle
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def observe(self, path, now=None):
+        now = time.monotonic() if now is None else now
+        if path not in self._pending:
+            self._pending[path] = (None, now)
+
+    def ready(self, now=None):
+        """Entfernt und liefert alle Pfade, die lange genug stabil sind (älteste zuerst)."""
+        now = time.monotonic() if now is None else now
+        fertig = []
+        for path, (signatur, seit) in list(self._pending.items()):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                del self._pending[path]
+                continue
+            aktuell = (stat.st_size, stat.st_mtime_ns)
+            if aktuell != signatur:
+                self._pending[path] = (aktuell, now)
+            elif stat.st_size and now - seit >= self.settle:
+                fertig.append((seit, path))
+        fertig.sort()
+        for _, path in fertig:
+            del self._pending[path]
+        return [path for _, path in fertig]
+
+    def requeue(self, path, now=None):
+        """Legt eine fertige Datei zurück, z. B. wenn die Warteschlange voll ist."""
+        now = time.monotonic() if now is None else now
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        self._pending[path] = ((stat.st_size, stat.st_mtime_ns), now - self.settle)
+
+
+# === Verarbeitung in Worker-Prozessen ===
+_matcher = None
+
+
+def _init_worker(config):
+    global _matcher
+    from scraper.processor.processor import load_matcher
+
+    _init_parse_worker(config, False)
+    # Mapping einmal je Worker laden, das Memo des Matchers gilt für alle folgenden PDFs
+    _matcher = load_matcher()
+
+
+def ingest_file(pdf_path, cache_folder=None, matcher=None):
+    """Parst und verarbeitet eine PDF; liefert (Banktyp, {Jahr: (geparst, verarbeitet)}, Metriken)."""
+    import pandas as pd
+    from scraper.processor.processor import process_dataframe
+
+    metrics.reset()
+    bank_typ, df, _ = parse_pdf(pdf_path, cache_folder)
+    jahre = {}
+    if df is not None and "Datum" in df.columns:
+        df = df.assign(Datum=pd.to_datetime(df["Datum"], errors="coerce")).dropna(subset=["Datum"])
+        for jahr, group in df.groupby(df["Datum"].dt.year):
+            jahre[int(jahr)] = (group, process_dataframe(group, matcher or _matcher))
+    return bank_typ, jahre, metrics.snapshot()
+
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def append_result(bank_typ, jahre, parser_output_folder, processed_folder, storage="csv", db_path=None):
+    """Hängt das Ergebnis von ingest_file an die Jahresausgaben an und liefert die Anzahl Buchungen."""
+    from scraper.processor.processor import append_processed, append_store
+
+    zeilen = 0
+    for jahr, (geparst, verarbeitet) in sorted(jahre.items()):
+        append_bookings(geparst, bank_typ, jahr, parser_output_folder, storage, db_path)
+        if storage == "sqlite":
+            append_store(verarbeitet, bank_typ, db_path)
+        else:
+            append_processed(verarbeitet, bank_typ, jahr, processed_folder)
+        zeilen += len(verarbeitet)
+    return zeilen
+
+
+def commit_result(datei_hash, dateiname, bank_typ, jahre, parser_output_folder, processed_folder, storage="csv",
+                  db_path=None, state_path=STATE_PATH):
+    """Hängt ein Ergebnis von ingest_file genau einmal an; liefert (Buchungen oder None, Zustandseintrag).
+
+    Status im Zustand: "ok", "leer" (keine Buchungen gefunden) oder "fehler" (Banktyp nicht erkannt).
+
+    Der Zustand wird frisch gelesen, damit auch Übernahmen anderer Prozesse (Dienst) zählen.
+    Vor dem Anhängen steht der Eintrag schon als "pending" im Zustand: stürzt der Prozess
+    dazwischen ab, hängt ein Neustart die PDF nicht erneut an – der Eintrag bleibt zur Prüfung.
+    """
+    state = load_state(state_path)
+    if datei_hash in state:
+        return None, state[datei_hash]
+    eintrag = {"file": dateiname, "bank": bank_typ, "status": "pending", "ingested": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    if bank_typ == "unbekannt":
+        # Nichts anzuhängen; als Fehler vermerken, damit die Datei beim Start gemeldet wird
+        eintrag.update(status="fehler", error="Banktyp nicht erkannt", rows=0)
+        state[datei_hash] = eintrag
+        save_state(state, state_path)
+        return 0, eintrag
+    state[datei_hash] = eintrag
+    save_state(state, state_path)
+
+    zeilen = append_result(bank_typ, jahre, parser_output_folder, processed_folder, storage, db_path)
+    eintrag.update(status="ok" if zeilen else "leer", rows=zeilen)
+    state = load_state(state_path)
+    state[datei_hash] = eintrag
+    save_state(state, state_path)
+    return zeilen, eintrag
+
+
+def _ausgaben_vorhanden(parser_output_folder, storage="csv", db_path=None):
+    if storage == "sqlite":
+        from scraper.storage import sqlite_store
+        return os.path.exists(db_path or sqlite_store.DB_PATH)
+    return os.path.isdir(parser_output_folder) and any(
+        f.startswith("buchungen_") and f.endswith(".csv") for f in os.listdir(parser_output_folder)
+    )
+
+
+def seed_state(input_folder, parser_output_folder, storage="csv", db_path=None, state_path=STATE_PATH):
+    """Vermerkt beim ersten Start die PDFs in input_folder als "bestand"; liefert deren Anzahl.
+
+    Komplettläufe (main.py/processor.py) verarbeiten den ganzen Ordner, führen aber keinen Zustand.
+    Gibt es schon Ausgaben, aber noch keinen Zustand, stammen die PDFs aus einem solchen Lauf –
+    ohne diesen Abgleich würde der erste Scan (bzw. ein erneuter Upload) sie ein zweites Mal anhängen.
+    """
+    if os.path.exists(state_path) or not _ausgaben_vorhanden(parser_output_folder, storage, db_path):
+        return 0
+    state = {}
+    if os.path.isdir(input_folder):
+        for dateiname in sorted(os.listdir(input_folder)):
+            if dateiname.endswith(".pdf"):
+                datei_hash = parse_cache.compute_file_hash(os.path.join(input_folder, dateiname))
+                state.setdefault(datei_hash, {"file": dateiname, "status": "bestand",
+                                              "ingested": time.strftime("%Y-%m-%dT%H:%M:%S")})
+    save_state(state, state_path)
+    logger.info(f"📋 {len(state)} PDFs aus bisherigen Komplettläufen als übernommen vermerkt ({state_path})")
+    return len(state)
+
+
+def _mark_failed(datei_hash, fehler, state_path=STATE_PATH):
+    state = load_state(state_path)
+    if datei_hash in state:
+        state[datei_hash].update(status="fehler", error=str(fehler))
+        save_state(state, state_path)
+
+
+def watch(input_folder=None, parser_output_folder=None, processed_folder=None, jobs=1, cache_folder=None,
+          storage="csv", db_path=None, queue_size=None, settle=SETTLE_SECONDS, poll_interval=POLL_INTERVAL,
+          polling=False, state_path=STATE_PATH, stop_event=None):
+    """Überwacht input_folder und übernimmt jede neue PDF, sobald sie fertig geschrieben ist.
+
+    Höchstens queue_size PDFs (Standard: 2 × jobs) sind gleichzeitig in Arbeit. Ist die
+    Warteschlange voll, bleiben weitere Dateien im Ordner liegen, bis ein Platz frei wird.
+    Läuft bis stop_event gesetzt wird oder bis Strg+C; laufende PDFs werden noch fertig geschrieben.
+    """
+    from concurrent.futures import ProcessPoolExecutor, wait as wait_futures, FIRST_COMPLETED
+
+    input_folder = input_folder or INPUT_FOLDER
+    parser_output_folder = parser_output_folder or PARSER_OUTPUT_FOLDER
+    queue_size = queue_size or 2 * jobs
+    stop_event = stop_event or threading.Event()
+    os.makedirs(input_folder, exist_ok=True)
+    os.makedirs(parser_output_folder, exist_ok=True)
+
+    seed_state(input_folder, parser_output_folder, storage, db_path, state_path)
+    offen = [eintrag["file"] for eintrag in load_state(state_path).values() if eintrag.get("status") in ("pending", "fehler")]
+    if offen:
+        # Nicht automatisch wiederholen – die Zeilen könnten schon (teilweise) angehängt sein
+        logger.warning(f"⚠️ Fehlgeschlagen oder unvollständig übernommen, bitte prüfen und den Eintrag in "
+                       f"{state_path} löschen: {', '.join(offen)}")
+    bekannt = {}  # Pfad → (Größe, mtime) bereits gesehener Stände
+    debouncer = Debouncer(settle)
+    in_arbeit = {}  # Future → (Pfad, Hash, Eingang)
+    eingang = {}
+
+    def einlesen(pfade=None):
+        if pfade is None:
+            pfade = [os.path.join(input_folder, f) for f in os.listdir(input_folder)]
+        for path in pfade:
+            if not path.endswith(".pdf"):
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signatur = (stat.st_size, stat.st_mtime_ns)
+            if bekannt.get(path) != signatur:
+                bekannt[path] = signatur
+                eingang.setdefault(path, time.monotonic())
+                debouncer.observe(path)
+
+    def abschliessen(future):
+        path, datei_hash, seit = in_arbeit.pop(future)
+        eingang.pop(path, None)
+        try:
+            bank_typ, jahre, worker_metrics = future.result()
+        except Exception as e:
+            logger.error(f"❌ Worker-Fehler bei {os.path.basename(path)}: {e}")
+            metrics.count("parse_errors")
+            return
+        metrics.merge(worker_metrics)
+        if bank_typ == "unbekannt":
+            logger.warning(f"⚠️ Unbekannter Dateityp: {os.path.basename(path)}")
+        try:
+            with metrics.stage("append"):
+                zeilen, eintrag = commit_result(datei_hash, os.path.basename(path), bank_typ, jahre,
+                                                parser_output_folder, processed_folder, storage, db_path, state_path)
+        except Exception as e:
+            # Schreibfehler betreffen nur diese Datei, die Überwachung läuft weiter
+            logger.error(f"❌ Schreibfehler bei {os.path.basename(path)}: {e}")
+            metrics.count("append_errors")
+            _mark_failed(datei_hash, e, state_path)
+            return
+        if zeilen is None:
+            logger.info(f"♻️ {os.path.basename(path)} bereits übernommen ({eintrag['file']})")
+            return
+        if eintrag["status"] != "ok":
+            if eintrag["status"] == "leer":
+                logger.warning(f"⚠️ Keine Buchungen in {os.path.basename(path)}")
+            metrics.count("files_skipped")
+            return
+        metrics.count("files_ingested")
+        logger.info(f"⏱️ {os.path.basename(path)}: {zeilen} Buchungen {time.monotonic() - seit:.1f}s nach Eingang")
+
+    watcher = create_watcher(input_folder, polling, poll_interval)
+    logger.info(f"👀 Überwache {input_folder} ({type(watcher).__name__}, {jobs} Prozesse, Warteschlange {queue_size})")
+    einlesen()
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(extraction.current_config(),)) as executor:
+            while not stop_event.is_set():
+                for path in debouncer.ready():
+                    if len(in_arbeit) >= queue_size:
+                        # Gegendruck: die Datei bleibt im Ordner, bis ein Platz frei ist
+                        debouncer.requeue(path)
+                        continue
+                    try:
+                        datei_hash = parse_cache.compute_file_hash(path)
+                    except OSError as e:
+                        logger.warning(f"⚠️ {path} nicht lesbar: {e}")
+                        continue
+                    # Auch gleichzeitig abgelegte Kopien derselben PDF nur einmal übernehmen; der Zustand
+                    # wird neu gelesen, damit vom Dienst übernommene PDFs ebenfalls zählen
+                    if datei_hash in load_state(state_path) or any(h == datei_hash for _, h, _ in in_arbeit.values()):
+                        logger.info(f"♻️ {os.path.basename(path)} bereits übernommen")
+                        eingang.pop(path, None)
+                        continue
+                    future = executor.submit(ingest_file, path, cache_folder)
+                    in_arbeit[future] = (path, datei_hash, eingang.get(path, time.monotonic()))
+
+                if in_arbeit:
+                    fertig, _ = wait_futures(list(in_arbeit), timeout=0, return_when=FIRST_COMPLETED)
+                    for future in fertig:
+                        abschliessen(future)
+
+                # Kurz warten, solange etwas aussteht, sonst bis zum nächsten Ereignis
+                einlesen(watcher.wait(0.1 if (len(debouncer) or in_arbeit) else poll_interval))
+    except KeyboardInterrupt:
+        logger.info("🛑 Beende Überwachung...")
+    finally:
+        for future in list(in_arbeit):
+            abschliessen(future)
+        watcher.close()
+    return load_state(state_path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Überwacht input/ und verarbeitet neue PDFs, sobald sie ankommen.")
+    add_parse_arguments(parser)
+    parser.add_argument("--processed", dest="processed_folder", default=None,
+                        help="Ausgabeordner für verarbeitete CSVs")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="Höchstens so viele PDFs gleichzeitig in Arbeit (Standard: 2 × Prozesse)")
+    parser.add_argument("--settle", type=float, default=SETTLE_SECONDS,
+                        help="Sekunden ohne Änderung, bevor eine Datei als fertig geschrieben gilt")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL, help="Abstand beim Polling in Sekunden")
+    parser.add_argument("--polling", action="store_true", help="Polling statt inotify verwenden")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    jobs, cache_folder = resolve_parse_arguments(args)
+    with metrics.instrumented_run(args.metrics, args.profile, args.trace_memory, command="scraper.watcher", jobs=jobs):
+        watch(input_folder=args.input_folder, parser_output_folder=args.output_folder,
+              processed_folder=args.processed_folder, jobs=jobs, cache_folder=cache_folder,
+              storage=args.storage, db_path=args.db_path, queue_size=args.queue_size, settle=args.settle,
+              poll_interval=args.poll_interval, polling=args.polling)
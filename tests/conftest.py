@@ -1,5 +1,26 @@
 import pytest
 
+from scraper.utils import logger as log_config
+
+
+@pytest.fixture(autouse=True, scope="session")
+def tmp_log_dir(tmp_path_factory):
+    """Leitet die Log-Dateien in ein temporäres Verzeichnis um, damit Tests nicht ins Repo-Log schreiben.
+
+    Die Umgebungsvariable erreicht auch Worker-Prozesse, die das Modul neu importieren (spawn/forkserver).
+    """
+    log_dir = tmp_path_factory.mktemp("logs")
+    patcher = pytest.MonkeyPatch()
+    patcher.setenv(log_config.DIR_ENV, str(log_dir))
+    patcher.setattr(log_config, "LOGS_DIR", str(log_dir))
+    patcher.setattr(log_config, "LOG_FILE", str(log_dir / "bankdaten_scraper.log"))
+    patcher.setattr(log_config, "JSON_LOG_FILE", str(log_dir / "bankdaten_scraper.jsonl"))
+    log_config.configure_logging()
+    yield log_dir
+    patcher.undo()
+    log_config.configure_logging()
+
+
 @pytest.fixture
 def sample_mapping():
     return {
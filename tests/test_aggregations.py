@@ -0,0 +1,54 @@
+# tests/test_aggregations.py
+
+import pandas as pd
+from scraper.processor import aggregations
+from scraper.utils import schema
+
+def _dashboard_df():
+    return pd.DataFrame({
+        "Datum": pd.to_datetime(["2024-01-01", "2024-01-15", "2024-03-04", "2023-02-06"]),
+        "Betrag": [-10.0, -5.0, 100.0, -20.0],
+        "Provider": ["Rewe", "Rewe", "Arbeitgeber", "Netflix"],
+        "Jahr": ["2024", "2024", "2024", "2023"],
+        "Banktyp": ["volksbank", "volksbank", "volksbank", "mastercard"],
+    })
+
+def test_monthly_cashflow_has_all_months():
+    result = aggregations.monthly_cashflow(_dashboard_df())
+    assert list(result.columns) == list(range(1, 13))
+    assert result.loc[("volksbank", "2024"), 1] == -15.0
+    assert result.loc[("volksbank", "2024"), 2] == 0
+    assert result.loc[("mastercard", "2023"), 2] == -20.0
+
+def test_top_provider_and_pivot():
+    df = _dashboard_df()
+    top = aggregations.top_provider(df, top_n=2)
+    assert top["Provider"].tolist() == ["Arbeitgeber", "Netflix"]
+
+    pivot = aggregations.provider_pivot(df)
+    assert pivot.loc["Rewe", "Gesamt"] == -15.0
+
+def test_weekday_heatmap_orders_weekdays():
+    result = aggregations.weekday_heatmap(_dashboard_df())
+    assert list(result.index) == aggregations.WOCHENTAGE
+    assert result.loc["Monday", "2024-01"] == -15.0
+
+def test_rollup_aggregations_match_raw_rows():
+    df = _dashboard_df()
+    df["Kategorie"] = ["Lebensmittel", "Lebensmittel", "Gehalt", "Streaming"]
+    # Wie im Dashboard: kategoriale Texte, Jahr als Ganzzahl
+    df = schema.apply_schema(df, schema.DASHBOARD_SCHEMA)
+    monthly = aggregations.build_monthly_rollup(df)
+    weekday = aggregations.build_weekday_rollup(df)
+    for rollup in (monthly, weekday):
+        rollup["Banktyp"] = pd.Categorical(["mastercard" if j == 2023 else "volksbank" for j in rollup["Jahr"]])
+
+    pd.testing.assert_frame_equal(
+        aggregations.monthly_cashflow_from_rollup(monthly), aggregations.monthly_cashflow(df),
+        check_dtype=False, check_names=False,
+    )
+    pd.testing.assert_frame_equal(aggregations.provider_pivot_from_rollup(monthly), aggregations.provider_pivot(df),
+                                  check_dtype=False)
+    pd.testing.assert_frame_equal(aggregations.weekday_heatmap_from_rollup(weekday), aggregations.weekday_heatmap(df),
+                                  check_dtype=False)
+    assert len(monthly) == 3  # zwei Rewe-Buchungen im Januar werden zusammengefasst
@@ -22,7 +22,7 @@ def dummy_mapping(tmp_path):
 
 @patch("scraper.main.parse_mastercard")
 @patch("scraper.utils.utils.extract_jahr_from_filename", return_value=2025)
-@patch("scraper.parser.parser_mastercard.pdfplumber.open")
+@patch("pdfplumber.open")
 def test_e2e_pipeline(mock_pdfplumber_open, mock_extract_jahr, mock_parse_mastercard, dummy_input_folder, tmp_path, dummy_mapping):
     from scraper.main import main as scraper_main
 
@@ -0,0 +1,102 @@
+# tests/test_extraction.py
+
+import pytest
+import pandas as pd
+from scraper.parser import extraction
+
+
+def test_use_preset_is_temporary_and_changes_cache_key():
+    standard_key = extraction.config_key("volksbank")
+
+    with extraction.use_preset("volksbank", "pdfminer-fast"):
+        assert extraction.current_config()["volksbank"]["options"] == {"laparams": {"boxes_flow": None}}
+        assert extraction.config_key("volksbank") != standard_key
+
+    assert extraction.config_key("volksbank") == standard_key
+
+
+def test_unknown_preset_raises():
+    with pytest.raises(ValueError):
+        extraction.configure_preset("volksbank", "ocr")
+
+
+def test_iter_page_texts_uses_configured_backend(monkeypatch):
+    monkeypatch.setitem(extraction.BACKENDS, "pdfplumber", lambda path, **options: iter([f"Seite aus {path}"]))
+
+    assert list(extraction.iter_page_texts("auszug.pdf", "mastercard")) == ["Seite aus auszug.pdf"]
+
+
+def test_roi_backend_crops_before_extracting(monkeypatch):
+    import pdfplumber
+
+    words = [
+        # Kopf- und Fußbereich – liegen außerhalb des Zuschnitts
+        {"text": "Volksbank", "x0": 10, "x1": 60, "top": 5},
+        {"text": "Buchungs-Beleg-", "x0": 10, "x1": 60, "top": 12},
+        {"text": "12,50", "x0": 160, "x1": 180, "top": 40},
+        {"text": "01.02.", "x0": 10, "x1": 30, "top": 41},
+        {"text": "REWE", "x0": 60, "x1": 90, "top": 40},
+        {"text": "Markt", "x0": 95, "x1": 120, "top": 40},
+        {"text": "Seite: 1", "x0": 10, "x1": 40, "top": 95},
+    ]
+    zuschnitte = []
+
+    class DummyRegion:
+        def __init__(self, bbox):
+            self.bbox = bbox
+        def extract_words(self, **kwargs):
+            return [w for w in words if self.bbox[1] <= w["top"] <= self.bbox[3]]
+        def extract_text(self):
+            return "\n".join(w["text"] for w in sorted(self.extract_words(), key=lambda w: w["top"]))
+
+    class DummyPage:
+        width, height = 200, 100
+        def crop(self, bbox):
+            zuschnitte.append(bbox)
+            return DummyRegion(bbox)
+        def extract_words(self, **kwargs):
+            pytest.fail("ganze Seite extrahiert")
+
+    class DummyPDF:
+        def __enter__(self): return self
+        def __exit__(self, *args): pass
+        pages = [DummyPage()]
+
+    monkeypatch.setattr(pdfplumber, "open", lambda _: DummyPDF())
+
+    seiten = list(extraction.BACKENDS["pdfplumber-roi"](
+        "auszug.pdf", bbox=(0, 0.2, 1, 0.9), marker=("Buchungs-Beleg-", "Seite:")
+    ))
+    assert seiten == ["Buchungs-Beleg-\n01.02. REWE Markt 12,50\nSeite: 1"]
+    # Tabellenbereich, dann nur die Streifen darüber und darunter
+    assert zuschnitte == [(0, 20.0, 200, 90.0), (0, 0, 200, 20.0), (0, 90.0, 200, 100)]
+
+
+def test_roi_keeps_parser_markers_outside_crop(tmp_path, monkeypatch):
+    from scraper.parser.parser_mastercard import parse_mastercard
+    from scraper.tools import synthetic_statements
+
+    monkeypatch.setitem(extraction.ROI_LAYOUTS, "mastercard", extraction.ROI_LAYOUTS["mastercard"])
+    df = synthetic_statements.generate_transactions(20, "mastercard")
+    pdf_path = synthetic_statements.write_statement_pdf(df, "mastercard", tmp_path)
+    erwartet = parse_mastercard(pdf_path)
+
+    vorher = extraction.current_config()
+    try:
+        # Der Bereich beginnt unterhalb der Kopfzeile mit "Buchungs-Beleg-"
+        extraction.configure_roi("mastercard", (0, 0.08, 1, 1))
+        seite = next(extraction.iter_page_texts(pdf_path, "mastercard"))
+        zugeschnitten = parse_mastercard(pdf_path)
+    finally:
+        extraction.apply_config(vorher)
+
+    assert "Mastercard Gold" not in seite and "Buchungs-Beleg-" in seite
+    assert len(erwartet) == 20
+    pd.testing.assert_frame_equal(zugeschnitten, erwartet)
+
+
+@pytest.mark.parametrize("bbox", [(0, 0.1, 1), (0, 0.5, 1, 0.2), (0, 0, 1.5, 1)])
+def test_configure_roi_rejects_invalid_bbox(bbox, monkeypatch):
+    monkeypatch.setitem(extraction.ROI_LAYOUTS, "volksbank", extraction.ROI_LAYOUTS["volksbank"])
+    with pytest.raises(ValueError):
+        extraction.configure_roi("volksbank", bbox)
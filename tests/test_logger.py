@@ -0,0 +1,33 @@
+# tests/test_logger.py
+
+import json
+import logging
+from scraper.utils import logger as logger_module
+from scraper.utils.logger import setup_logger, configure_logging, shutdown_logging
+
+def test_setup_logger_adds_handler_only_once():
+    first = setup_logger("tests.logger.dedupe")
+    second = setup_logger("tests.logger.dedupe")
+    assert first is second
+    assert len(first.handlers) == 1
+
+def test_json_lines_and_level(tmp_path, monkeypatch):
+    json_path = tmp_path / "log.jsonl"
+    monkeypatch.setitem(logger_module._config, "json_path", None)
+    monkeypatch.setitem(logger_module._config, "level", None)
+    log = setup_logger("tests.logger.json")
+
+    configure_logging(level="WARNING", json_path=str(json_path))
+    try:
+        assert log.level == logging.WARNING
+        log.info("nicht sichtbar")
+        log.warning("⚠️ sichtbar %s", 42)
+        shutdown_logging()  # Listener leert die Queue
+
+        eintraege = [json.loads(zeile) for zeile in json_path.read_text(encoding="utf-8").splitlines()]
+        assert [e["message"] for e in eintraege] == ["⚠️ sichtbar 42"]
+        assert eintraege[0]["level"] == "WARNING"
+    finally:
+        monkeypatch.undo()
+        configure_logging()
+    assert log.level == logging.INFO
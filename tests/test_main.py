@@ -50,3 +50,80 @@ def test_main_handles_no_files(mock_parse_mastercard, mock_parse_volksbank, tmp_
 
     mock_parse_volksbank.assert_not_called()
     mock_parse_mastercard.assert_not_called()
+
+@patch("scraper.main.parse_volksbank", side_effect=RuntimeError("kaputt"))
+def test_parse_pdf_isolates_errors(mock_parse_volksbank, tmp_path):
+    from scraper.main import parse_pdf
+
+    bank_typ, df, dauer = parse_pdf(str(tmp_path / "kontoauszug_vom_2025.04.01.pdf"))
+
+    assert bank_typ == "volksbank"
+    assert df is None
+    assert dauer >= 0
+
+def test_main_parallel_matches_serial(tmp_path, monkeypatch):
+    from scraper.main import main
+    from scraper.tools import synthetic_statements
+
+    input_folder = tmp_path / "input"
+    for bank_typ, jahr in (("volksbank", 2024), ("mastercard", 2024), ("volksbank", 2023)):
+        df = synthetic_statements.generate_transactions(40, bank_typ, jahr=jahr, seed=jahr)
+        synthetic_statements.write_statement_pdf(df, bank_typ, input_folder, jahr=jahr)
+    # Defekte Datei bleibt auch im Pool auf sich selbst beschränkt
+    (input_folder / "kontoauszug_vom_2022.12.31.pdf").write_text("kein pdf")
+
+    serial_out = tmp_path / "serial"
+    parallel_out = tmp_path / "parallel"
+
+    main(input_folder=str(input_folder), output_folder=str(serial_out), jobs=1)
+    # 0 = alle Kerne, auch bei direktem Aufruf von main()
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    main(input_folder=str(input_folder), output_folder=str(parallel_out), jobs=0)
+
+    dateien = sorted(os.listdir(serial_out))
+    assert dateien == ["buchungen_mastercard_2024.csv", "buchungen_volksbank_2023.csv", "buchungen_volksbank_2024.csv"]
+    assert sorted(os.listdir(parallel_out)) == dateien
+    for name in dateien:
+        assert (serial_out / name).read_bytes() == (parallel_out / name).read_bytes()
+
+def test_parser_registry_loads_lazily():
+    from scraper.parser import registry
+
+    assert registry.is_supported("volksbank")
+    assert not registry.is_supported("unbekannt")
+    assert registry.get_parser("mastercard").__name__ == "parse_mastercard"
+    assert registry.get_parser_version("volksbank") >= 1
+
+@pytest.mark.parametrize("roi", ["volksbank=0,0.1,1", "volksbank=0,a,1,1", "sparkasse=0,0,1,1", "volksbank=0,0.9,1,0.1"])
+def test_invalid_roi_is_rejected_by_argparse(roi, capsys):
+    from scraper.main import parse_args
+
+    with pytest.raises(SystemExit) as exc:
+        parse_args(["--roi", roi])
+    assert exc.value.code == 2
+    assert "--roi" in capsys.readouterr().err
+
+@pytest.mark.parametrize("backend", ["volksbank", "sparkasse=pdfminer", "volksbank=ocr"])
+def test_invalid_backend_is_rejected_by_argparse(backend, capsys):
+    from scraper.main import parse_args
+
+    with pytest.raises(SystemExit) as exc:
+        parse_args(["--backend", backend])
+    assert exc.value.code == 2
+    assert "--backend" in capsys.readouterr().err
+
+def test_backend_and_roi_arguments_are_applied(monkeypatch):
+    from scraper.main import parse_args, resolve_parse_arguments
+    from scraper.parser import extraction
+
+    monkeypatch.setitem(extraction.ROI_LAYOUTS, "mastercard", extraction.ROI_LAYOUTS["mastercard"])
+    args = parse_args(["--backend", "volksbank=pdfminer-fast", "--roi", "mastercard=0,0.1,1,0.9"])
+    assert args.backend == [("volksbank", "pdfminer-fast")]
+    vorher = extraction.current_config()
+    try:
+        resolve_parse_arguments(args)
+        config = extraction.current_config()
+    finally:
+        extraction.apply_config(vorher)
+    assert config["volksbank"]["options"] == {"laparams": {"boxes_flow": None}}
+    assert (config["mastercard"]["backend"], config["mastercard"]["options"]["bbox"]) == ("pdfplumber-roi", (0.0, 0.1, 1.0, 0.9))
@@ -0,0 +1,94 @@
+# tests/test_metrics.py
+
+import json
+import pytest
+import pandas as pd
+from scraper.utils import metrics
+
+def test_file_scope_collects_counters_per_file():
+    metrics.reset()
+    with metrics.file_scope("a.pdf") as info:
+        with metrics.stage("parse"):
+            metrics.count("regex_hits", 3)
+        info["rows"] = 3
+    metrics.count("regex_hits")
+
+    daten = metrics.snapshot()
+    assert daten["counters"]["regex_hits"] == 4
+    assert daten["files"]["a.pdf"]["counters"] == {"regex_hits": 3}
+    assert daten["files"]["a.pdf"]["rows"] == 3
+    assert daten["stages"]["parse"]["calls"] == 1
+
+def test_merge_adds_worker_snapshots():
+    metrics.reset()
+    with metrics.stage("parse"):
+        metrics.count("pages_extracted", 2)
+    worker = metrics.snapshot()
+    metrics.merge(worker)
+
+    daten = metrics.snapshot()
+    assert daten["counters"]["pages_extracted"] == 4
+    assert daten["stages"]["parse"]["calls"] == 2
+
+def test_parser_and_processor_counters(sample_mapping):
+    from scraper.parser.parser_volksbank import collect_buchungen
+    from scraper.processor.processor import process_dataframe
+
+    metrics.reset()
+    collect_buchungen([
+        "01.04. 01.04. Netflix Abo 12,99 S",
+        "Ref 123",
+        "02.04. 02.04. Unbekannt 5,00 S",
+    ])
+    df = pd.DataFrame({
+        "Datum": ["2025-04-01", "2025-04-02"],
+        "Verwendungszweck": ["Netflix Abo Ref 123", "Unbekannt"],
+        "Betrag": [-12.99, -5.0],
+    })
+    process_dataframe(df, sample_mapping)
+
+    counters = metrics.snapshot()["counters"]
+    assert counters["lines_scanned"] == 3
+    assert counters["regex_hits"] == 2
+    assert counters["rows_mapped"] == 1
+    assert counters["rows_sonstiges"] == 1
+
+def test_instrumented_run_writes_metrics_and_profile(tmp_path):
+    metrics_path = tmp_path / "metrics.json"
+    profile_path = tmp_path / "run.prof"
+
+    with metrics.instrumented_run(str(metrics_path), str(profile_path), trace_memory=True, command="test"):
+        with metrics.stage("arbeit"):
+            [0] * 100_000
+
+    daten = json.loads(metrics_path.read_text(encoding="utf-8"))
+    assert daten["command"] == "test"
+    assert daten["stages"]["arbeit"]["peak_bytes"] > 0
+    assert daten["peak_memory_bytes"] > 0
+    assert profile_path.exists()
+
+def test_same_named_files_from_different_folders_are_kept_apart():
+    metrics.reset()
+    for ordner, zeilen in (("2023", 1), ("2024", 2)):
+        with metrics.file_scope(f"{ordner}/auszug.pdf") as info:
+            info["rows"] = zeilen
+    worker = {"counters": {}, "stages": {}, "files": {"2025/auszug.pdf": {"rows": 3}}}
+    metrics.merge(worker)
+
+    assert {pfad: e["rows"] for pfad, e in metrics.snapshot()["files"].items()} == {
+        "2023/auszug.pdf": 1, "2024/auszug.pdf": 2, "2025/auszug.pdf": 3,
+    }
+
+def test_instrumented_run_writes_metrics_when_run_fails(tmp_path):
+    import tracemalloc
+
+    metrics_path = tmp_path / "metrics.json"
+    with pytest.raises(RuntimeError):
+        with metrics.instrumented_run(str(metrics_path), trace_memory=True, command="test"):
+            with metrics.stage("arbeit"):
+                raise RuntimeError("kaputt")
+
+    daten = json.loads(metrics_path.read_text(encoding="utf-8"))
+    assert daten["error"] == "RuntimeError('kaputt')"
+    assert daten["stages"]["arbeit"]["calls"] == 1
+    assert not tracemalloc.is_tracing()
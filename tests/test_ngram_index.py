@@ -0,0 +1,72 @@
+# tests/test_ngram_index.py
+
+import pandas as pd
+import pytest
+from scraper.utils.ngram_index import NgramIndex
+from scraper.utils.provider_matcher import ProviderMatcher
+from scraper.processor.processor import categorize_verwendungszwecke, fuzzy_threshold
+from scraper.tools.mapping_checker import check_mappings
+
+MAPPING = {"Netflix": "Streaming", "Vodafone": "Telekommunikation", "Edeka": "Lebensmittel", "DB": "Transport"}
+
+def test_suggest_finds_truncated_and_misspelled_providers():
+    matcher = ProviderMatcher(MAPPING)
+    vorschlaege = matcher.suggest(["NETFLI", "VODAFON GMBH 4711", "Baeckerei Kornblume", ""])
+
+    assert [v[0] for v in vorschlaege[:2]] == [("Netflix", "Streaming"), ("Vodafone", "Telekommunikation")]
+    assert all(score >= 0.8 for _, score in vorschlaege[:2])
+    assert vorschlaege[2][1] < 0.5
+    assert vorschlaege[3] == (None, 0.0)
+
+def test_batch_matches_single_queries():
+    index = NgramIndex(MAPPING.items())
+    texte = ["Netfl Abo", "Edka Markt", "Vodafon", "xyz"] * 3
+    indices, scores = index.suggest(texte)
+    for text, idx, score in zip(texte, indices, scores):
+        einzeln_idx, einzeln_score = index.suggest([text])
+        assert (idx, score) == pytest.approx((einzeln_idx[0], einzeln_score[0]))
+
+def test_references_extend_providers():
+    index = NgramIndex(MAPPING.items())
+    assert index.suggest(["Lastschrift Stadtwerk Nordhafen"])[1][0] < 0.5
+    index.add_references(["Stadtwerke Nordhafen Strom 2024", "Stadtwerke Nordhafen Strom 2024"], ["Vodafone"] * 2)
+    indices, scores = index.suggest(["Lastschrift STADTWERKE NORDHAFEN STROM 2025 Abschlag"])
+    assert len(index) == len(MAPPING) + 1
+    assert (index.providers[indices[0]][0], scores[0] >= 0.8) == ("Vodafone", True)
+
+def test_categorize_applies_suggestions_above_threshold():
+    verwendungszwecke = pd.Series(["NETFLI", "Edeka Center", "Baeckerei Kornblume", None])
+
+    ohne = categorize_verwendungszwecke(verwendungszwecke, ProviderMatcher(MAPPING))
+    mit = categorize_verwendungszwecke(verwendungszwecke, ProviderMatcher(MAPPING, fuzzy_threshold=0.8))
+
+    assert list(ohne["Provider"]) == ["Sonstiges", "Edeka", "Sonstiges", "Sonstiges"]
+    assert list(mit["Provider"]) == ["Netflix", "Edeka", "Sonstiges", "Sonstiges"]
+    assert list(mit["Kategorie"]) == ["Streaming", "Lebensmittel", "Sonstiges", "Sonstiges"]
+
+def test_scattered_ngrams_are_no_match():
+    matcher = ProviderMatcher({"Aral": "Tanken", **MAPPING})
+    (provider, score), (provider_echt, score_echt) = matcher.suggest(["Arabella Ralf Blumen", "Lastschrift ARAL 0815"])
+
+    assert provider == ("Aral", "Tanken") and score < 0.8
+    assert provider_echt == ("Aral", "Tanken") and score_echt == pytest.approx(1.0)
+    kategorien = categorize_verwendungszwecke(pd.Series(["Arabella Ralf Blumen"]),
+                                              ProviderMatcher({"Aral": "Tanken"}, fuzzy_threshold=0.8))
+    assert list(kategorien["Provider"]) == ["Sonstiges"]
+
+def test_fuzzy_threshold_from_environment(monkeypatch):
+    monkeypatch.delenv("BANKDATEN_FUZZY_THRESHOLD", raising=False)
+    assert fuzzy_threshold() is None
+    monkeypatch.setenv("BANKDATEN_FUZZY_THRESHOLD", "0.85")
+    assert fuzzy_threshold() == 0.85
+    assert fuzzy_threshold("off") is None
+    assert fuzzy_threshold("0.9") == 0.9
+
+def test_mapping_checker_only_lists_rows_needing_review(tmp_path):
+    pd.DataFrame({"Verwendungszweck": ["Netflix Abo", "NETFLI", "Baeckerei Kornblume", "Netflix Abo"]}).to_csv(
+        tmp_path / "buchungen_volksbank_2024.csv", index=False)
+
+    zuordenbar, offen = check_mappings(str(tmp_path), threshold=0.8, matcher=ProviderMatcher(MAPPING))
+
+    assert [(vz, provider) for vz, provider, _ in zuordenbar] == [("NETFLI", "Netflix")]
+    assert [vz for vz, _, _ in offen] == ["Baeckerei Kornblume"]
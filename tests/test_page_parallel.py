@@ -0,0 +1,60 @@
+# tests/test_page_parallel.py
+
+import itertools
+import pandas as pd
+import pytest
+from scraper.parser import page_parallel, parser_mastercard, parser_volksbank, extraction
+from scraper.tools import synthetic_statements
+
+SEITEN = [
+    "Kreditkarte Mustermann",
+    "Umsatzaufstellung\n01.01. 02.01. Netflix 9,99-",
+    "NETFLIX.COM\n02.01. 03.01. Rewe 20,00-\nMarkt 12",
+    "Filiale Nord\nZwischensaldo 29,99",
+    "05.01. 06.01. Nie gelesen 1,00",
+]
+
+def _alle_aufteilungen(anzahl):
+    # Jede Kombination von Bereichsgrenzen zwischen den Seiten
+    for schnitte in itertools.chain.from_iterable(itertools.combinations(range(1, anzahl), k) for k in range(anzahl)):
+        grenzen = [0, *schnitte, anzahl]
+        yield [range(a, b) for a, b in zip(grenzen, grenzen[1:])]
+
+def test_split_pages_covers_all_pages_in_order():
+    bereiche = page_parallel.split_pages(103, 4, min_seiten=10)
+    assert [len(b) for b in bereiche] == [25, 26, 26, 26]
+    assert list(itertools.chain.from_iterable(bereiche)) == list(range(103))
+    assert page_parallel.split_pages(15, 4, min_seiten=10) == [range(0, 15)]
+
+@pytest.mark.parametrize("parser, seiten", [
+    (parser_mastercard, SEITEN),
+    (parser_volksbank, ["Kontoauszug", "01.01. 01.01. Miete 900,00 S\nWohnung 3", "Januar\n02.01. 02.01. Gehalt 2.000,00 H", "Ende"]),
+])
+def test_stitching_matches_serial_parse_for_every_split(monkeypatch, parser, seiten):
+    def fake_pages(pdf_path, bank_typ, pages=None):
+        return iter([seiten[i] for i in (range(len(seiten)) if pages is None else pages)])
+
+    monkeypatch.setattr(parser, "iter_page_texts", fake_pages)
+    lines = (parser.iter_page_lines if parser is parser_mastercard else
+             lambda p: parser_volksbank.iter_lines(parser_volksbank.extract_pages_text(p)))
+    erwartet = parser.collect_buchungen(lines("dummy.pdf")).to_dataframe(2024)
+
+    for bereiche in _alle_aufteilungen(len(seiten)):
+        teile = [parser.parse_page_range("dummy.pdf", bereich) for bereich in bereiche]
+        ergebnis = parser.stitch_page_ranges(teile).to_dataframe(2024)
+        pd.testing.assert_frame_equal(ergebnis, erwartet)
+
+@pytest.mark.parametrize("bank_typ", ["volksbank", "mastercard"])
+def test_parse_pages_matches_serial_parse(monkeypatch, tmp_path, bank_typ):
+    monkeypatch.setattr(page_parallel, "MIN_PAGES", 2)
+    monkeypatch.setattr(page_parallel, "MIN_PAGES_PER_RANGE", 1)
+    df = synthetic_statements.generate_transactions(400, bank_typ)
+    pdf_path = synthetic_statements.write_statement_pdf(df, bank_typ, tmp_path)
+    parser = parser_volksbank if bank_typ == "volksbank" else parser_mastercard
+
+    with extraction.use_preset(bank_typ, "pypdfium2"):
+        seriell = getattr(parser, f"parse_{bank_typ}")(pdf_path)
+        parallel = page_parallel.parse_pages(pdf_path, bank_typ, jobs=3)
+
+    pd.testing.assert_frame_equal(parallel.to_dataframe(2024), seriell)
+    assert page_parallel.parse_pages(pdf_path, bank_typ, jobs=1) is None
@@ -0,0 +1,63 @@
+# tests/test_parse_cache.py
+
+import os
+import pandas as pd
+from unittest.mock import patch
+from scraper.utils import parse_cache
+
+
+def test_cache_roundtrip_and_clear(tmp_path):
+    df = pd.DataFrame([{"Datum": pd.Timestamp("2025-04-01"), "Verwendungszweck": "Netflix", "Betrag": -9.99}])
+
+    parse_cache.save_to_cache(df, "abc", "volksbank", 1, str(tmp_path))
+
+    pd.testing.assert_frame_equal(parse_cache.load_from_cache("abc", "volksbank", 1, str(tmp_path)), df)
+    # Neue Parser-Version → kein Treffer
+    assert parse_cache.load_from_cache("abc", "volksbank", 2, str(tmp_path)) is None
+
+    assert parse_cache.clear_cache("mastercard", str(tmp_path)) == 0
+    assert parse_cache.clear_cache(cache_folder=str(tmp_path)) == 1
+    assert parse_cache.load_from_cache("abc", "volksbank", 1, str(tmp_path)) is None
+
+
+@patch("scraper.main.parse_volksbank")
+def test_parse_pdf_uses_cache(mock_parse_volksbank, tmp_path):
+    from scraper.main import parse_pdf
+
+    pdf_path = tmp_path / "kontoauszug_vom_2025.04.01.pdf"
+    pdf_path.write_text("Dummy Inhalt")
+    cache_folder = str(tmp_path / "cache")
+
+    mock_parse_volksbank.return_value = pd.DataFrame(
+        [{"Datum": pd.Timestamp("2025-04-01"), "Verwendungszweck": "Test", "Betrag": 10.0}]
+    )
+
+    _, df_first, _ = parse_pdf(str(pdf_path), cache_folder)
+    _, df_second, _ = parse_pdf(str(pdf_path), cache_folder)
+
+    mock_parse_volksbank.assert_called_once()
+    pd.testing.assert_frame_equal(df_first, df_second)
+
+    # Geänderter Inhalt → neu parsen
+    pdf_path.write_text("Neuer Inhalt")
+    parse_pdf(str(pdf_path), cache_folder)
+    assert mock_parse_volksbank.call_count == 2
+
+
+def test_renamed_pdf_gets_year_from_new_filename(tmp_path):
+    from scraper.main import parse_pdf
+    from scraper.tools import synthetic_statements
+
+    df = synthetic_statements.generate_transactions(20, "volksbank", jahr=2024)
+    pdf_path = synthetic_statements.write_statement_pdf(df, "volksbank", tmp_path / "quelle", jahr=2024)
+    cache_folder = str(tmp_path / "cache")
+    _, df_2024, _ = parse_pdf(pdf_path, cache_folder)
+
+    # Gleicher Inhalt, anderes Jahr im Dateinamen → kein Cache-Treffer mit dem alten Jahr
+    umbenannt = tmp_path / "quelle" / "kontoauszug_vom_2023.12.31.pdf"
+    os.rename(pdf_path, umbenannt)
+    _, df_2023, _ = parse_pdf(str(umbenannt), cache_folder)
+
+    assert set(df_2024["Datum"].dt.year) == {2024}
+    assert set(df_2023["Datum"].dt.year) == {2023}
+    assert len(df_2023) == len(df_2024)
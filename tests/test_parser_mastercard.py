@@ -1,4 +1,5 @@
 
+import pdfplumber
 from scraper.parser import parser_mastercard
 
 def test_parse_mastercard_returns_dataframe(monkeypatch):
@@ -15,8 +16,33 @@ def test_parse_mastercard_returns_dataframe(monkeypatch):
                     )
             return [DummyPage()]
 
-    monkeypatch.setattr(parser_mastercard.pdfplumber, "open", lambda _: DummyPDF())
+    monkeypatch.setattr(pdfplumber, "open", lambda _: DummyPDF())
     df = parser_mastercard.parse_mastercard("dummy_path.pdf")
     assert not df.empty
     assert "Netflix" in df.iloc[0]["Verwendungszweck"]
     assert df.iloc[0]["Betrag"] == 9.99
+
+def test_parse_mastercard_stops_extracting_after_end_marker(monkeypatch):
+    extracted = []
+
+    class DummyPage:
+        def __init__(self, nummer, text):
+            self.nummer, self.text = nummer, text
+        def extract_text(self):
+            extracted.append(self.nummer)
+            return self.text
+
+    class DummyPDF:
+        def __enter__(self): return self
+        def __exit__(self, *args): pass
+        pages = [
+            DummyPage(1, "Umsatzaufstellung\n01.01. 02.01. Netflix 9,99-\nNETFLIX.COM"),
+            DummyPage(2, "Abo\nZwischensaldo 9,99"),
+            DummyPage(3, "03.01. 04.01. Nie gelesen 1,00"),
+        ]
+
+    monkeypatch.setattr(pdfplumber, "open", lambda _: DummyPDF())
+    df = parser_mastercard.parse_mastercard("dummy_path.pdf")
+    assert extracted == [1, 2]
+    assert list(df["Verwendungszweck"]) == ["Netflix NETFLIX.COM Abo"]
+    assert df.iloc[0]["Betrag"] == -9.99
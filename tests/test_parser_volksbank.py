@@ -4,10 +4,22 @@ from scraper.parser import parser_volksbank
 def test_parse_volksbank(monkeypatch):
     dummy_text = "01.01. 02.01. Amazon Bestellung 49,99 S"
 
-    monkeypatch.setattr(parser_volksbank, "extract_text", lambda _: dummy_text)
+    monkeypatch.setattr(parser_volksbank, "extract_pages_text", lambda _: iter([dummy_text]))
 
     df = parser_volksbank.parse_volksbank("dummy_path.pdf")
     assert not df.empty
-    assert set(df.columns) == {"Datum", "Verwendungszweck", "Betrag"}
+    assert set(df.columns) == {"Datum", "Verwendungszweck", "Betrag", "Betrag_Cent"}
     assert df.iloc[0]["Verwendungszweck"].startswith("Amazon")
     assert df.iloc[0]["Betrag"] < 0  # Soll-Buchung (S = negativ)
+
+def test_parse_volksbank_continues_across_pages(monkeypatch):
+    pages = [
+        "01.01. 02.01. Amazon Bestellung 49,99 S\nBestellnummer\f",
+        "4711\n03.01. 03.01. Gehalt 1.000,00 H\f",
+    ]
+
+    monkeypatch.setattr(parser_volksbank, "extract_pages_text", lambda _: iter(pages))
+
+    df = parser_volksbank.parse_volksbank("dummy_path.pdf")
+    assert list(df["Verwendungszweck"]) == ["Amazon Bestellung Bestellnummer 4711", "Gehalt"]
+    assert list(df["Betrag"]) == [-49.99, 1000.0]
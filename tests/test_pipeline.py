@@ -0,0 +1,34 @@
+# tests/test_pipeline.py
+
+import pandas as pd
+from unittest.mock import patch
+
+
+@patch("scraper.main.parse_volksbank")
+def test_run_pipeline_matches_two_stage_output(mock_parse_volksbank, tmp_path):
+    from scraper.pipeline import run_pipeline
+    from scraper.processor.processor import process_dataframe, load_matcher
+
+    input_folder = tmp_path / "input"
+    input_folder.mkdir()
+    (input_folder / "kontoauszug_vom_2025.04.01.pdf").write_text("Dummy Inhalt")
+
+    mock_parse_volksbank.return_value = pd.DataFrame({
+        "Datum": pd.to_datetime(["2025-04-01", "2025-04-02"]),
+        "Verwendungszweck": ["NETFLIX.COM", "Bargeld Barauszahlungsgebühr 2,00"],
+        "Betrag": [-9.99, -52.0],
+        "Betrag_Cent": [-999, -5200],
+    })
+
+    parser_output = tmp_path / "parser_output"
+    processed = tmp_path / "processed"
+    ergebnisse = run_pipeline(input_folder=str(input_folder), parser_output_folder=str(parser_output),
+                              processed_folder=str(processed))
+
+    assert list(ergebnisse) == [("volksbank", 2025)]
+    assert (parser_output / "buchungen_volksbank_2025.csv").exists()
+
+    # Gleiches Ergebnis wie der bisherige Weg über die Parser-CSV
+    zwei_stufen = process_dataframe(pd.read_csv(parser_output / "buchungen_volksbank_2025.csv"), load_matcher())
+    [processed_file] = processed.glob("volksbank_2025_mapped_*.csv")
+    assert processed_file.read_text() == zwei_stufen.to_csv(index=False)
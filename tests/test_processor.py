@@ -1,8 +1,10 @@
 # tests/test_processor.py
 
+import os
 import pandas as pd
 import pytest
-from scraper.processor.processor import map_verwendungszweck, extract_entgelt_and_create_new_rows
+from scraper.processor.processor import map_verwendungszweck, extract_entgelt_and_create_new_rows, categorize_verwendungszwecke
+from scraper.utils.provider_matcher import ProviderMatcher
 
 @pytest.fixture
 def mapping_fixture():
@@ -32,3 +34,166 @@ def test_extract_entgelt_and_create_new_rows():
     df_result = extract_entgelt_and_create_new_rows(df)
     assert len(df_result) == 2  # Original + neu erzeugte Zusatzzeile
     assert any(df_result['Verwendungszweck'] == "Auslandseinsatzentgelt")
+
+def test_categorize_verwendungszwecke_matches_rowwise(mapping_fixture):
+    verwendungszwecke = pd.Series(["Netflix Abo", "EDEKA Center", None, "Netflix Abo", "Miete"], index=[5, 6, 7, 8, 9])
+    matcher = ProviderMatcher(mapping_fixture)
+
+    result = categorize_verwendungszwecke(verwendungszwecke, matcher)
+
+    expected = [map_verwendungszweck(vz, mapping_fixture) for vz in verwendungszwecke]
+    assert list(result.index) == [5, 6, 7, 8, 9]
+    assert list(zip(result["Provider"], result["Kategorie"])) == expected
+
+def test_matcher_memo_is_bounded(mapping_fixture):
+    matcher = ProviderMatcher(mapping_fixture, memo_size=2)
+    for vz in ["Netflix 1", "Netflix 2", "Netflix 3"]:
+        assert map_verwendungszweck(vz, matcher) == ("Netflix", "Streaming")
+    assert len(matcher._memo) == 2
+
+def test_extract_entgelt_carries_columns_and_custom_keywords():
+    df = pd.DataFrame({
+        'Datum': [pd.Timestamp('2025-04-22'), pd.Timestamp('2025-04-23')],
+        'Verwendungszweck': ['Barauszahlungsgebühr 2,00 Auslandseinsatzentgelt 1,25', 'Kontoführung 4,90'],
+        'Betrag': [-100.00, -4.90],
+        'Provider': ['IC CASH', 'Sonstiges'],
+        'Kategorie': ['Bargeld', 'Sonstiges'],
+        'Konto': ['DE01', 'DE02'],
+    })
+
+    df_result = extract_entgelt_and_create_new_rows(df)
+    neue = df_result.iloc[2:]
+    assert list(neue['Verwendungszweck']) == ["Auslandseinsatzentgelt", "Barauszahlungsgebühr"]
+    assert list(neue['Betrag']) == [1.25, 2.00]
+    assert set(neue['Konto']) == {'DE01'}
+    assert set(neue['Provider']) == {'IC CASH'}
+
+    df_custom = extract_entgelt_and_create_new_rows(df, keywords=["Kontoführung"])
+    assert df_custom.iloc[-1]['Betrag'] == 4.90
+    assert df_custom.iloc[-1]['Kategorie'] == 'Sonstiges'
+
+def test_process_store_roundtrip(tmp_path, mapping_fixture):
+    from scraper.processor.processor import process_store
+    from scraper.storage import sqlite_store
+
+    db_path = str(tmp_path / "buchungen.sqlite")
+    sqlite_store.write_parsed(pd.DataFrame({
+        'Datum': [pd.Timestamp('2025-04-22')],
+        'Verwendungszweck': ['Netflix Auslandseinsatzentgelt 0,30'],
+        'Betrag': [-10.29],
+    }), "mastercard", db_path)
+
+    process_store(db_path, ProviderMatcher(mapping_fixture))
+
+    result = sqlite_store.read_processed(bank="mastercard", db_path=db_path)
+    assert list(result["Provider"]) == ["Netflix", "Netflix"]
+    assert list(result["Betrag_Cent"]) == [-1029, 30]
+
+def test_save_processed_writes_rollups(tmp_path):
+    from scraper.processor.processor import save_processed, rollup_paths
+
+    df = pd.DataFrame({
+        "Datum": ["2025-04-07", "2025-04-07", "2025-05-01"],
+        "Betrag": [-10.0, -2.5, 100.0],
+        "Betrag_Cent": [-1000, -250, 10000],
+        "Provider": ["Rewe", "Rewe", "Arbeitgeber"],
+        "Kategorie": ["Lebensmittel", "Lebensmittel", "Gehalt"],
+    })
+    output_path = save_processed(df, "buchungen_volksbank_2025.csv", str(tmp_path))
+    monthly_path, weekday_path = rollup_paths(output_path)
+
+    monthly = pd.read_csv(monthly_path)
+    assert monthly[["Monat", "Provider", "Betrag_Cent", "Anzahl"]].values.tolist() == [
+        [4, "Rewe", -1250, 2], [5, "Arbeitgeber", 10000, 1]
+    ]
+    weekday = pd.read_csv(weekday_path)
+    assert weekday.loc[weekday["Provider"] == "Rewe", "Wochentag"].tolist() == [0]
+
+def test_find_processed_files_picks_newest_per_bank_and_year(tmp_path):
+    import os
+    from scraper.processor.processor import find_processed_files
+
+    for name in ["volksbank_2024_mapped_20250101.csv", "volksbank_2024_mapped_20250422.csv",
+                 "mastercard_2025_mapped_20250101.csv", "notizen.csv"]:
+        (tmp_path / name).write_text("Datum,Betrag\n")
+    (tmp_path / "rollups").mkdir()
+
+    found = find_processed_files(str(tmp_path))
+    assert {key: os.path.basename(path) for key, path in found.items()} == {
+        ("mastercard", 2025): "mastercard_2025_mapped_20250101.csv",
+        ("volksbank", 2024): "volksbank_2024_mapped_20250422.csv",
+    }
+    assert find_processed_files(str(tmp_path / "fehlt")) == {}
+
+@pytest.mark.parametrize("chunksize", [13, 1000])
+def test_chunked_process_file_is_byte_identical(tmp_path, chunksize):
+    from scraper.processor.processor import process_file, rollup_paths
+    from scraper.tools.synthetic_statements import generate_transactions
+
+    df = generate_transactions(300, "mastercard", seed=3).drop(columns=["_Zweck", "_Fortsetzung"])
+    df["Datum"] = df["Datum"].dt.strftime("%Y-%m-%d")
+    df.loc[5, "Datum"] = None
+    df["Konto"] = ["DE01", "DE02", None] * 100
+    source = tmp_path / "buchungen_mastercard_2024.csv"
+    df.to_csv(source, index=False)
+    matcher = ProviderMatcher({"Netflix": "Streaming", "Rewe": "Lebensmittel"})
+
+    am_stueck = process_file(str(source), matcher, str(tmp_path / "ganz"))
+    blockweise = process_file(str(source), matcher, str(tmp_path / "bloecke"), chunksize=chunksize)
+
+    assert open(blockweise, "rb").read() == open(am_stueck, "rb").read()
+    for a, b in zip(rollup_paths(am_stueck), rollup_paths(blockweise)):
+        assert open(a, "rb").read() == open(b, "rb").read()
+    assert not list((tmp_path / "bloecke").glob("*.tmp"))
+
+def test_process_files_parallel_matches_serial(tmp_path):
+    from scraper.processor.processor import process_files, find_parser_files
+    from scraper.tools.synthetic_statements import generate_transactions
+
+    eingabe = tmp_path / "parser_output"
+    eingabe.mkdir()
+    for bank in ("mastercard", "volksbank"):
+        df = generate_transactions(200, bank).drop(columns=["_Zweck", "_Fortsetzung"])
+        df.to_csv(eingabe / f"buchungen_{bank}_2024.csv", index=False)
+    (eingabe / "buchungen_volksbank_2023.csv").write_text("Betrag\n1,0\n")  # ohne Datum
+    matcher = ProviderMatcher({"Netflix": "Streaming", "Rewe": "Lebensmittel"}, fuzzy_threshold=0.8)
+    pfade = find_parser_files(str(eingabe))
+
+    seriell = process_files(pfade, matcher, str(tmp_path / "seriell"), jobs=1)
+    parallel = process_files(pfade, matcher, str(tmp_path / "parallel"), jobs=2)
+
+    assert [e["file"] for e in parallel] == [os.path.basename(p) for p in pfade]
+    assert [(e["rows_in"], e["rows_out"]) for e in parallel] == [(e["rows_in"], e["rows_out"]) for e in seriell]
+    assert parallel[0]["rows_in"] == 200 and parallel[0]["rows_out"] > 200  # Entgeltzeilen
+    assert parallel[1]["output"] is None and seriell[1]["output"] is None
+    for a, b in zip(seriell[::2], parallel[::2]):
+        assert open(a["output"], "rb").read() == open(b["output"], "rb").read()
+
+def test_process_files_report_uses_this_runs_results(tmp_path, monkeypatch):
+    from scraper.processor.processor import process_files
+    from scraper.tools.synthetic_statements import generate_transactions
+
+    pfad = tmp_path / "buchungen_volksbank_2024.csv"
+    generate_transactions(50, "volksbank").drop(columns=["_Zweck", "_Fortsetzung"]).to_csv(pfad, index=False)
+    matcher = ProviderMatcher({"Netflix": "Streaming"})
+    erster = process_files([str(pfad)], matcher, str(tmp_path / "out"))
+
+    # Dieselbe Datei ist jetzt defekt – der Bericht darf nicht die Zeilen des ersten Laufs zeigen
+    pfad.write_text("Betrag\n1,0\n")
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    zweiter = process_files([str(pfad), str(pfad)], matcher, str(tmp_path / "out"), jobs=0)
+
+    assert erster[0]["rows_in"] == 50
+    assert [(e["output"], e["rows_in"], e["rows_out"]) for e in zweiter] == [(None, None, None)] * 2
+
+def test_extract_entgelt_matches_each_keyword_separately():
+    # "Gebühr" ist Präfix von "Gebühr 2" – wie beim zeilenweisen Suchen erhält jedes Keyword seine Zeile
+    df = pd.DataFrame({
+        'Datum': pd.to_datetime(['2025-04-01', '2025-04-02']),
+        'Verwendungszweck': ['Gebühr 2 1,00', 'Gebühr 3,00'],
+        'Betrag': [-1.0, -3.0],
+    })
+    df_result = extract_entgelt_and_create_new_rows(df, keywords=["Gebühr", "Gebühr 2"])
+    neue = df_result.iloc[2:]
+
+    assert list(zip(neue['Verwendungszweck'], neue['Betrag'])) == [("Gebühr", 2.0), ("Gebühr 2", 1.0), ("Gebühr", 3.0)]
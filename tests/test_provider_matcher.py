@@ -0,0 +1,59 @@
+# tests/test_provider_matcher.py
+
+import json
+import os
+import random
+from scraper.utils.provider_matcher import ProviderMatcher, get_matcher
+from scraper.utils.utils import normalize_text, map_company
+
+
+def naive_longest(text, mapping):
+    text = normalize_text(text)
+    matches = [(p, k) for p, k in mapping.items() if normalize_text(p) in text]
+    return sorted(matches, key=lambda x: len(x[0]), reverse=True)[0] if matches else None
+
+
+def naive_first(text, mapping):
+    text = normalize_text(text)
+    for p, k in mapping.items():
+        if normalize_text(p) in text:
+            return p, k
+    return None
+
+
+def test_matcher_prefers_longest_provider():
+    matcher = ProviderMatcher({"Amazon": "Shopping", "Amazon Digital": "Streaming", "DB": "Transport"})
+    assert matcher.longest_match("AMAZON DIGITAL GERMANY") == ("Amazon Digital", "Streaming")
+    assert matcher.first_match("AMAZON DIGITAL GERMANY") == ("Amazon", "Shopping")
+    assert matcher.longest_match("Irgendwas") is None
+
+
+def test_matcher_matches_naive_implementation():
+    mapping_path = os.path.join(os.path.dirname(__file__), "..", "mapping", "provider_mapping.json")
+    with open(mapping_path, encoding="utf-8") as f:
+        mapping = json.load(f)
+    matcher = ProviderMatcher(mapping)
+
+    rng = random.Random(42)
+    providers = list(mapping.keys())
+    for _ in range(500):
+        parts = rng.sample(providers, rng.randint(0, 3)) + ["Lastschrift", "XYZ", "12,50"]
+        rng.shuffle(parts)
+        text = " ".join(parts)
+        assert matcher.longest_match(text) == naive_longest(text, mapping)
+        assert matcher.first_match(text) == naive_first(text, mapping)
+
+
+def test_map_company_uses_first_match(sample_mapping):
+    assert map_company("NETFLIX.COM Rewe", sample_mapping) == "Entertainment"
+    assert map_company("Irgendwas", sample_mapping) == "Sonstiges"
+
+
+def test_get_matcher_reuses_compiled_mapping_by_identity():
+    mapping = {"Netflix": "Streaming"}
+    matcher = get_matcher(mapping)
+
+    assert get_matcher(mapping) is matcher
+    assert get_matcher(dict(mapping)) is not matcher
+    mapping["Rewe"] = "Lebensmittel"
+    assert get_matcher(mapping).first_match("REWE Markt") == ("Rewe", "Lebensmittel")
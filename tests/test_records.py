@@ -0,0 +1,23 @@
+# tests/test_records.py
+
+import pandas as pd
+from scraper.parser.records import TransactionColumns, betrag_to_cent
+
+def test_betrag_to_cent():
+    assert betrag_to_cent("1.234,56") == 123456
+    assert betrag_to_cent("0,10") == 10
+
+def test_transaction_columns_to_dataframe():
+    columns = TransactionColumns()
+    columns.add("01.03.", "Netflix", -999)
+    columns.append_text("NETFLIX.COM")
+    columns.add("31.02.", "Ungültiges Datum", 10)
+
+    df = columns.to_dataframe(2024)
+
+    assert list(df.columns) == ["Datum", "Verwendungszweck", "Betrag", "Betrag_Cent"]
+    assert df.iloc[0]["Datum"] == pd.Timestamp("2024-03-01")
+    assert pd.isna(df.iloc[1]["Datum"])
+    assert df.iloc[0]["Verwendungszweck"] == "Netflix NETFLIX.COM"
+    assert list(df["Betrag_Cent"]) == [-999, 10]
+    assert list(df["Betrag"]) == [-9.99, 0.10]
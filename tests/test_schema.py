@@ -0,0 +1,49 @@
+# tests/test_schema.py
+
+import pandas as pd
+from scraper.utils import schema
+from scraper.processor.processor import process_dataframe
+from scraper.utils.provider_matcher import ProviderMatcher
+from scraper.tools import memory_report
+
+def _parsed_df():
+    return pd.DataFrame({
+        "Datum": ["2024-01-02", "2024-02-03", "2024-02-04"],
+        "Verwendungszweck": ["Netflix Abo", "Edeka Markt Auslandseinsatzentgelt 1,75", "Kiosk"],
+        "Betrag": [-12.99, -20.5, -3.0],
+    })
+
+def test_apply_schema_derives_cent_and_converts_types():
+    df = schema.apply_schema(_parsed_df(), schema.PARSED_SCHEMA)
+    assert df["Datum"].dtype == "datetime64[ns]"
+    assert df["Betrag_Cent"].tolist() == [-1299, -2050, -300]
+
+def test_process_dataframe_returns_processed_schema():
+    matcher = ProviderMatcher({"Netflix": "Streaming", "Edeka": "Lebensmittel"})
+    df = process_dataframe(schema.apply_schema(_parsed_df(), schema.PARSED_SCHEMA), matcher)
+    assert isinstance(df["Provider"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["Kategorie"].dtype, pd.CategoricalDtype)
+    # Entgeltzeile übernimmt Provider und Kategorie der Ursprungsbuchung
+    assert df["Provider"].tolist() == ["Netflix", "Edeka", "Sonstiges", "Edeka"]
+    assert df["Betrag_Cent"].dtype == "int64"
+
+def test_read_csv_and_concat_keep_categories(tmp_path):
+    path = tmp_path / "processed.csv"
+    pd.DataFrame({
+        "Datum": ["2024-01-02"], "Betrag": [1.5], "Provider": ["Rewe"], "Kategorie": ["Lebensmittel"],
+    }).to_csv(path, index=False)
+    df = schema.read_csv(path, schema.PROCESSED_SCHEMA)
+    assert isinstance(df["Provider"].dtype, pd.CategoricalDtype)
+    assert df["Betrag_Cent"].tolist() == [150]
+
+    other = pd.DataFrame({"Datum": ["2024-03-01"], "Betrag": [2.0], "Provider": ["Lidl"], "Kategorie": ["Lebensmittel"]})
+    combined = schema.concat([df.assign(Jahr=2024), other.assign(Jahr=2024)], schema.DASHBOARD_SCHEMA)
+    assert isinstance(combined["Provider"].dtype, pd.CategoricalDtype)
+    assert combined["Provider"].tolist() == ["Rewe", "Lidl"]
+    assert combined["Jahr"].dtype == "int16"
+
+def test_memory_report_shows_saving():
+    alt, typisiert = memory_report.dashboard_frames(2_000)
+    report = memory_report.memory_report(alt, typisiert)
+    assert report.loc["Gesamt", "nachher"] < report.loc["Gesamt", "vorher"] / 2
+    pd.testing.assert_frame_equal(alt[["Datum", "Betrag"]], typisiert[["Datum", "Betrag"]])
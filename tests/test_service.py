@@ -0,0 +1,164 @@
+# tests/test_service.py
+
+import json
+import asyncio
+from scraper import service
+from scraper.tools import synthetic_statements
+
+async def _request(port, method, target, body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {target} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    antwort = await reader.read()
+    writer.close()
+    kopf, _, inhalt = antwort.partition(b"\r\n\r\n")
+    return int(kopf.split()[1]), json.loads(inhalt)
+
+def _service(tmp_path, **kwargs):
+    return service.BankdatenService(
+        input_folder=str(tmp_path / "input"), parser_output_folder=str(tmp_path / "parsed"),
+        processed_folder=str(tmp_path / "processed"), state_path=str(tmp_path / "state.json"), **kwargs,
+    )
+
+def test_percentile_nearest_rank():
+    werte = list(range(1, 101))
+    assert service.percentile(werte, 50) == 50
+    assert service.percentile(werte, 99) == 99
+    assert service.percentile([], 50) is None
+
+def test_upload_then_query_aggregates(tmp_path):
+    df = synthetic_statements.generate_transactions(50, "volksbank")
+    pdf_path = synthetic_statements.write_statement_pdf(df, "volksbank", tmp_path / "quelle")
+    inhalt = open(pdf_path, "rb").read()
+    dateiname = pdf_path.rsplit("/", 1)[-1]
+
+    async def ablauf():
+        svc = _service(tmp_path)
+        server = await svc.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            assert (await _request(port, "GET", "/aggregates/monthly"))[0] == 404
+            status, ergebnis = await _request(port, "POST", f"/upload?filename={dateiname}", inhalt)
+            assert (status, ergebnis["rows"]) == (200, 50)
+            status, erneut = await _request(port, "POST", f"/upload?filename={dateiname}", inhalt)
+            assert erneut["status"] == "bereits übernommen"
+
+            _, datasets = await _request(port, "GET", "/datasets")
+            _, monatlich = await _request(port, "GET", "/aggregates/monthly?bank=volksbank&jahr=2024")
+            _, kategorien = await _request(port, "GET", "/aggregates/categories")
+            _, top = await _request(port, "GET", "/aggregates/top-providers?n=3")
+            _, leer = await _request(port, "GET", "/aggregates/categories?bank=mastercard")
+            _, stats = await _request(port, "GET", "/metrics")
+            return datasets, monatlich, kategorien, top, leer, stats
+        finally:
+            server.close()
+            await server.wait_closed()
+            svc.close()
+
+    datasets, monatlich, kategorien, top, leer, stats = asyncio.run(ablauf())
+    assert datasets == [{"bank": "volksbank", "jahr": 2024}]
+    assert round(sum(monatlich[0]["monate"].values()), 2) == round(df["Betrag"].sum(), 2)
+    assert sum(k["anzahl"] for k in kategorien) == 50
+    assert len(top) == 3 and leer == []
+    assert stats["routes"]["GET /aggregates/categories"]["requests"] == 2
+    assert stats["routes"]["POST /upload"]["p99_ms"] >= stats["routes"]["POST /upload"]["p50_ms"]
+
+async def _keep_alive_request(reader, writer, target):
+    writer.write(f"GET {target} HTTP/1.1\r\n\r\n".encode())
+    await writer.drain()
+    kopf = await reader.readuntil(b"\r\n\r\n")
+    laenge = int(kopf.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+    await reader.readexactly(laenge)
+    return int(kopf.split()[1])
+
+def test_rejects_connections_over_limit(tmp_path):
+    async def ablauf():
+        svc = _service(tmp_path, max_requests=2)
+        server = await svc.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            # Zwei offene Keep-Alive-Verbindungen belegen das Limit, auch wenn sie gerade ruhen
+            offen = [await asyncio.open_connection("127.0.0.1", port) for _ in range(2)]
+            ersten = [await _keep_alive_request(r, w, "/health") for r, w in offen]
+            abgelehnt, _ = await _request(port, "GET", "/health")
+            offen[0][1].close()
+            await offen[0][1].wait_closed()
+            await asyncio.sleep(0.05)
+            danach, _ = await _request(port, "GET", "/health")
+            offen[1][1].close()
+            return ersten, abgelehnt, danach, svc._route_metrics({})
+        finally:
+            server.close()
+            await server.wait_closed()
+            svc.close()
+
+    ersten, abgelehnt, danach, stats = asyncio.run(ablauf())
+    assert ersten == [200, 200]
+    assert (abgelehnt, danach) == (503, 200)
+    assert stats["rejected"] == {"requests": 1}
+
+def test_concurrent_identical_uploads_are_ingested_once(tmp_path):
+    df = synthetic_statements.generate_transactions(30, "volksbank")
+    pdf_path = synthetic_statements.write_statement_pdf(df, "volksbank", tmp_path / "quelle")
+    inhalt = open(pdf_path, "rb").read()
+    dateiname = pdf_path.rsplit("/", 1)[-1]
+
+    async def ablauf():
+        svc = _service(tmp_path, max_uploads=4)
+        server = await svc.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            antworten = await asyncio.gather(
+                *(_request(port, "POST", f"/upload?filename={dateiname}", inhalt) for _ in range(3))
+            )
+            _, kategorien = await _request(port, "GET", "/aggregates/categories")
+            return antworten, kategorien
+        finally:
+            server.close()
+            await server.wait_closed()
+            svc.close()
+
+    antworten, kategorien = asyncio.run(ablauf())
+    assert sorted(ergebnis["status"] for _, ergebnis in antworten) == ["bereits übernommen"] * 2 + ["übernommen"]
+    assert all(ergebnis["rows"] == 30 for _, ergebnis in antworten)
+    assert sum(k["anzahl"] for k in kategorien) == 30
+
+def test_answer_cache_is_normalised_and_bounded(monkeypatch, tmp_path):
+    monkeypatch.setattr(service, "ANTWORT_CACHE_GROESSE", 2)
+    svc = _service(tmp_path)
+    aufrufe = []
+    monkeypatch.setitem(service.BankdatenService.ROUTES, ("GET", "/datasets"),
+                        lambda self, params: aufrufe.append(params) or len(aufrufe))
+
+    async def ablauf():
+        return [(await svc.dispatch("GET", target, b""))[1] for target in (
+            "/datasets?bank=volksbank&jahr=2024", "/datasets?jahr=2024&bank=volksbank&_=1",
+            "/datasets?jahr=2023", "/datasets?jahr=2022", "/datasets?bank=volksbank&jahr=2024",
+        )]
+
+    assert asyncio.run(ablauf()) == [1, 1, 2, 3, 4]
+    assert len(svc._antworten) == 2
+
+def test_upload_of_batch_processed_pdf_is_not_appended_again(tmp_path):
+    df = synthetic_statements.generate_transactions(20, "volksbank")
+    pdf_path = synthetic_statements.write_statement_pdf(df, "volksbank", tmp_path / "input")
+    inhalt = open(pdf_path, "rb").read()
+    dateiname = pdf_path.rsplit("/", 1)[-1]
+    # Stand nach einem Komplettlauf ohne Zustandsdatei
+    (tmp_path / "parsed").mkdir()
+    (tmp_path / "parsed" / "buchungen_volksbank_2024.csv").write_text("Datum,Betrag\n", encoding="utf-8")
+
+    async def ablauf():
+        svc = _service(tmp_path)
+        server = await svc.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await _request(port, "POST", f"/upload?filename={dateiname}", inhalt)
+        finally:
+            server.close()
+            await server.wait_closed()
+            svc.close()
+
+    status, ergebnis = asyncio.run(ablauf())
+    assert (status, ergebnis["status"], ergebnis["file"]) == (200, "bereits übernommen", dateiname)
+    assert (tmp_path / "parsed" / "buchungen_volksbank_2024.csv").read_text(encoding="utf-8") == "Datum,Betrag\n"
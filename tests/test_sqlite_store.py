@@ -0,0 +1,59 @@
+# tests/test_sqlite_store.py
+
+import pandas as pd
+from scraper.storage import sqlite_store
+
+
+def test_write_and_read_parsed_replaces_years(tmp_path):
+    db_path = str(tmp_path / "buchungen.sqlite")
+    df = pd.DataFrame({
+        "Datum": pd.to_datetime(["2024-12-30", "2025-01-02"]),
+        "Verwendungszweck": ["Netflix", "Rewe"],
+        "Betrag": [-9.99, -20.5],
+        "Betrag_Cent": [-999, -2050],
+    })
+
+    assert sqlite_store.write_parsed(df, "volksbank", db_path) == [2024, 2025]
+    # Erneutes Schreiben ersetzt statt zu duplizieren
+    sqlite_store.write_parsed(df, "volksbank", db_path)
+
+    result = sqlite_store.read_parsed(bank="volksbank", db_path=db_path)
+    pd.testing.assert_frame_equal(result, df, check_dtype=False)
+    assert sqlite_store.list_partitions("parsed", db_path) == [("volksbank", 2024), ("volksbank", 2025)]
+    assert len(sqlite_store.read_parsed(start="2025-01-01", db_path=db_path)) == 1
+
+
+def test_aggregate_processed(tmp_path):
+    db_path = str(tmp_path / "buchungen.sqlite")
+    df = pd.DataFrame({
+        "Datum": pd.to_datetime(["2025-01-02", "2025-01-15", "2025-02-01"]),
+        "Betrag": [-9.99, -0.01, 100.0],
+        "Provider": ["Netflix", "Netflix", "Sonstiges"],
+        "Kategorie": ["Streaming", "Streaming", "Sonstiges"],
+    })
+    sqlite_store.write_processed(df, "mastercard", db_path)
+
+    result = sqlite_store.aggregate(group_by=("monat", "kategorie"), db_path=db_path)
+
+    assert list(result["monat"]) == [1, 2]
+    assert list(result["betrag_cent"]) == [-1000, 10000]
+    assert list(result["anzahl"]) == [2, 1]
+
+def test_write_and_read_rollups(tmp_path):
+    from scraper.processor import aggregations
+
+    db_path = str(tmp_path / "test.sqlite")
+    df = pd.DataFrame({
+        "Datum": pd.to_datetime(["2025-01-06", "2025-01-07"]),
+        "Betrag": [-1.5, -2.0],
+        "Provider": ["Rewe", "Rewe"],
+        "Kategorie": ["Lebensmittel", "Lebensmittel"],
+    })
+    monthly = aggregations.build_monthly_rollup(df)
+    weekday = aggregations.build_weekday_rollup(df)
+    sqlite_store.write_rollups(monthly, weekday, "volksbank", db_path)
+    sqlite_store.write_rollups(monthly, weekday, "volksbank", db_path)  # ersetzt statt verdoppelt
+
+    gelesen = sqlite_store.read_rollup("rollup_monthly", bank="volksbank", jahr=2025, db_path=db_path)
+    assert gelesen[["Jahr", "Monat", "Provider", "Betrag_Cent", "Anzahl"]].values.tolist() == [[2025, 1, "Rewe", -350, 2]]
+    assert len(sqlite_store.read_rollup("rollup_weekday", db_path=db_path)) == 2
@@ -17,3 +17,41 @@ def test_csv_validator_runs():
 def test_folder_cleaner_runs():
     result = subprocess.run(["python", "-m", "scraper.tools.folder_cleaner"], capture_output=True)
     assert result.returncode == 0
+
+def test_import_benchmark_keeps_main_light():
+    from scraper.tools.import_benchmark import measure_cold_start
+
+    median_ms, top_level, geladen = measure_cold_start("scraper.main", runs=1)
+    assert median_ms > 0
+    assert geladen == []  # pandas, pdfplumber & Co. erst bei Bedarf
+
+def test_synthetic_statements_are_deterministic():
+    from scraper.tools.synthetic_statements import generate_transactions
+
+    a = generate_transactions(500, "mastercard", seed=7)
+    b = generate_transactions(500, "mastercard", seed=7)
+    assert a.equals(b)
+    assert a["Verwendungszweck"].str.contains("Auslandseinsatzentgelt").any()
+    assert not a.equals(generate_transactions(500, "mastercard", seed=8))
+
+def test_synthetic_pdfs_parse_back_to_generated_rows(tmp_path):
+    from scraper.tools.synthetic_statements import generate_transactions, write_statement_pdf
+    from scraper.parser.parser_volksbank import parse_volksbank
+    from scraper.parser.parser_mastercard import parse_mastercard
+
+    spalten = ["Datum", "Verwendungszweck", "Betrag_Cent"]
+    for bank_typ, parser in (("volksbank", parse_volksbank), ("mastercard", parse_mastercard)):
+        df = generate_transactions(150, bank_typ, seed=1)  # mehrere Seiten mit Fortsetzungszeilen
+        pdf_path = write_statement_pdf(df, bank_typ, tmp_path)
+        assert parser(pdf_path)[spalten].equals(df[spalten])
+
+def test_benchmark_suite_writes_and_compares_baseline(tmp_path):
+    from scraper.tools.benchmark_suite import run_suite, save_baseline, compare_with_baseline
+
+    ergebnisse = run_suite([200], stages=["process_file", "extract_entgelt", "monthly_cashflow"], repeat=1)
+    assert [r["stage"] for r in ergebnisse] == ["process_file", "extract_entgelt", "monthly_cashflow"]
+
+    baseline = save_baseline(ergebnisse, str(tmp_path / "baseline.json"))
+    assert compare_with_baseline(ergebnisse, baseline) == []
+    langsamer = [{**r, "seconds": r["seconds"] * 10} for r in ergebnisse]
+    assert len(compare_with_baseline(langsamer, baseline)) == 3
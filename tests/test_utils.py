@@ -1,5 +1,5 @@
 import pytest
-from scraper.utils.utils import normalize_text, detect_bank_typ, extract_jahr_from_filename
+from scraper.utils.utils import normalize_text, detect_bank_typ, detect_bank_typ_from_text, extract_jahr_from_filename
 
 def test_normalize_text():
     assert normalize_text("München!") == "munchen"
@@ -12,3 +12,37 @@ def test_detect_bank_typ():
 
 def test_extract_jahr_from_filename():
     assert extract_jahr_from_filename("umsatz_vom_2023.04.25.pdf") == 2023
+
+def test_detect_bank_typ_from_text():
+    assert detect_bank_typ_from_text("Kreditkarten-Umsatzaufstellung\nBuchungs-Beleg-Datum") == "mastercard"
+    assert detect_bank_typ_from_text("Volksbank Musterstadt eG\nKontoauszug 3/2024") == "volksbank"
+    assert detect_bank_typ_from_text("01.02. 01.02. Lastschrift REWE 12,50 S") == "volksbank"
+    assert detect_bank_typ_from_text("Rechnung Nr. 4711") == "unbekannt"
+
+def test_detect_volksbank_statement_mentioning_credit_card():
+    text = "Volksbank Musterstadt eG\nKontoauszug 3/2024\n02.03. 02.03. Abrechnung Mastercard Kreditkarte 312,40 S"
+    assert detect_bank_typ_from_text(text) == "volksbank"
+    assert detect_bank_typ_from_text("Abrechnung Kreditkarte\nVolksbank Musterstadt eG") == "volksbank"
+
+def test_sniff_bank_typ_caches_per_hash(monkeypatch, tmp_path):
+    from scraper.utils import bank_sniffer
+
+    pdf_path = tmp_path / "scan_0001.pdf"
+    pdf_path.write_text("Dummy Inhalt")
+    aufrufe = []
+
+    def fake_first_page(path):
+        aufrufe.append(path)
+        return "Umsatzaufstellung"
+
+    monkeypatch.setattr(bank_sniffer, "read_first_page_text", fake_first_page)
+    monkeypatch.setattr(bank_sniffer, "_sniffed", {})
+
+    cache_folder = str(tmp_path / "cache")
+    assert bank_sniffer.sniff_bank_typ(str(pdf_path), cache_folder=cache_folder) == "mastercard"
+    assert bank_sniffer.sniff_bank_typ(str(pdf_path), cache_folder=cache_folder) == "mastercard"
+
+    # Neuer Prozess: nur der persistente Cache ist noch da
+    monkeypatch.setattr(bank_sniffer, "_sniffed", {})
+    assert bank_sniffer.sniff_bank_typ(str(pdf_path), cache_folder=cache_folder) == "mastercard"
+    assert len(aufrufe) == 1
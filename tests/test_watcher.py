@@ -0,0 +1,198 @@
+# tests/test_watcher.py
+
+import os
+import shutil
+import time
+import threading
+import pandas as pd
+import pytest
+from scraper import watcher
+from scraper.processor import processor
+from scraper.tools import synthetic_statements
+
+def test_debouncer_waits_until_file_is_stable(tmp_path):
+    path = tmp_path / "a.pdf"
+    path.write_bytes(b"%PDF-1.4\n")
+    debouncer = watcher.Debouncer(settle=1.0)
+    debouncer.observe(str(path), now=0.0)
+
+    assert debouncer.ready(now=0.0) == []  # erste Messung
+    path.write_bytes(b"%PDF-1.4\nmehr")
+    assert debouncer.ready(now=0.8) == []  # Größe hat sich geändert
+    assert debouncer.ready(now=1.5) == []
+    assert debouncer.ready(now=1.9) == [str(path)]
+    assert len(debouncer) == 0
+
+def test_append_processed_merges_rollups(tmp_path):
+    df = pd.DataFrame({
+        "Datum": pd.to_datetime(["2024-01-02", "2024-01-05"]),
+        "Betrag": [-10.0, -5.0],
+        "Betrag_Cent": [-1000, -500],
+        "Provider": ["Rewe", "Rewe"],
+        "Kategorie": ["Lebensmittel", "Lebensmittel"],
+    })
+    erster = processor.append_processed(df.iloc[:1], "volksbank", 2024, str(tmp_path))
+    zweiter = processor.append_processed(df.iloc[1:], "volksbank", 2024, str(tmp_path))
+
+    assert erster == zweiter
+    assert len(pd.read_csv(zweiter)) == 2
+    monthly = pd.read_csv(processor.rollup_paths(zweiter)[0])
+    assert monthly[["Betrag_Cent", "Anzahl"]].values.tolist() == [[-1500, 2]]
+
+@pytest.mark.parametrize("polling", [True, False])
+def test_watch_ingests_new_pdfs_once(tmp_path, polling):
+    input_folder, state_path = tmp_path / "input", tmp_path / "state.json"
+    input_folder.mkdir()
+    df = synthetic_statements.generate_transactions(50, "volksbank")
+    pdf_path = synthetic_statements.write_statement_pdf(df, "volksbank", tmp_path / "quelle")
+
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.watch, kwargs=dict(
+        input_folder=str(input_folder), parser_output_folder=str(tmp_path / "parsed"),
+        processed_folder=str(tmp_path / "processed"), settle=0.2, poll_interval=0.1,
+        polling=polling, state_path=str(state_path), stop_event=stop,
+    ))
+    thread.start()
+    try:
+        # Datei in zwei Schritten schreiben – erst die fertige Datei darf übernommen werden
+        inhalt = open(pdf_path, "rb").read()
+        ziel = input_folder / os.path.basename(pdf_path)
+        with open(ziel, "wb") as f:
+            f.write(inhalt[:len(inhalt) // 2])
+            f.flush()
+            time.sleep(0.1)
+            f.write(inhalt[len(inhalt) // 2:])
+        shutil.copy(ziel, input_folder / "kontoauszug_kopie_vom_2024.12.31.pdf")
+
+        frist = time.monotonic() + 30
+        while time.monotonic() < frist and not state_path.exists():
+            time.sleep(0.1)
+        time.sleep(1.0)  # die Kopie hat denselben Inhalt und wird übersprungen
+    finally:
+        stop.set()
+        thread.join(timeout=30)
+
+    state = watcher.load_state(str(state_path))
+    assert [eintrag["rows"] for eintrag in state.values()] == [50]
+    assert len(pd.read_csv(tmp_path / "parsed" / "buchungen_volksbank_2024.csv")) == 50
+    processed = processor.find_processed_files(str(tmp_path / "processed"))
+    assert len(pd.read_csv(processed[("volksbank", 2024)])) == 50
+
+def test_commit_result_records_pending_before_append(tmp_path, monkeypatch):
+    state_path = str(tmp_path / "state.json")
+
+    def absturz(*args):
+        assert watcher.load_state(state_path)["abc"]["status"] == "pending"
+        raise OSError("Platte voll")
+
+    monkeypatch.setattr(watcher, "append_result", absturz)
+    with pytest.raises(OSError):
+        watcher.commit_result("abc", "a.pdf", "volksbank", {}, str(tmp_path), str(tmp_path), state_path=state_path)
+
+    # Nach einem Neustart wird nichts erneut angehängt
+    monkeypatch.setattr(watcher, "append_result", lambda *args: pytest.fail("doppelt angehängt"))
+    zeilen, eintrag = watcher.commit_result("abc", "a.pdf", "volksbank", {}, str(tmp_path), str(tmp_path),
+                                            state_path=state_path)
+    assert (zeilen, eintrag["status"]) == (None, "pending")
+
+def test_commit_result_marks_unknown_and_empty_files(tmp_path, monkeypatch):
+    state_path = str(tmp_path / "state.json")
+    monkeypatch.setattr(watcher, "append_result", lambda *args: 0)
+
+    _, unbekannt = watcher.commit_result("abc", "a.pdf", "unbekannt", {}, str(tmp_path), str(tmp_path),
+                                         state_path=state_path)
+    _, leer = watcher.commit_result("def", "b.pdf", "volksbank", {}, str(tmp_path), str(tmp_path),
+                                    state_path=state_path)
+
+    assert (unbekannt["status"], leer["status"]) == ("fehler", "leer")
+    assert {e["status"] for e in watcher.load_state(state_path).values()} == {"fehler", "leer"}
+
+def test_watch_skips_pdfs_from_earlier_batch_runs(tmp_path):
+    input_folder, parsed, state_path = tmp_path / "input", tmp_path / "parsed", tmp_path / "state.json"
+    input_folder.mkdir()
+    parsed.mkdir()
+    pdfs = {}
+    for jahr in (2023, 2024):
+        df = synthetic_statements.generate_transactions(20, "volksbank", jahr=jahr, seed=jahr)
+        pdfs[jahr] = synthetic_statements.write_statement_pdf(df, "volksbank", tmp_path / "quelle", jahr=jahr)
+    # Stand nach einem Komplettlauf: PDF in input/, Buchungen in der Jahresdatei, noch kein Zustand
+    shutil.copy(pdfs[2023], input_folder)
+    (parsed / "buchungen_volksbank_2023.csv").write_text("Datum,Betrag\n", encoding="utf-8")
+
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.watch, kwargs=dict(
+        input_folder=str(input_folder), parser_output_folder=str(parsed),
+        processed_folder=str(tmp_path / "processed"), settle=0.2, poll_interval=0.1,
+        polling=True, state_path=str(state_path), stop_event=stop,
+    ))
+    thread.start()
+    try:
+        time.sleep(0.3)
+        shutil.copy(pdfs[2024], input_folder)
+        frist = time.monotonic() + 30
+        while time.monotonic() < frist and not any(
+                e["status"] == "ok" for e in watcher.load_state(str(state_path)).values()):
+            time.sleep(0.1)
+        time.sleep(0.5)
+    finally:
+        stop.set()
+        thread.join(timeout=30)
+
+    state = watcher.load_state(str(state_path))
+    assert sorted((e["file"], e["status"]) for e in state.values()) == [
+        ("kontoauszug_vom_2023.12.31.pdf", "bestand"), ("kontoauszug_vom_2024.12.31.pdf", "ok"),
+    ]
+    assert (parsed / "buchungen_volksbank_2023.csv").read_text(encoding="utf-8") == "Datum,Betrag\n"
+
+def test_watch_survives_append_errors_and_rereads_state(tmp_path, monkeypatch):
+    input_folder, state_path = tmp_path / "input", tmp_path / "state.json"
+    input_folder.mkdir()
+    pdfs = {}
+    for jahr in (2022, 2023, 2024):
+        df = synthetic_statements.generate_transactions(20, "volksbank", jahr=jahr, seed=jahr)
+        pdfs[jahr] = synthetic_statements.write_statement_pdf(df, "volksbank", tmp_path / "quelle", jahr=jahr)
+
+    original = watcher.append_result
+    def append_result(bank_typ, jahre, *args):
+        if 2023 in jahre:
+            raise OSError("Platte voll")
+        return original(bank_typ, jahre, *args)
+    monkeypatch.setattr(watcher, "append_result", append_result)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.watch, kwargs=dict(
+        input_folder=str(input_folder), parser_output_folder=str(tmp_path / "parsed"),
+        processed_folder=str(tmp_path / "processed"), settle=0.2, poll_interval=0.1,
+        polling=True, state_path=str(state_path), stop_event=stop,
+    ))
+    thread.start()
+
+    def warten(bedingung):
+        frist = time.monotonic() + 30
+        while time.monotonic() < frist and not bedingung():
+            time.sleep(0.1)
+
+    try:
+        # Vom Dienst übernommen, nachdem die Überwachung gestartet ist
+        time.sleep(0.3)
+        from scraper.utils.parse_cache import compute_file_hash
+        watcher.save_state({compute_file_hash(pdfs[2022]): {"file": "hochgeladen.pdf", "status": "ok", "rows": 20}},
+                           str(state_path))
+        for jahr in (2022, 2023):
+            shutil.copy(pdfs[jahr], input_folder)
+        warten(lambda: any(e.get("status") == "fehler" for e in watcher.load_state(str(state_path)).values()))
+        shutil.copy(pdfs[2024], input_folder)
+        warten(lambda: any(e.get("rows") == 20 and e["file"] != "hochgeladen.pdf"
+                           for e in watcher.load_state(str(state_path)).values()))
+        time.sleep(0.5)
+        lebt = thread.is_alive()
+    finally:
+        stop.set()
+        thread.join(timeout=30)
+
+    assert lebt
+    state = watcher.load_state(str(state_path))
+    assert sorted((e["file"], e["status"]) for e in state.values()) == [
+        ("hochgeladen.pdf", "ok"), ("kontoauszug_vom_2023.12.31.pdf", "fehler"), ("kontoauszug_vom_2024.12.31.pdf", "ok"),
+    ]
+    assert sorted(os.listdir(tmp_path / "parsed")) == ["buchungen_volksbank_2024.csv"]
@@ -4,6 +4,10 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 import matplotlib.ticker as ticker
+from scraper.storage import sqlite_store
+from scraper.processor import aggregations
+from scraper.processor.processor import rollup_paths, find_processed_files
+from scraper.utils import schema
 
 # === Settings ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,46 +16,106 @@ DATA_FOLDER = os.path.join(BASE_DIR, "output", "processed")
 # === Config ===
 st.set_page_config(page_title="💸 Finanz-Visualizer", layout="wide")
 
-# === Load CSVs ===
-@st.cache_data
-def load_data(bank_type, year):
-    filename = f"{bank_type.lower()}_{year}_mapped_20250422.csv"
-    filepath = os.path.join(DATA_FOLDER, filename)
-    if not os.path.exists(filepath):
-        return pd.DataFrame()
-    df = pd.read_csv(filepath, parse_dates=["Datum"])
-    df["Monat"] = df["Datum"].dt.to_period("M").astype(str)
-    return df
+# === Datensätze finden ===
+def file_signature(path):
+    """(Pfad, mtime, Größe) als Cache-Schlüssel – ändert sich, sobald die Datei neu geschrieben wird."""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+def discover_csv():
+    """{(Bank, Jahr): Signaturen von verarbeiteter CSV, Monats- und Wochentags-Rollup}."""
+    return {
+        (bank, str(jahr)): (file_signature(path), *(file_signature(p) for p in rollup_paths(path)))
+        for (bank, jahr), path in find_processed_files(DATA_FOLDER).items()
+    }
+
+def discover_sqlite():
+    if not os.path.exists(sqlite_store.DB_PATH):
+        return {}
+    # Im WAL-Modus landen neue Daten zuerst in der -wal-Datei
+    signature = (file_signature(sqlite_store.DB_PATH), file_signature(f"{sqlite_store.DB_PATH}-wal"))
+    return {(bank, str(jahr)): signature for bank, jahr in sqlite_store.list_partitions("processed")}
+
+# === Daten laden (pro Datei gecacht, Schlüssel: Pfad + mtime + Größe) ===
+@st.cache_data(max_entries=64)
+def read_csv_file(signature, typen):
+    return schema.read_csv(signature[0], typen)
+
+@st.cache_data(max_entries=64)
+def read_sqlite_partition(bank_type, year, signature):
+    df = sqlite_store.read_processed(bank=bank_type, jahr=int(year))
+    if df.empty:
+        return df, None
+    monthly = sqlite_store.read_rollup("rollup_monthly", bank=bank_type, jahr=int(year))
+    weekday = sqlite_store.read_rollup("rollup_weekday", bank=bank_type, jahr=int(year))
+    return df, ((monthly, weekday) if not monthly.empty else None)
+
+def read_dataset(datenquelle, bank_type, year, signatures):
+    if datenquelle == "SQLite":
+        return read_sqlite_partition(bank_type, year, signatures)
+    processed, monthly, weekday = signatures
+    df = read_csv_file(processed, schema.PROCESSED_SCHEMA)
+    rollups = ((read_csv_file(monthly, schema.ROLLUP_SCHEMA), read_csv_file(weekday, schema.ROLLUP_SCHEMA))
+               if monthly and weekday else None)
+    return df, rollups
+
+@st.cache_resource(max_entries=8)
+def load_data(datenquelle, auswahl):
+    """Verbindet die gewählten Datensätze einmal je Auswahl und Dateistand.
+
+    auswahl ist ein Tupel aus ((Bank, Jahr), Signaturen). Das Ergebnis wird zwischen
+    Reruns geteilt und darf nicht verändert werden.
+    """
+    all_dfs, monthly_rollups, weekday_rollups = [], [], []
+    rollups_complete = True
+    for (bank_type, year), signatures in auswahl:
+        df_temp, rollups = read_dataset(datenquelle, bank_type, year, signatures)
+        if df_temp.empty:
+            continue
+        # Jahr und Monat als kleine Ganzzahlen, Texte kategorial (siehe scraper/utils/schema.py)
+        df_temp = df_temp.assign(Jahr=int(year), Banktyp=bank_type, Monat=df_temp["Datum"].dt.month)
+        all_dfs.append(df_temp)
+
+        if rollups is None:
+            rollups_complete = False
+            continue
+        monthly_rollups.append(rollups[0].assign(Jahr=int(year), Banktyp=bank_type))
+        weekday_rollups.append(rollups[1].assign(Jahr=int(year), Banktyp=bank_type))
+
+    if not all_dfs:
+        return None, None, None
+    df = schema.concat(all_dfs, schema.DASHBOARD_SCHEMA)
+    if not rollups_complete or not monthly_rollups:
+        return df, None, None
+    return (df, schema.concat(monthly_rollups, schema.ROLLUP_SCHEMA),
+            schema.concat(weekday_rollups, schema.ROLLUP_SCHEMA))
 
 # === Sidebar ===
 st.sidebar.title("🔧 Einstellungen")
 
 with st.sidebar.expander("📚 Basis-Auswahl", expanded=True):
-    bank_types = st.multiselect(
-        "Kontotyp(en)",
-        ("volksbank", "mastercard"),
-        default=("volksbank", "mastercard")
-    )
+    datenquelle = st.radio("Datenquelle", ("CSV", "SQLite"), horizontal=True)
+    datasets = discover_sqlite() if datenquelle == "SQLite" else discover_csv()
 
-    available_years = ["2022", "2023", "2024", "2025"]
+    available_banks = sorted({bank for bank, _ in datasets})
+    bank_types = st.multiselect("Kontotyp(en)", available_banks, default=available_banks)
+
+    available_years = sorted({year for _, year in datasets})
     selected_years = st.multiselect("Jahre", available_years, default=available_years)
 
 # === Daten laden ===
-all_dfs = []
-for bank_type in bank_types:
-    for year in selected_years:
-        df_temp = load_data(bank_type, year)
-        if not df_temp.empty:
-            df_temp["Jahr"] = year
-            df_temp["Banktyp"] = bank_type
-            all_dfs.append(df_temp)
-
-if not all_dfs:
+auswahl = tuple(
+    (key, signatures) for key, signatures in datasets.items()
+    if key[0] in bank_types and key[1] in selected_years
+)
+df, all_monthly_rollups, all_weekday_rollups = load_data(datenquelle, auswahl)
+
+if df is None:
     st.error("❌ Keine Daten gefunden.")
     st.stop()
 
-df = pd.concat(all_dfs, ignore_index=True)
-
 # === Kategorie Filter aktualisieren ===
 available_categories = sorted(df["Kategorie"].dropna().unique().tolist())
 available_categories.insert(0, "Alle")
@@ -74,15 +138,37 @@ with st.container():
     with col3:
         top_n = st.slider("Top N Anbieter", 3, 30, 10)
 
-# === Daten filtern ===
-filtered_df = df[
-    (df["Datum"] >= pd.to_datetime(min_date)) &
-    (df["Datum"] <= pd.to_datetime(max_date)) &
-    (df["Betrag"] >= betrag_range[0]) &
-    (df["Betrag"] <= betrag_range[1])
-]
-if selected_category != "Alle":
-    filtered_df = filtered_df[filtered_df["Kategorie"] == selected_category]
+# === Rollups nutzen, solange kein Filter einzelne Buchungen braucht ===
+# Betragsfilter wirken pro Buchung, Zeiträume nur, wenn sie ganze Monate abdecken
+voller_betrag = betrag_range == (float(df["Betrag"].min()), float(df["Betrag"].max()))
+start_ts, end_ts = pd.Timestamp(min_date), pd.Timestamp(max_date)
+voller_zeitraum = start_ts <= df["Datum"].min() and end_ts >= df["Datum"].max()
+ganze_monate = start_ts.day == 1 and end_ts.is_month_end
+use_rollups = all_monthly_rollups is not None and voller_betrag and (voller_zeitraum or ganze_monate)
+
+def filter_rollup(rollup):
+    if not voller_zeitraum:
+        monat = rollup["Jahr"].astype(int) * 100 + rollup["Monat"]
+        rollup = rollup[(monat >= start_ts.year * 100 + start_ts.month) & (monat <= end_ts.year * 100 + end_ts.month)]
+    if selected_category != "Alle":
+        rollup = rollup[rollup["Kategorie"] == selected_category]
+    return rollup
+
+if use_rollups:
+    monthly_rollup = filter_rollup(all_monthly_rollups)
+    weekday_rollup = filter_rollup(all_weekday_rollups)
+    filtered_df = monthly_rollup  # für die Leer- und Spaltenprüfungen der Tabs
+    st.caption("⚡ Auswertung aus vorverdichteten Rollups")
+else:
+    # === Daten filtern ===
+    filtered_df = df[
+        (df["Datum"] >= pd.to_datetime(min_date)) &
+        (df["Datum"] <= pd.to_datetime(max_date)) &
+        (df["Betrag"] >= betrag_range[0]) &
+        (df["Betrag"] <= betrag_range[1])
+    ]
+    if selected_category != "Alle":
+        filtered_df = filtered_df[filtered_df["Kategorie"] == selected_category]
 
 # === Tabs ===
 tab1, tab2, tab3, tab4 = st.tabs(["📈 Cashflow", "📊 Top Provider", "📚 Kategorie Analyse", "🗓️ Heatmap"])
@@ -91,9 +177,9 @@ tab1, tab2, tab3, tab4 = st.tabs(["📈 Cashflow", "📊 Top Provider", "📚 Ka
 with tab1:
     st.subheader("📈 Monatlicher Cashflow Verlauf")
     fig, ax = plt.subplots(figsize=(12, 6))
-    for (banktyp, jahr), group in filtered_df.groupby(["Banktyp", "Jahr"]):
-        monthly_sum = group.groupby(group["Datum"].dt.month)["Betrag"].sum()
-        monthly_sum = monthly_sum.reindex(range(1, 13), fill_value=0)
+    cashflow = (aggregations.monthly_cashflow_from_rollup(monthly_rollup) if use_rollups
+                else aggregations.monthly_cashflow(filtered_df))
+    for (banktyp, jahr), monthly_sum in cashflow.iterrows():
         label = f"{banktyp.capitalize()} {jahr}"
         monthly_sum.plot(kind="line", marker="o", ax=ax, label=label)
 
@@ -107,14 +193,8 @@ with tab1:
 with tab2:
     st.subheader("🏆 Top Anbieter Auswertung")
     if "Provider" in filtered_df.columns:
-        top_provider_df = (
-            filtered_df.groupby("Provider")["Betrag"]
-            .sum()
-            .abs()
-            .sort_values(ascending=False)
-            .head(top_n)
-            .reset_index()
-        )
+        top_provider_df = (aggregations.top_provider_from_rollup(monthly_rollup, top_n) if use_rollups
+                           else aggregations.top_provider(filtered_df, top_n))
 
         fig3, ax3 = plt.subplots(figsize=(12, 6))
         sns.barplot(data=top_provider_df, x="Betrag", y="Provider", ax=ax3, palette="viridis")
@@ -131,15 +211,8 @@ with tab3:
     if filtered_df.empty:
         st.warning("⚠️ Keine Daten für die Auswahl gefunden.")
     else:
-        pivot = filtered_df.pivot_table(
-            index="Provider",
-            columns="Jahr",
-            values="Betrag",
-            aggfunc="sum",
-            fill_value=0
-        )
-        pivot["Gesamt"] = pivot.sum(axis=1)
-        pivot = pivot.sort_values("Gesamt", ascending=False).head(top_n)
+        pivot = (aggregations.provider_pivot_from_rollup(monthly_rollup, top_n) if use_rollups
+                 else aggregations.provider_pivot(filtered_df, top_n))
 
         st.dataframe(pivot.style.format("{:.2f} €").background_gradient(cmap="RdYlGn", axis=1))
 
@@ -173,24 +246,14 @@ with tab4:
     if filtered_df.empty:
         st.warning("⚠️ Keine Daten für die Heatmap vorhanden.")
     else:
-        available_providers_heatmap = sorted(filtered_df["Provider"].dropna().unique().tolist())
+        heatmap_source = weekday_rollup if use_rollups else filtered_df
+        available_providers_heatmap = sorted(heatmap_source["Provider"].dropna().unique().tolist())
         selected_providers_heatmap = st.multiselect("Provider auswählen für Heatmap", options=available_providers_heatmap, default=available_providers_heatmap)
 
-        heatmap_df = filtered_df[filtered_df["Provider"].isin(selected_providers_heatmap)]
-
-        heatmap_df["Wochentag"] = heatmap_df["Datum"].dt.day_name()
-        heatmap_df["Monat_Year"] = heatmap_df["Datum"].dt.to_period("M").astype(str)
-
-        pivot_table = heatmap_df.pivot_table(
-            index="Wochentag",
-            columns="Monat_Year",
-            values="Betrag",
-            aggfunc="sum",
-            fill_value=0
-        )
+        heatmap_df = heatmap_source[heatmap_source["Provider"].isin(selected_providers_heatmap)]
 
-        ordered_days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        pivot_table = pivot_table.reindex(ordered_days)
+        pivot_table = (aggregations.weekday_heatmap_from_rollup(heatmap_df) if use_rollups
+                       else aggregations.weekday_heatmap(heatmap_df))
 
         fig5, ax5 = plt.subplots(figsize=(14, 6))
         sns.heatmap(pivot_table, cmap="RdYlGn", linewidths=0.5, annot=True, fmt=".0f", ax=ax5)